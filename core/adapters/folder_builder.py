@@ -1,26 +1,14 @@
 from __future__ import annotations
 
 import json
-import os
 from pathlib import Path
 import time
 from typing import Callable
 from uuid import uuid4
 
 from core.extract import extract_tags_from_image
-from core.utils import remove_common_tags
-
-
-def _iter_image_files(folder: str | Path) -> list[Path]:
-    folder_path = Path(folder)
-    results: list[Path] = []
-    for root, _dirs, files in os.walk(folder_path):
-        for name in files:
-            lower = name.lower()
-            if lower.endswith((".png", ".webp", ".jpg", ".jpeg")):
-                results.append(Path(root) / name)
-    results.sort()
-    return results
+from core.runner import WorkerPool
+from core.utils import remove_common_tags, scan_files
 
 
 def build_nais_from_folder(
@@ -29,19 +17,27 @@ def build_nais_from_folder(
     include_negative: bool = False,
     progress_step: int = 200,
     progress_cb: Callable[[int, int], None] | None = None,
+    pool: WorkerPool | None = None,
 ) -> tuple[dict, dict]:
     folder_path = Path(folder)
     if not folder_path.is_dir():
         raise ValueError(f"not a folder: {folder_path}")
 
-    image_paths = _iter_image_files(folder_path)
+    image_paths = sorted(Path(entry.path) for entry in scan_files(folder_path))
     if not image_paths:
         raise ValueError("no images found")
 
     tags_by_path: list[tuple[Path, list[str]]] = []
     total = len(image_paths)
-    for idx, path in enumerate(image_paths, start=1):
-        tags = extract_tags_from_image(str(path), include_negative)
+    if pool is not None:
+        extracted = pool.imap_tags([str(path) for path in image_paths], include_negative)
+    else:
+        extracted = (
+            (extract_tags_from_image(str(path), include_negative), None) for path in image_paths
+        )
+    for idx, (path, (tags, error)) in enumerate(zip(image_paths, extracted), start=1):
+        if error is not None:
+            raise ValueError(f"{path}: {error}")
         tags_by_path.append((path, tags))
         if progress_cb and progress_step > 0:
             if idx % progress_step == 0 or idx == total:
@@ -3,6 +3,7 @@ from .payload import (
     extract_payloads_from_image,
     extract_payloads_from_metadata,
     extract_stealth_payload_text,
+    metadata_prefix_length,
     unwrap_comment_payload,
 )
 from .tags import extract_tags_from_image, extract_tags_from_payload
@@ -12,6 +13,7 @@ __all__ = [
     "extract_payloads_from_image",
     "extract_payloads_from_metadata",
     "extract_stealth_payload_text",
+    "metadata_prefix_length",
     "unwrap_comment_payload",
     "extract_tags_from_image",
     "extract_tags_from_payload",
@@ -59,9 +59,112 @@ def robust_decompress(data_bytes: bytes) -> str | None:
     return None
 
 
-def extract_stealth_payload_text(image_path: str) -> str | None:
+ImageSource = str | bytes | memoryview
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# 알파 채널이 있는 PNG 색 형식(그레이+알파, RGBA). stealth 페이로드는 여기에만 들어간다.
+_PNG_ALPHA_COLOR_TYPES = (4, 6)
+
+
+class _BufferReader(io.RawIOBase):
+    """memoryview 를 복사하지 않고 파일처럼 읽는다. 요청한 부분만 bytes 로 꺼낸다."""
+
+    def __init__(self, view: memoryview) -> None:
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        target = memoryview(buffer).cast("B")
+        size = max(0, min(len(target), len(self._view) - self._pos))
+        target[:size] = self._view[self._pos : self._pos + size]
+        self._pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _open_image(source: ImageSource) -> Image.Image:
+    # 미리 읽어 둔 파일 내용도 경로와 같은 방식으로 연다. memoryview 는 복사하지 않는다.
+    if isinstance(source, memoryview):
+        return Image.open(_BufferReader(source))
+    if isinstance(source, bytes):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+
+def _png_prefix_length(head: bytes, total: int) -> int:
+    offset = len(_PNG_SIGNATURE)
+    while offset + 8 <= len(head):
+        length = int.from_bytes(head[offset : offset + 4], "big")
+        kind = head[offset + 4 : offset + 8]
+        if kind == b"IHDR" and (
+            offset + 18 > len(head) or head[offset + 17] in _PNG_ALPHA_COLOR_TYPES
+        ):
+            return total
+        if kind == b"tRNS":
+            return total
+        if kind == b"IDAT":
+            # Pillow 는 첫 IDAT 청크 헤더까지 읽고 메타데이터를 채운다.
+            return min(total, offset + 8)
+        offset += length + 12
+    return total
+
+
+def _jpeg_prefix_length(head: bytes, total: int) -> int:
+    offset = 2
+    while offset + 4 <= len(head):
+        if head[offset] != 0xFF:
+            return total
+        marker = head[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            offset += 2
+            continue
+        length = int.from_bytes(head[offset + 2 : offset + 4], "big")
+        if marker == 0xE2 and head[offset + 4 : offset + 8] == b"MPF\x00":
+            # MPO 는 열 때 뒤쪽 프레임 위치까지 읽는다.
+            return total
+        offset += length + 2
+        if marker == 0xDA:
+            return min(total, offset)
+    return total
+
+
+def metadata_prefix_length(head: bytes, total: int) -> int:
+    """메타데이터를 읽는 데 필요한 파일 앞부분 길이. head 만으로 알 수 없으면 total.
+
+    PNG 는 첫 IDAT 청크 헤더까지, JPEG 는 SOS 세그먼트까지다. 알파 채널이 있는 PNG 는
+    stealth 페이로드 때문에, WebP 와 그 밖의 형식은 메타데이터가 파일 끝에 올 수 있어서
+    파일 전체가 필요하다.
+    """
+    if head.startswith(_PNG_SIGNATURE):
+        return _png_prefix_length(head, total)
+    if head.startswith(b"\xff\xd8"):
+        return _jpeg_prefix_length(head, total)
+    return total
+
+
+def extract_stealth_payload_text(image_path: ImageSource) -> str | None:
     try:
-        img = Image.open(image_path).convert("RGBA")
+        img = _open_image(image_path).convert("RGBA")
     except Exception:
         return None
 
@@ -188,7 +291,7 @@ def extract_payloads_from_exif(img: Image.Image) -> list[dict]:
     return unwrap_comment_payload(exif_map)
 
 
-def extract_payloads_from_image(image_path: str) -> list[dict]:
+def extract_payloads_from_image(image_path: ImageSource) -> list[dict]:
     payloads: list[dict] = []
     raw_payloads: list[dict] = []
 
@@ -199,7 +302,7 @@ def extract_payloads_from_image(image_path: str) -> list[dict]:
             raw_payloads.append(stealth_payload)
 
     try:
-        with Image.open(image_path) as img:
+        with _open_image(image_path) as img:
             exif_payloads = extract_payloads_from_exif(img)
             info_payloads = extract_payloads_from_metadata(img.info or {})
             raw_payloads.extend(exif_payloads)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Iterable
 
-from .payload import extract_payloads_from_image
+from .payload import ImageSource, extract_payloads_from_image
 from ..normalize.novelai import merge_prompt_tags, normalize_novelai_payload
 
 
@@ -23,7 +23,7 @@ def extract_tags_from_payload(payload: dict, include_negative: bool) -> list[str
     return _dedupe(tags)
 
 
-def extract_tags_from_image(image_path: str, include_negative: bool) -> list[str]:
+def extract_tags_from_image(image_path: ImageSource, include_negative: bool) -> list[str]:
     payloads = extract_payloads_from_image(image_path)
     combined: list[str] = []
     for payload in payloads:
@@ -0,0 +1,8 @@
+from .subsets import find_duplicate_pairs, iter_subset_pairs
+from .tags import TagIndex
+
+__all__ = [
+    "TagIndex",
+    "find_duplicate_pairs",
+    "iter_subset_pairs",
+]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Iterator, Sequence
+
+
+def find_duplicate_pairs(tag_sets: Sequence[frozenset[str]]) -> list[tuple[int, int]]:
+    """(중복 인덱스, 처음 등장한 인덱스) 목록. 빈 태그셋은 검사하지 않는다."""
+    first_seen: dict[frozenset[str], int] = {}
+    pairs: list[tuple[int, int]] = []
+    for idx, tag_set in enumerate(tag_sets):
+        if not tag_set:
+            continue
+        other_idx = first_seen.get(tag_set)
+        if other_idx is not None:
+            pairs.append((idx, other_idx))
+            continue
+        first_seen[tag_set] = idx
+    return pairs
+
+
+def iter_subset_pairs(tag_sets: Sequence[frozenset[str]]) -> Iterator[tuple[int, int]]:
+    """(부분집합 인덱스, 상위집합 인덱스)를 부분집합 크기 오름차순으로 낸다.
+
+    각 태그셋마다 가장 작은(동률이면 앞선) 진상위집합 하나만 낸다. 빈 태그셋과
+    뒤에 나온 중복 태그셋은 제외한다. 태그 → 위치 역색인을 만들고 가장 희귀한 태그의
+    posting 만 후보로 훑기 때문에, 태그가 값마다 흩어진 실제 변수에서는 거의 선형으로 동작한다.
+    """
+    seen: set[frozenset[str]] = set()
+    entries: list[tuple[int, frozenset[str]]] = []
+    for idx, tag_set in enumerate(tag_sets):
+        if not tag_set or tag_set in seen:
+            continue
+        seen.add(tag_set)
+        entries.append((idx, tag_set))
+    entries.sort(key=lambda item: len(item[1]))
+
+    postings: dict[str, list[int]] = {}
+    for pos, (_idx, tag_set) in enumerate(entries):
+        for tag in tag_set:
+            postings.setdefault(tag, []).append(pos)
+
+    for pos, (idx, tag_set) in enumerate(entries):
+        rarest = min((postings[tag] for tag in tag_set), key=len)
+        if len(rarest) <= 1:
+            continue
+        size = len(tag_set)
+        # posting 은 크기 순 위치로 정렬돼 있으므로 자기 뒤쪽만 보면 된다.
+        for other_pos in rarest[bisect_right(rarest, pos) :]:
+            other_set = entries[other_pos][1]
+            if len(other_set) > size and tag_set.issubset(other_set):
+                yield idx, entries[other_pos][0]
+                break
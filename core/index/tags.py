@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import heapq
+from typing import Hashable, Iterable, Iterator
+
+
+class TagIndex:
+    """키 → 태그셋을 태그 단위 역색인으로 보관한다.
+
+    값을 하나씩 추가/삭제할 수 있고, 후보 태그셋과 중복·포함 관계에 있는 키를
+    후보 태그가 등장하는 posting 만 훑어서 찾는다. 빈 태그셋은 색인하지 않는다.
+    """
+
+    def __init__(self, items: Iterable[tuple[Hashable, frozenset[str]]] = ()) -> None:
+        self._tag_sets: dict[Hashable, frozenset[str]] = {}
+        self._postings: dict[str, set[Hashable]] = {}
+        self._by_set: dict[frozenset[str], Hashable] = {}
+        for key, tag_set in items:
+            self.add(key, tag_set)
+
+    def __len__(self) -> int:
+        return len(self._tag_sets)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._tag_sets
+
+    def keys(self) -> Iterator[Hashable]:
+        return iter(self._tag_sets)
+
+    def tag_set(self, key: Hashable) -> frozenset[str]:
+        return self._tag_sets.get(key, frozenset())
+
+    def add(self, key: Hashable, tag_set: frozenset[str]) -> None:
+        self.discard(key)
+        if not tag_set:
+            return
+        self._tag_sets[key] = tag_set
+        self._by_set.setdefault(tag_set, key)
+        for tag in tag_set:
+            self._postings.setdefault(tag, set()).add(key)
+
+    def discard(self, key: Hashable) -> None:
+        tag_set = self._tag_sets.pop(key, None)
+        if tag_set is None:
+            return
+        if self._by_set.get(tag_set) == key:
+            del self._by_set[tag_set]
+        for tag in tag_set:
+            posting = self._postings.get(tag)
+            if posting is None:
+                continue
+            posting.discard(key)
+            if not posting:
+                del self._postings[tag]
+
+    def posting(self, tag: str) -> set[Hashable]:
+        return self._postings.get(tag, set())
+
+    def hit_counts(self, tags: Iterable[str]) -> dict[Hashable, int]:
+        """태그를 하나라도 공유하는 키마다 겹치는 태그 수를 센다."""
+        counts: dict[Hashable, int] = {}
+        for tag in set(tags):
+            for key in self._postings.get(tag, ()):
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def nearest(self, tags: Iterable[str], k: int = 1) -> list[tuple[Hashable, int]]:
+        """겹치는 태그 수가 많은 순으로 (키, 겹침 수) 를 최대 k 개 돌려준다.
+
+        동률이면 키가 작은 쪽이 앞선다 (키가 값 위치라면 먼저 정의된 값).
+        """
+        counts = self.hit_counts(tags)
+        return heapq.nsmallest(k, counts.items(), key=lambda item: (-item[1], item[0]))
+
+    def find_duplicate(self, tag_set: frozenset[str]) -> Hashable | None:
+        return self._by_set.get(tag_set)
+
+    def find_superset(self, tag_set: frozenset[str]) -> Hashable | None:
+        """tag_set 을 진부분집합으로 포함하는 키 (가장 희귀한 태그의 posting 만 검사)."""
+        if not tag_set:
+            return None
+        postings = [self._postings.get(tag) for tag in tag_set]
+        if any(not posting for posting in postings):
+            return None
+        rarest = min(postings, key=len)
+        size = len(tag_set)
+        for key in rarest:
+            other = self._tag_sets[key]
+            if len(other) > size and tag_set.issubset(other):
+                return key
+        return None
+
+    def find_subset(self, tag_set: frozenset[str]) -> Hashable | None:
+        """tag_set 에 진부분집합으로 포함되는 키."""
+        size = len(tag_set)
+        for key, hits in self.hit_counts(tag_set).items():
+            if hits == len(self._tag_sets[key]) and hits < size:
+                return key
+        return None
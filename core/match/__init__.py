@@ -1,10 +1,20 @@
 from .classify import classify_tags, match_tag_and
+from .partial import (
+    PartialMatchPolicy,
+    PartialVariableMatcher,
+    compile_partial_specs,
+    match_partial_specs,
+)
 from .search import iter_search_results
 from .value_conflicts import detect_value_conflicts, filter_value_conflicts
 
 __all__ = [
     "classify_tags",
     "match_tag_and",
+    "PartialMatchPolicy",
+    "PartialVariableMatcher",
+    "compile_partial_specs",
+    "match_partial_specs",
     "iter_search_results",
     "detect_value_conflicts",
     "filter_value_conflicts",
@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+import threading
 from typing import Iterable
 
 from ..preset.schema import MatchResult, MatchStatus, Variable, VariableMatch
+from .partial import PartialMatchPolicy, PartialVariableMatcher
+
+_PARTIAL_CACHE_LIMIT = 8
+_PARTIAL_CACHE_LOCK = threading.Lock()
+_PARTIAL_CACHE: OrderedDict[tuple, list[PartialVariableMatcher]] = OrderedDict()
 
 
 def _normalize_tag(tag: str) -> str:
@@ -44,14 +51,53 @@ def _match_variable(variable: Variable, tag_set: set[str]) -> VariableMatch:
     )
 
 
+def _partial_matchers(
+    variables: list[Variable],
+    partial: PartialMatchPolicy,
+) -> list[PartialVariableMatcher]:
+    # 이미지마다 역색인을 다시 만들지 않도록 변수 목록 내용 + 기준별로 한 번만 만든다.
+    # Variable 은 편집될 수 있으므로 객체가 아니라 이름/값 태그셋으로 찾는다.
+    key = (
+        partial,
+        tuple(
+            (variable.name, tuple((value.name, value.tag_set()) for value in variable.values))
+            for variable in variables
+        ),
+    )
+    with _PARTIAL_CACHE_LOCK:
+        matchers = _PARTIAL_CACHE.get(key)
+        if matchers is not None:
+            _PARTIAL_CACHE.move_to_end(key)
+            return matchers
+    matchers = [PartialVariableMatcher(name, values, partial) for name, values in key[1]]
+    with _PARTIAL_CACHE_LOCK:
+        _PARTIAL_CACHE[key] = matchers
+        while len(_PARTIAL_CACHE) > _PARTIAL_CACHE_LIMIT:
+            _PARTIAL_CACHE.popitem(last=False)
+    return matchers
+
+
 def classify_tags(
     variables: list[Variable],
     tags: Iterable[str],
     image_path: str | None = None,
+    partial: PartialMatchPolicy | None = None,
 ) -> MatchResult:
     normalized = _normalize_tags(tags)
     tag_set = set(normalized)
-    results = [_match_variable(variable, tag_set) for variable in variables]
+    if partial is None:
+        results = [_match_variable(variable, tag_set) for variable in variables]
+    else:
+        results = []
+        for matcher in _partial_matchers(variables, partial):
+            result = matcher.match(tag_set)
+            results.append(
+                VariableMatch(
+                    variable_name=matcher.name,
+                    status=MatchStatus(result["status"]),
+                    matched_values=result["values"],
+                )
+            )
     return MatchResult(image_path=image_path, variables=results)
 
 
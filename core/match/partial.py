@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from ..index import TagIndex
+
+
+@dataclass(frozen=True)
+class PartialMatchPolicy:
+    """부분 매칭 기준. 값 태그 중 min_tags 개 이상 또는 min_ratio 비율 이상이 있으면 매치로 본다.
+
+    태그가 전부 있는 값은 항상 매치다. 여러 값이 기준을 넘으면 점수(있는 태그 비율)가
+    가장 높은 값이 이기고, 최고 점수가 같은 값이 둘 이상이면 CONFLICT 다.
+    """
+
+    min_tags: int | None = None
+    min_ratio: float | None = None
+
+    def __post_init__(self) -> None:
+        if self.min_tags is None and self.min_ratio is None:
+            raise ValueError("min_tags or min_ratio is required")
+        if self.min_tags is not None and self.min_tags < 1:
+            raise ValueError("min_tags must be >= 1")
+        if self.min_ratio is not None and not 0 < self.min_ratio <= 1:
+            raise ValueError("min_ratio must be in (0, 1]")
+
+    def accepts(self, hits: int, size: int) -> bool:
+        if hits >= size:
+            return True
+        if self.min_tags is not None and hits >= self.min_tags:
+            return True
+        return self.min_ratio is not None and hits >= self.min_ratio * size
+
+    def cache_key(self) -> str:
+        return f"partial:{self.min_tags}:{self.min_ratio}"
+
+
+class PartialVariableMatcher:
+    """변수 하나의 값 태그셋 역색인. 이미지 태그의 posting 만 훑어 값별 적중 수를 센다."""
+
+    def __init__(
+        self,
+        name: str,
+        values: Iterable[tuple[str, frozenset[str]]],
+        policy: PartialMatchPolicy,
+    ) -> None:
+        self.name = name
+        self.policy = policy
+        self.value_names: list[str] = []
+        self.sizes: list[int] = []
+        items: list[tuple[int, frozenset[str]]] = []
+        for pos, (value_name, tag_set) in enumerate(values):
+            self.value_names.append(value_name)
+            self.sizes.append(len(tag_set))
+            items.append((pos, tag_set))
+        self.index = TagIndex(items)
+
+    @classmethod
+    def from_spec(cls, spec: dict[str, Any], policy: PartialMatchPolicy) -> "PartialVariableMatcher":
+        return cls(
+            str(spec.get("name") or ""),
+            (
+                (str(value.get("name") or ""), frozenset(value.get("tag_set") or ()))
+                for value in spec.get("values", [])
+            ),
+            policy,
+        )
+
+    def match_positions(self, tag_set: set[str]) -> list[int]:
+        """가장 높은 점수로 기준을 넘은 값들의 위치 (정의 순서)."""
+        best_score = 0.0
+        best: list[int] = []
+        for pos, hits in self.index.hit_counts(tag_set).items():
+            size = self.sizes[pos]
+            if not self.policy.accepts(hits, size):
+                continue
+            score = hits / size
+            if score > best_score:
+                best_score = score
+                best = [pos]
+            elif score == best_score:
+                best.append(pos)
+        return sorted(best)
+
+    def match(self, tag_set: set[str]) -> dict[str, Any]:
+        matched = [self.value_names[pos] for pos in self.match_positions(tag_set)]
+        if not matched:
+            status = "UNKNOWN"
+        elif len(matched) == 1:
+            status = "OK"
+        else:
+            status = "CONFLICT"
+        return {"status": status, "values": matched}
+
+
+def compile_partial_specs(
+    variable_specs: list[dict[str, Any]],
+    policy: PartialMatchPolicy,
+) -> list[PartialVariableMatcher]:
+    return [PartialVariableMatcher.from_spec(spec, policy) for spec in variable_specs]
+
+
+def match_partial_specs(
+    matchers: list[PartialVariableMatcher],
+    tag_set: set[str],
+) -> dict[str, dict[str, Any]]:
+    return {matcher.name: matcher.match(tag_set) for matcher in matchers}
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Iterable
 
+from ..index import find_duplicate_pairs, iter_subset_pairs
 from ..preset.schema import VariableValue
 
 
@@ -18,36 +19,12 @@ class ConflictSummary:
 
 
 def detect_value_conflicts(values: Iterable[VariableValue]) -> ConflictSummary:
-    values_list = list(values)
-    tag_sets: dict[frozenset[str], int] = {}
-    entries: list[tuple[int, frozenset[str]]] = []
-    duplicate_pairs: list[tuple[int, int]] = []
-    duplicate_indices: set[int] = set()
-
-    for idx, value in enumerate(values_list):
-        tag_set = value.tag_set()
-        if not tag_set:
-            continue
-        if tag_set in tag_sets:
-            other_idx = tag_sets[tag_set]
-            duplicate_pairs.append((idx, other_idx))
-            duplicate_indices.add(idx)
-            continue
-        tag_sets[tag_set] = idx
-        entries.append((idx, tag_set))
-
-    entries.sort(key=lambda item: len(item[1]))
-    subset_pairs: list[tuple[int, int]] = []
-    subset_indices: set[int] = set()
-
-    for pos, (idx, set_a) in enumerate(entries):
-        for other_idx, set_b in entries[pos + 1 :]:
-            if set_a.issubset(set_b):
-                subset_pairs.append((idx, other_idx))
-                subset_indices.add(idx)
-                break
-
-    removed_indices = duplicate_indices | subset_indices
+    tag_sets = [value.tag_set() for value in values]
+    duplicate_pairs = find_duplicate_pairs(tag_sets)
+    subset_pairs = list(iter_subset_pairs(tag_sets))
+    removed_indices = {idx for idx, _other in duplicate_pairs} | {
+        idx for idx, _other in subset_pairs
+    }
     return ConflictSummary(
         duplicate_pairs=duplicate_pairs,
         subset_pairs=subset_pairs,
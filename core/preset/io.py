@@ -13,6 +13,9 @@ def load_preset(path: str | Path) -> Preset:
 
 
 def save_preset(path: str | Path, preset: Preset) -> None:
+    payload = preset.model_dump()
+    # 편집기는 값 단위로만 검사하므로 파일로 내보내기 전에 전체 스키마를 검증한다.
+    Preset.model_validate(payload)
     with open(path, "w", encoding="utf-8") as handle:
-        json.dump(preset.model_dump(), handle, ensure_ascii=False, indent=2)
+        json.dump(payload, handle, ensure_ascii=False, indent=2)
         handle.write("\n")
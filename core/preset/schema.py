@@ -6,6 +6,8 @@ from typing import Iterable
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
+from ..index import find_duplicate_pairs, iter_subset_pairs
+
 
 _SPACE_RE = re.compile(r"\s+")
 
@@ -96,27 +98,21 @@ class Variable(BaseModel):
 
     @model_validator(mode="after")
     def _validate_value_sets(self) -> "Variable":
-        tag_sets: dict[frozenset[str], str] = {}
-        entries: list[tuple[str, frozenset[str]]] = []
-
-        for item in self.values:
-            tag_set = item.tag_set()
-            if not tag_set:
-                continue
-            if tag_set in tag_sets:
-                raise ValueError(
-                    f"duplicate tag sets: '{item.name}' and '{tag_sets[tag_set]}'"
-                )
-            tag_sets[tag_set] = item.name
-            entries.append((item.name, tag_set))
-
-        entries.sort(key=lambda entry: len(entry[1]))
-        for idx, (name_a, set_a) in enumerate(entries):
-            for name_b, set_b in entries[idx + 1 :]:
-                if set_a.issubset(set_b):
-                    raise ValueError(
-                        f"subset tag sets are not allowed: '{name_a}' subset of '{name_b}'"
-                    )
+        tag_sets = [item.tag_set() for item in self.values]
+        duplicates = find_duplicate_pairs(tag_sets)
+        if duplicates:
+            idx, other_idx = duplicates[0]
+            raise ValueError(
+                f"duplicate tag sets: '{self.values[idx].name}' and '{self.values[other_idx].name}'"
+            )
+
+        subset = next(iter_subset_pairs(tag_sets), None)
+        if subset is not None:
+            idx, other_idx = subset
+            raise ValueError(
+                "subset tag sets are not allowed: "
+                f"'{self.values[idx].name}' subset of '{self.values[other_idx].name}'"
+            )
 
         return self
 
@@ -1,4 +1,38 @@
+from .autotune import (
+    PoolAutotuner,
+    TuningDecision,
+    iter_tuned_batches,
+    iter_tuned_results,
+    iter_tuned_rows,
+)
+from .compact import CompactBatch, CompiledTemplate, DictRow, MatchRow
+from .handlers import TaskReporter, consume_results, move_result, rename_result
+from .journal import OperationJournal
+from .match_cache import (
+    CachedMatcher,
+    MatchCache,
+    tag_set_id,
+    template_fingerprint,
+    variable_spec_fingerprint,
+)
+from .pipeline import ByteBudget, iter_prefetched_results, iter_prefetched_tags
+from .pool import WorkerPool, get_worker_pool, shutdown_worker_pool, template_key
+from .shards import (
+    JobIncompleteError,
+    ShardLease,
+    claim_shard,
+    create_job,
+    iter_job_rows,
+    job_status,
+    load_job,
+    merge_job_task,
+    process_shard,
+    reclaim_stale_leases,
+    run_shard_worker,
+    wait_for_job,
+)
 from .tasks import move_task, rename_task, search_task, strip_suffix_task
+from .undo import UndoLog, iter_undo_logs, read_undo_log
 from .worker import build_variable_specs, init_worker, match_variable_specs, process_image
 
 __all__ = [
@@ -6,6 +40,47 @@ __all__ = [
     "init_worker",
     "match_variable_specs",
     "process_image",
+    "OperationJournal",
+    "UndoLog",
+    "iter_undo_logs",
+    "read_undo_log",
+    "CachedMatcher",
+    "MatchCache",
+    "tag_set_id",
+    "template_fingerprint",
+    "variable_spec_fingerprint",
+    "WorkerPool",
+    "PoolAutotuner",
+    "TuningDecision",
+    "iter_tuned_results",
+    "iter_tuned_batches",
+    "iter_tuned_rows",
+    "CompactBatch",
+    "CompiledTemplate",
+    "DictRow",
+    "MatchRow",
+    "TaskReporter",
+    "consume_results",
+    "rename_result",
+    "move_result",
+    "ByteBudget",
+    "iter_prefetched_results",
+    "iter_prefetched_tags",
+    "get_worker_pool",
+    "shutdown_worker_pool",
+    "template_key",
+    "JobIncompleteError",
+    "ShardLease",
+    "claim_shard",
+    "create_job",
+    "iter_job_rows",
+    "job_status",
+    "load_job",
+    "merge_job_task",
+    "process_shard",
+    "reclaim_stale_leases",
+    "run_shard_worker",
+    "wait_for_job",
     "rename_task",
     "move_task",
     "strip_suffix_task",
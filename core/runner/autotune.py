@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+import math
+import multiprocessing
+import queue
+import statistics
+import time
+from typing import Any, Iterable, Iterator
+
+from ..match.partial import PartialMatchPolicy
+from .compact import CompactBatch, CompiledTemplate, MatchRow
+from .pool import CancelEvent, WorkerPool, wait_completed
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TuningDecision:
+    processes: int
+    chunksize: int
+    file_latency: float
+    io_ratio: float
+    queue_wait: float
+    batch_overhead: float
+
+
+class PoolAutotuner:
+    """sample_files 개 파일마다 배치 측정값으로 작업이 쓸 워커 수와 배치 크기를 정한다.
+
+    - 파일당 지연(워커 벽시계 시간)과 배치당 고정 비용(디스패치 + 결과 전송)을 비교해
+      고정 비용이 처리 시간의 overhead_budget 이하가 되도록 배치 크기를 잡는다.
+    - 워커 CPU 시간/벽시계 시간 비율로 I/O 대기 비중을 추정해, I/O 대기가 길수록
+      (NAS 등) 코어 수보다 많은 워커를 원한다. 실제로 쓰는 수는 풀 크기를 넘지 않는다.
+    """
+
+    def __init__(
+        self,
+        sample_files: int = 256,
+        initial_chunksize: int = 4,
+        max_chunksize: int = 256,
+        max_processes: int | None = None,
+        overhead_budget: float = 0.05,
+    ) -> None:
+        cpu_count = multiprocessing.cpu_count() or 2
+        self.sample_files = sample_files
+        self.initial_chunksize = max(1, initial_chunksize)
+        self.max_chunksize = max(1, max_chunksize)
+        self.max_processes = max_processes or cpu_count * 4
+        self.overhead_budget = overhead_budget
+        self._cpu_count = cpu_count
+        self.reset()
+
+    def reset(self) -> None:
+        """측정 구간을 새로 시작한다. 결정 뒤에 부르면 다음 sample_files 개로 다시 정한다."""
+        self._files = 0
+        self._wall = 0.0
+        self._cpu = 0.0
+        self._queue_waits: list[float] = []
+        self._return_costs: list[float] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._files >= self.sample_files
+
+    def record(
+        self,
+        files: int,
+        wall: float,
+        cpu: float,
+        queue_wait: float,
+        return_cost: float,
+    ) -> None:
+        if files <= 0:
+            return
+        self._files += files
+        self._wall += wall
+        self._cpu += cpu
+        self._queue_waits.append(max(0.0, queue_wait))
+        self._return_costs.append(max(0.0, return_cost))
+
+    def decide(self) -> TuningDecision:
+        files = max(1, self._files)
+        file_latency = self._wall / files
+        io_ratio = 0.0
+        if self._wall > 0:
+            io_ratio = min(0.9, max(0.0, 1.0 - self._cpu / self._wall))
+        queue_wait = statistics.median(self._queue_waits) if self._queue_waits else 0.0
+        # 가장 짧은 대기는 워커가 놀고 있을 때의 순수 디스패치 비용에 가깝다.
+        dispatch = min(self._queue_waits) if self._queue_waits else 0.0
+        returned = statistics.median(self._return_costs) if self._return_costs else 0.0
+        batch_overhead = dispatch + returned
+
+        if file_latency > 0:
+            chunksize = math.ceil(batch_overhead / (self.overhead_budget * file_latency))
+        else:
+            chunksize = self.max_chunksize
+        chunksize = min(self.max_chunksize, max(1, chunksize))
+        processes = round(self._cpu_count / (1.0 - io_ratio))
+        processes = min(self.max_processes, max(1, processes))
+        return TuningDecision(
+            processes=processes,
+            chunksize=chunksize,
+            file_latency=file_latency,
+            io_ratio=io_ratio,
+            queue_wait=queue_wait,
+            batch_overhead=batch_overhead,
+        )
+
+
+def iter_tuned_batches(
+    pool: WorkerPool,
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    paths: list[str],
+    *,
+    partial: PartialMatchPolicy | None = None,
+    tuner: PoolAutotuner | None = None,
+    chunksize: int | None = None,
+    cancel_event: CancelEvent | None = None,
+) -> Iterator[CompactBatch]:
+    """paths 를 연속 구간 배치로 보내 CompactBatch 를 완료 순서대로 내보낸다.
+
+    표본 구간이 끝날 때마다 배치 크기와 이 작업이 쓸 워커 수를 다시 정한다. 워커 수는
+    동시에 보내 둘 배치 수(창)로만 반영하고 풀 크기는 바꾸지 않으므로, 같은 풀을 쓰는
+    다른 작업에 영향을 주지 않는다. chunksize 를 주면 그 크기로 고정하고 조정하지 않는다.
+    cancel_event 가 설정되거나 소비자가 멈추면 새 배치를 보내지 않는다. 이미 보낸 배치는
+    풀에서 끝까지 실행되고 결과는 이 작업의 완료 큐와 함께 버려진다.
+    """
+    fixed = chunksize is not None
+    tuner = tuner or PoolAutotuner()
+    key = pool.load_template(variable_specs, include_negative, partial)
+    variable_count = len(variable_specs)
+    completed: queue.Queue = queue.Queue()
+    chunksize = max(1, chunksize) if fixed else tuner.initial_chunksize
+    workers = pool.processes
+    position = 0
+    in_flight = 0
+    decision: TuningDecision | None = None
+
+    def submit(start: int, batch: list[str]) -> None:
+        submitted_at = time.time()
+        pool.submit_batch(
+            key,
+            start,
+            batch,
+            callback=lambda payload: completed.put(
+                (start, len(batch), submitted_at, time.time(), payload, None)
+            ),
+            error_callback=lambda exc: completed.put(
+                (start, len(batch), submitted_at, time.time(), None, exc)
+            ),
+        )
+
+    while position < len(paths) or in_flight:
+        # 워커마다 배치 하나를 처리하는 동안 다음 배치 하나를 대기열에 둔다.
+        while (
+            position < len(paths)
+            and in_flight < min(workers, pool.processes) * 2
+            and not (cancel_event is not None and cancel_event.is_set())
+        ):
+            batch = paths[position : position + chunksize]
+            submit(position, batch)
+            position += len(batch)
+            in_flight += 1
+
+        item = wait_completed(completed, cancel_event)
+        if item is None:
+            return
+        start, size, submitted_at, completed_at, payload, exc = item
+        in_flight -= 1
+        if exc is not None:
+            yield CompactBatch.failed(start, size, variable_count, str(exc))
+        else:
+            result, wall, cpu, started_at = payload
+            tuner.record(
+                result.size,
+                wall,
+                cpu,
+                started_at - submitted_at,
+                completed_at - started_at - wall,
+            )
+            yield result
+
+        if not fixed and tuner.ready:
+            previous, decision = decision, tuner.decide()
+            tuner.reset()
+            chunksize = decision.chunksize
+            workers = decision.processes
+            if previous is None or (previous.processes, previous.chunksize) != (
+                decision.processes,
+                decision.chunksize,
+            ):
+                _logger.info(
+                    "autotune: processes=%d (pool %d) chunksize=%d latency=%.1fms "
+                    "io_ratio=%.2f queue_wait=%.1fms batch_overhead=%.1fms",
+                    decision.processes,
+                    pool.processes,
+                    decision.chunksize,
+                    decision.file_latency * 1000,
+                    decision.io_ratio,
+                    decision.queue_wait * 1000,
+                    decision.batch_overhead * 1000,
+                )
+
+
+def iter_tuned_rows(
+    pool: WorkerPool,
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    image_paths: Iterable[str],
+    **kwargs: Any,
+) -> Iterator[MatchRow]:
+    paths = list(image_paths)
+    template = CompiledTemplate(variable_specs)
+    for batch in iter_tuned_batches(pool, variable_specs, include_negative, paths, **kwargs):
+        yield from batch.rows(paths, template)
+
+
+def iter_tuned_results(
+    pool: WorkerPool,
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    image_paths: Iterable[str],
+    **kwargs: Any,
+) -> Iterator[dict[str, Any]]:
+    """iter_tuned_batches 결과를 process_image 와 같은 dict 로 풀어서 내보낸다."""
+    for row in iter_tuned_rows(pool, variable_specs, include_negative, image_paths, **kwargs):
+        yield row.to_dict()
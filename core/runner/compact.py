@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from array import array
+from typing import Any, Iterator
+
+STATUS_UNKNOWN = 0
+STATUS_OK = 1
+STATUS_CONFLICT = 2
+STATUS_NAMES = ("UNKNOWN", "OK", "CONFLICT")
+
+
+class CompiledTemplate:
+    """부모 쪽에서 값 위치를 이름으로 되돌리기 위한 variable_specs 요약."""
+
+    def __init__(self, variable_specs: list[dict[str, Any]]) -> None:
+        self.variable_names = [str(spec.get("name") or "") for spec in variable_specs]
+        self.value_names = [
+            [str(value.get("name") or "") for value in spec.get("values", [])]
+            for spec in variable_specs
+        ]
+        self.positions = {name: pos for pos, name in enumerate(self.variable_names)}
+
+
+class CompactBatch:
+    """연속된 경로 구간 하나의 매치 결과.
+
+    경로 대신 디스패치한 경로 목록의 시작 위치만, 상태는 (이미지 × 변수) 크기의
+    바이트열로, 값은 첫 번째로 매치된 값의 위치(없으면 -1)로 보낸다.
+    CONFLICT 인 칸의 전체 값 위치와 이미지 단위 오류만 희소 dict 로 둔다.
+    """
+
+    __slots__ = ("start", "size", "variable_count", "codes", "values", "conflicts", "errors")
+
+    def __init__(
+        self,
+        start: int,
+        size: int,
+        variable_count: int,
+        codes: bytes,
+        values: array,
+        conflicts: dict[int, tuple[int, ...]],
+        errors: dict[int, str],
+    ) -> None:
+        self.start = start
+        self.size = size
+        self.variable_count = variable_count
+        self.codes = codes
+        self.values = values
+        self.conflicts = conflicts
+        self.errors = errors
+
+    def __reduce__(self):
+        return (
+            CompactBatch,
+            (
+                self.start,
+                self.size,
+                self.variable_count,
+                self.codes,
+                self.values,
+                self.conflicts,
+                self.errors,
+            ),
+        )
+
+    @classmethod
+    def encode(
+        cls,
+        start: int,
+        outcomes: list[list[list[int]] | str],
+        variable_count: int,
+    ) -> "CompactBatch":
+        """outcomes: 이미지마다 변수별 매치 값 위치 목록, 또는 오류 메시지."""
+        codes = bytearray(len(outcomes) * variable_count)
+        values = array("i", [-1]) * (len(outcomes) * variable_count)
+        conflicts: dict[int, tuple[int, ...]] = {}
+        errors: dict[int, str] = {}
+        for row, outcome in enumerate(outcomes):
+            if isinstance(outcome, str):
+                errors[row] = outcome
+                continue
+            base = row * variable_count
+            for var_pos, positions in enumerate(outcome):
+                if not positions:
+                    continue
+                cell = base + var_pos
+                values[cell] = positions[0]
+                if len(positions) == 1:
+                    codes[cell] = STATUS_OK
+                else:
+                    codes[cell] = STATUS_CONFLICT
+                    conflicts[cell] = tuple(positions)
+        return cls(start, len(outcomes), variable_count, bytes(codes), values, conflicts, errors)
+
+    @classmethod
+    def failed(cls, start: int, size: int, variable_count: int, message: str) -> "CompactBatch":
+        return cls(
+            start,
+            size,
+            variable_count,
+            bytes(size * variable_count),
+            array("i", [-1]) * (size * variable_count),
+            {},
+            {row: message for row in range(size)},
+        )
+
+    def rows(self, paths: list[str], template: CompiledTemplate) -> Iterator["MatchRow"]:
+        for row in range(self.size):
+            yield MatchRow(self, row, paths[self.start + row], template)
+
+
+class MatchRow:
+    """CompactBatch 의 한 줄을 dict 로 풀지 않고 조회한다."""
+
+    __slots__ = ("_batch", "_row", "path", "_template")
+
+    def __init__(
+        self,
+        batch: CompactBatch,
+        row: int,
+        path: str,
+        template: CompiledTemplate,
+    ) -> None:
+        self._batch = batch
+        self._row = row
+        self.path = path
+        self._template = template
+
+    @property
+    def error(self) -> str | None:
+        return self._batch.errors.get(self._row)
+
+    def _cell(self, variable_name: str) -> int | None:
+        var_pos = self._template.positions.get(variable_name)
+        if var_pos is None or self._row in self._batch.errors:
+            return None
+        return self._row * self._batch.variable_count + var_pos
+
+    def status(self, variable_name: str) -> str:
+        cell = self._cell(variable_name)
+        if cell is None:
+            return "UNKNOWN"
+        return STATUS_NAMES[self._batch.codes[cell]]
+
+    def values(self, variable_name: str) -> list[str]:
+        cell = self._cell(variable_name)
+        if cell is None or self._batch.values[cell] < 0:
+            return []
+        names = self._template.value_names[self._template.positions[variable_name]]
+        positions = self._batch.conflicts.get(cell) or (self._batch.values[cell],)
+        return [names[pos] for pos in positions]
+
+    def first_value(self, variable_name: str) -> str:
+        values = self.values(variable_name)
+        return values[0] if values else ""
+
+    def to_dict(self) -> dict[str, Any]:
+        """process_image 와 같은 모양의 dict."""
+        if self.error is not None:
+            return {"path": self.path, "matches": {}, "error": self.error}
+        matches = {
+            name: {"status": self.status(name), "values": self.values(name)}
+            for name in self._template.variable_names
+        }
+        return {"path": self.path, "matches": matches, "error": None}
+
+
+class DictRow:
+    """process_image dict 결과를 MatchRow 와 같은 방식으로 조회한다."""
+
+    __slots__ = ("_result", "path", "error")
+
+    def __init__(self, result: dict[str, Any]) -> None:
+        self._result = result
+        self.path = result.get("path")
+        self.error = result.get("error") or None
+
+    def status(self, variable_name: str) -> str:
+        match = self._result.get("matches", {}).get(variable_name)
+        return (match or {}).get("status") or "UNKNOWN"
+
+    def values(self, variable_name: str) -> list[str]:
+        match = self._result.get("matches", {}).get(variable_name)
+        return list((match or {}).get("values") or [])
+
+    def first_value(self, variable_name: str) -> str:
+        values = self.values(variable_name)
+        return values[0] if values else ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return self._result
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import queue
+from typing import Callable, Iterator
+
+from core.utils import (
+    NameIndex,
+    ProgressThrottle,
+    ensure_unique_name,
+    move_file,
+    render_template,
+    sanitize_filename,
+    target_exists,
+)
+from .compact import DictRow, MatchRow
+from .pool import CancelEvent
+
+
+class TaskReporter:
+    """결과를 out_queue 로 보내면서 상태별 개수를 세고, 진행 이벤트를 제한된 빈도로 보낸다."""
+
+    def __init__(self, out_queue: "queue.Queue", total: int, interval: float) -> None:
+        self.out_queue = out_queue
+        self.throttle = ProgressThrottle(total, interval)
+        self.processed = 0
+        self.ok = 0
+        self.errors = 0
+
+    def result(self, status: str, payload: dict) -> None:
+        self.out_queue.put(("result", status, payload))
+        self.processed += 1
+        if status == "OK":
+            self.ok += 1
+        elif status == "ERROR":
+            self.errors += 1
+        if self.throttle.ready(self.processed):
+            self.progress()
+
+    def progress(self) -> None:
+        self.out_queue.put(
+            (
+                "progress",
+                self.processed,
+                self.throttle.total,
+                self.ok,
+                self.errors,
+                self.throttle.rate(self.processed),
+            )
+        )
+
+    def cancelled(self) -> None:
+        self.progress()
+        self.out_queue.put(("cancelled", self.processed, self.throttle.total))
+
+
+def consume_results(
+    results: Iterator[MatchRow | DictRow],
+    reporter: TaskReporter,
+    handle: Callable[[MatchRow | DictRow], tuple[str, dict]],
+    cancel_event: CancelEvent | None,
+) -> None:
+    try:
+        for row in results:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            status, payload = handle(row)
+            reporter.result(status, payload)
+    finally:
+        results.close()
+    if cancel_event is not None and cancel_event.is_set():
+        reporter.cancelled()
+
+
+def rename_result(
+    row: MatchRow | DictRow,
+    order: list[str],
+    template: str,
+    prefix_mode: bool,
+    dry_run: bool,
+    reserved: NameIndex,
+) -> tuple[str, dict]:
+    path = row.path
+    if row.error:
+        return "ERROR", {"source": path, "target": None, "message": str(row.error)}
+
+    values_map: dict[str, str] = {}
+    for key in order:
+        status = row.status(key)
+        if status != "OK":
+            status = "CONFLICT" if status == "CONFLICT" else "UNKNOWN"
+            return status, {"source": path, "target": None, "message": None}
+        values_map[key] = row.first_value(key)
+
+    base_name = render_template(template, values_map)
+    base_name = sanitize_filename(base_name)
+    if prefix_mode:
+        stem = Path(path).stem
+        if base_name:
+            joiner = "" if base_name.endswith("_") else "_"
+            base_name = f"{base_name}{joiner}{stem}"
+        else:
+            base_name = stem
+
+    ext = Path(path).suffix
+    new_name = ensure_unique_name(Path(path).parent, base_name, ext, reserved)
+    target = str(Path(path).with_name(new_name))
+    if not dry_run and target != path:
+        # 이름은 폴더를 읽은 시점 기준이므로, 그 뒤에 생긴 파일은 덮어쓰지 않는다.
+        if target_exists(path, target):
+            return "ERROR", {"source": path, "target": None, "message": "target exists"}
+        try:
+            os.rename(path, target)
+        except Exception as exc:
+            return "ERROR", {"source": path, "target": None, "message": str(exc)}
+    return "OK", {"source": path, "target": target, "message": None}
+
+
+def move_result(
+    row: MatchRow | DictRow,
+    variable_name: str,
+    template: str,
+    target_root: str,
+    dry_run: bool,
+    reserved: NameIndex,
+) -> tuple[str, dict]:
+    path = row.path
+    if row.error:
+        return "ERROR", {"source": path, "target": None, "message": str(row.error)}
+
+    status = row.status(variable_name)
+    if status != "OK":
+        return status, {"source": path, "target": None, "message": None}
+
+    value_name = row.first_value(variable_name)
+    folder_name = render_template(template, {"value": value_name})
+    folder_name = sanitize_filename(folder_name)
+    if not folder_name:
+        return "ERROR", {"source": path, "target": None, "message": "empty folder name"}
+
+    target_folder = str(Path(target_root) / folder_name)
+    ext = Path(path).suffix
+    base = Path(path).stem
+    new_name = ensure_unique_name(target_folder, base, ext, reserved)
+    target = str(Path(target_folder) / new_name)
+
+    if not dry_run:
+        if target_exists(path, target):
+            return "ERROR", {"source": path, "target": None, "message": "target exists"}
+        try:
+            reserved.ensure_folder(target_folder)
+            move_file(path, target)
+        except Exception as exc:
+            return "ERROR", {"source": path, "target": None, "message": str(exc)}
+    return "OK", {"source": path, "target": target, "message": None}
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Iterable, Iterator
+
+JOURNAL_VERSION = 1
+DEFAULT_SYNC_EVERY = 256
+
+# 한 줄에 JSON 하나. 첫 줄은 header, 이후는 아래 중 하나:
+#   {"op": "plan", "source", "target"}     파일 작업 직전. 작업보다 먼저 디스크에 닿는다.
+#   {"op": "done", "source", "target"}     파일 작업 완료 (target == source 면 이름이 이미 맞았던 것)
+#   {"op": "skip", "source", "status", "message"}   UNKNOWN/CONFLICT 등 작업 없이 끝난 파일
+#   {"op": "error", "source", "message"}   실패. 재개 시 다시 시도한다.
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class OperationJournal:
+    """rename/move 실행의 append-only 기록.
+
+    plan 은 batch 단위로 모아 fsync 한 뒤에 실제 파일 작업을 하고, 나머지 기록은
+    sync_every 줄마다 fsync 한다. 같은 경로로 다시 열면 기존 기록을 읽어서
+    완료된 파일과 이미 쓰인 대상 이름을 돌려주므로 중단된 실행을 이어서 할 수 있다.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        kind: str,
+        params: dict[str, Any],
+        *,
+        sync_every: int = DEFAULT_SYNC_EVERY,
+    ) -> None:
+        self.path = Path(path)
+        self.kind = kind
+        self.params = params
+        self.sync_every = max(1, sync_every)
+        self.done: dict[str, str] = {}
+        self.skipped: dict[str, str] = {}
+        self.recovered = 0
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        planned = self._load() if self.path.exists() else None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.path, "a", encoding="utf-8", newline="\n")
+        if planned is not None and not self._ends_with_newline():
+            self._handle.write("\n")
+        if not self.path.stat().st_size:
+            self._write({"op": "header", "version": JOURNAL_VERSION, "kind": kind, "params": params})
+        self._recover(planned or {})
+        self.sync()
+
+    @staticmethod
+    def read_header(path: str | Path) -> dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as handle:
+            header = json.loads(handle.readline())
+        if header.get("op") != "header" or header.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"not a journal file: {path}")
+        return header
+
+    def _load(self) -> dict[str, str]:
+        header = self.read_header(self.path)
+        if header.get("kind") != self.kind or header.get("params") != self.params:
+            raise ValueError(f"journal belongs to a different run: {self.path}")
+        planned: dict[str, str] = {}
+        with open(self.path, "r", encoding="utf-8") as handle:
+            next(handle)
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 마지막 줄이 쓰다 만 채로 끊긴 경우다.
+                    continue
+                op = entry.get("op")
+                source = entry.get("source") or ""
+                if op == "plan":
+                    planned[source] = entry.get("target") or ""
+                elif op == "done":
+                    planned.pop(source, None)
+                    self.done[source] = entry.get("target") or source
+                elif op == "skip":
+                    self.skipped[source] = str(entry.get("status") or "")
+                elif op == "error":
+                    planned.pop(source, None)
+        return planned
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            if not handle.tell():
+                return True
+            handle.seek(-1, os.SEEK_END)
+            return handle.read(1) == b"\n"
+
+    def _recover(self, planned: dict[str, str]) -> None:
+        # plan 만 있고 done 이 없는 작업은 실제 파일 상태로 판단한다.
+        for source, target in planned.items():
+            if target and not os.path.exists(source) and os.path.exists(target):
+                self.mark_done(source, target)
+                self.recovered += 1
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        self._handle.write(json.dumps(entry, ensure_ascii=False))
+        self._handle.write("\n")
+        self._unsynced += 1
+
+    def _maybe_sync(self) -> None:
+        if self._unsynced >= self.sync_every:
+            self._sync_locked()
+
+    def _sync_locked(self) -> None:
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._unsynced = 0
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def plan_many(self, operations: Iterable[tuple[str, str]]) -> None:
+        """파일 작업 전에 호출한다. 반환 시점에 plan 이 디스크에 기록돼 있다."""
+        with self._lock:
+            for source, target in operations:
+                self._write({"op": "plan", "source": source, "target": target})
+            self._sync_locked()
+
+    def mark_done(self, source: str, target: str) -> None:
+        with self._lock:
+            self._write({"op": "done", "source": source, "target": target})
+            self.done[source] = target
+            self._maybe_sync()
+
+    def mark_skipped(self, source: str, status: str, message: str | None) -> None:
+        with self._lock:
+            self._write({"op": "skip", "source": source, "status": status, "message": message})
+            self.skipped[source] = status
+            self._maybe_sync()
+
+    def mark_failed(self, source: str, message: str) -> None:
+        with self._lock:
+            self._write({"op": "error", "source": source, "message": message})
+            self._maybe_sync()
+
+    def completed_paths(self) -> set[str]:
+        """재개 시 건너뛸 경로(정규화). 완료된 원본과 그 결과 파일, 작업 없이 끝난 파일."""
+        paths = {_norm(path) for path in self.skipped}
+        for source, target in self.done.items():
+            paths.add(_norm(source))
+            paths.add(_norm(target))
+        return paths
+
+    def pending_paths(self, paths: Iterable[str]) -> list[str]:
+        return list(self.iter_pending_paths(paths))
+
+    def iter_pending_paths(self, paths: Iterable[str]) -> Iterator[str]:
+        """pending_paths 와 같지만 paths 를 하나씩 읽으며 거른다(스캔 결과를 그대로 넘길 때)."""
+        completed = self.completed_paths()
+        for path in paths:
+            if _norm(path) not in completed:
+                yield path
+
+    def done_targets(self) -> list[str]:
+        return list(self.done.values())
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle.closed:
+                return
+            self._sync_locked()
+            self._handle.close()
+
+    def __enter__(self) -> "OperationJournal":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
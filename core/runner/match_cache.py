@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+from ..match.partial import PartialMatchPolicy, PartialVariableMatcher
+from .worker import match_variable_spec, normalize_tag_set
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_results (
+    variable_fp TEXT NOT NULL,
+    tagset_id TEXT NOT NULL,
+    variable_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    match_values TEXT NOT NULL,
+    used_at INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (variable_fp, tagset_id)
+)
+"""
+_INDEX = "CREATE INDEX IF NOT EXISTS match_results_used_at ON match_results (used_at)"
+_FLUSH_THRESHOLD = 2000
+# 메모리에 올려 두는 fingerprint 표 수. 넘치면 가장 오래 안 쓴 표부터 내린다(sqlite 에는 남는다).
+_MEMORY_TABLE_LIMIT = 256
+# 같은 fingerprint 의 사용 시각은 이 간격보다 자주 갱신하지 않는다.
+_TOUCH_INTERVAL = 24 * 60 * 60
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def variable_spec_fingerprint(spec: dict[str, Any]) -> str:
+    # 값 순서는 매치 결과(values) 순서에 영향을 주므로 그대로 유지하고, 태그만 정렬한다.
+    payload = [
+        str(spec.get("name") or ""),
+        [
+            [str(value.get("name") or ""), sorted(value.get("tag_set") or ())]
+            for value in spec.get("values", [])
+        ],
+    ]
+    encoded = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def template_fingerprint(variable_specs: Iterable[dict[str, Any]]) -> str:
+    joined = ",".join(variable_spec_fingerprint(spec) for spec in variable_specs)
+    return hashlib.blake2b(joined.encode("ascii"), digest_size=16).hexdigest()
+
+
+def tag_set_id(tag_set: Iterable[str]) -> str:
+    joined = "\x1f".join(sorted(tag_set))
+    return hashlib.blake2b(joined.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class MatchCache:
+    """(변수 fingerprint, 태그셋 id) 단위로 매치 결과를 보관하는 캐시.
+
+    path 를 주면 sqlite 파일에 영구 저장하고, 없으면 프로세스 메모리에만 둔다.
+    변수 하나를 수정하면 그 변수의 fingerprint 만 바뀌므로 다른 변수의 결과는 그대로 재사용된다.
+    다른 템플릿이나 매칭 모드의 결과도 fingerprint 가 다르므로 함께 남는다. 영구 저장된 결과는
+    fingerprint 단위로 마지막 사용 시각을 기록하고, max_age 초 넘게 쓰지 않은 것만 열 때 지운다.
+    """
+
+    def __init__(self, path: str | Path | None = None, *, max_age: float = DEFAULT_MAX_AGE) -> None:
+        if path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self.path = str(path)
+        else:
+            self.path = ":memory:"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+            self._migrate()
+            self._conn.execute(_INDEX)
+            self._conn.execute(
+                "DELETE FROM match_results WHERE used_at < ?",
+                (int(time.time() - max_age),),
+            )
+        self._entries: "OrderedDict[str, dict[str, tuple[str, tuple[str, ...]]]]" = OrderedDict()
+        self._touched: set[str] = set()
+        self._pending: list[tuple[str, str, str, str, str, int]] = []
+
+    def _migrate(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(match_results)")}
+        if "used_at" not in columns:
+            # 사용 시각이 없던 캐시 파일은 지금 쓴 것으로 보고 유지한다.
+            self._conn.execute(
+                "ALTER TABLE match_results ADD COLUMN used_at INTEGER NOT NULL DEFAULT 0"
+            )
+            self._conn.execute("UPDATE match_results SET used_at = ?", (int(time.time()),))
+
+    def bind(
+        self,
+        variable_specs: list[dict[str, Any]],
+        partial: PartialMatchPolicy | None = None,
+    ) -> "CachedMatcher":
+        fingerprints = [variable_spec_fingerprint(spec) for spec in variable_specs]
+        if partial is not None:
+            # 부분 매칭 결과는 기준마다 다르므로 fingerprint 에 기준을 섞는다.
+            fingerprints = [
+                hashlib.blake2b(
+                    f"{fp}|{partial.cache_key()}".encode("ascii"), digest_size=16
+                ).hexdigest()
+                for fp in fingerprints
+            ]
+        with self._lock:
+            for fp in fingerprints:
+                self._activate(fp)
+        return CachedMatcher(self, variable_specs, fingerprints, partial)
+
+    def _activate(self, fp: str) -> None:
+        # bind 는 읽기만 한다. 사용 시각 갱신은 flush 때 모아서 쓴다.
+        self._touched.add(fp)
+        if fp in self._entries:
+            self._entries.move_to_end(fp)
+            return
+        rows = self._conn.execute(
+            "SELECT tagset_id, status, match_values FROM match_results WHERE variable_fp = ?",
+            (fp,),
+        )
+        self._entries[fp] = {
+            tagset_id: (status, tuple(json.loads(values))) for tagset_id, status, values in rows
+        }
+        while len(self._entries) > _MEMORY_TABLE_LIMIT:
+            self._entries.popitem(last=False)
+
+    def get(self, fp: str, tagset_id: str) -> tuple[str, tuple[str, ...]] | None:
+        with self._lock:
+            table = self._entries.get(fp)
+            if table is None:
+                return None
+            return table.get(tagset_id)
+
+    def put(
+        self,
+        name: str,
+        fp: str,
+        tagset_id: str,
+        status: str,
+        values: Iterable[str],
+    ) -> None:
+        values_tuple = tuple(values)
+        with self._lock:
+            self._entries.setdefault(fp, {})[tagset_id] = (status, values_tuple)
+            self._pending.append(
+                (
+                    fp,
+                    tagset_id,
+                    name,
+                    status,
+                    json.dumps(list(values_tuple), ensure_ascii=False),
+                    int(time.time()),
+                )
+            )
+            if len(self._pending) >= _FLUSH_THRESHOLD:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending and not self._touched:
+            return
+        now = int(time.time())
+        with self._conn:
+            if self._pending:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO match_results "
+                    "(variable_fp, tagset_id, variable_name, status, match_values, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+            # 기본 키 앞부분(variable_fp)으로 찾으므로 표 전체를 훑지 않는다.
+            self._conn.executemany(
+                "UPDATE match_results SET used_at = ? WHERE variable_fp = ? AND used_at < ?",
+                [(now, fp, now - _TOUCH_INTERVAL) for fp in self._touched],
+            )
+        self._pending = []
+        self._touched.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            self._pending = []
+            with self._conn:
+                self._conn.execute("DELETE FROM match_results")
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+
+class CachedMatcher:
+    """bind 된 variable_specs 에 대해 match_variable_specs 와 같은 결과를 캐시 경유로 돌려준다."""
+
+    def __init__(
+        self,
+        cache: MatchCache,
+        variable_specs: list[dict[str, Any]],
+        fingerprints: list[str],
+        partial: PartialMatchPolicy | None = None,
+    ) -> None:
+        self.cache = cache
+        self.variable_specs = variable_specs
+        self.fingerprints = fingerprints
+        self.partial_matchers = (
+            [PartialVariableMatcher.from_spec(spec, partial) for spec in variable_specs]
+            if partial is not None
+            else None
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, tags: list[str]) -> dict[str, dict[str, Any]]:
+        tag_set = normalize_tag_set(tags)
+        tagset_id = tag_set_id(tag_set)
+        matches: dict[str, dict[str, Any]] = {}
+        for pos, (spec, fp) in enumerate(zip(self.variable_specs, self.fingerprints)):
+            name = spec["name"]
+            cached = self.cache.get(fp, tagset_id)
+            if cached is not None:
+                self.hits += 1
+                status, values = cached
+                matches[name] = {"status": status, "values": list(values)}
+                continue
+            self.misses += 1
+            if self.partial_matchers is not None:
+                result = self.partial_matchers[pos].match(tag_set)
+            else:
+                result = match_variable_spec(spec, tag_set)
+            self.cache.put(name, fp, tagset_id, result["status"], result["values"])
+            matches[name] = result
+        return matches
+
+    def flush(self) -> None:
+        self.cache.flush()
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+import os
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator
+
+from ..extract.payload import metadata_prefix_length
+from ..match.partial import PartialMatchPolicy
+from ..utils import advise_sequential
+from .pool import CancelEvent, WorkerPool, wait_completed
+
+DEFAULT_READERS = min(32, (os.cpu_count() or 2) * 4)
+DEFAULT_INFLIGHT_BYTES = 256 * 1024 * 1024
+# 메타데이터 앞부분 길이를 정할 때 먼저 읽는 크기.
+METADATA_PROBE_BYTES = 64 * 1024
+
+# (경로, 블록 이름, 읽은 크기, 파일 전체 여부, 완료 콜백, 오류 콜백)
+BufferSubmit = Callable[
+    [str, str, int, bool, Callable[[Any], None], Callable[[BaseException], None]], None
+]
+
+
+class ByteBudget:
+    """읽기 단계가 잡아 둘 수 있는 총 바이트 수 제한.
+
+    남은 예산이 모자라면 기다리고, 아무것도 잡혀 있지 않을 때는 예산보다 큰 파일도 통과시킨다.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = max(1, limit)
+        self.used = 0
+        self._cancelled = False
+        self._cond = threading.Condition()
+
+    def acquire(self, size: int) -> bool:
+        with self._cond:
+            while not self._cancelled and self.used and self.used + size > self.limit:
+                self._cond.wait()
+            if self._cancelled:
+                return False
+            self.used += size
+            return True
+
+    def release(self, size: int) -> None:
+        with self._cond:
+            self.used -= size
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+
+def _iter_prefetched(
+    pool: WorkerPool,
+    image_paths: Iterable[str],
+    submit: BufferSubmit,
+    failed: Callable[[str, str], Any],
+    *,
+    ordered: bool,
+    readers: int,
+    max_inflight_bytes: int,
+    cancel_event: CancelEvent | None,
+) -> Iterator[Any]:
+    """읽기 스레드가 파일 앞부분을 공유 메모리 블록에 올리고 submit 으로 워커에 넘긴다.
+
+    경로는 필요한 만큼만 꺼내며, 소비하지 않은 결과가 readers + 워커 수의 2배를 넘지 않게
+    보낸다. ordered 이면 경로 순서대로, 아니면 완료 순서대로 내보낸다.
+    """
+    completed: queue.Queue = queue.Queue()
+    waiting: deque[queue.Queue] = deque()
+    budget = ByteBudget(max_inflight_bytes)
+    lock = threading.Lock()
+    outstanding: dict[str, tuple[shared_memory.SharedMemory, int]] = {}
+
+    def release(name: str) -> bool:
+        with lock:
+            entry = outstanding.pop(name, None)
+        if entry is None:
+            return False
+        block, size = entry
+        block.close()
+        block.unlink()
+        budget.release(size)
+        return True
+
+    def finish(name: str, result: Any, slot: queue.Queue) -> None:
+        # 소비자가 중간에 멈춰도 블록이 남지 않도록 정리는 콜백에서 한다.
+        if release(name):
+            slot.put(result)
+
+    def read(path: str, slot: queue.Queue) -> None:
+        name = None
+        try:
+            with open(path, "rb") as handle:
+                total = os.fstat(handle.fileno()).st_size
+                head = handle.read(min(total, METADATA_PROBE_BYTES))
+                size = metadata_prefix_length(head, total)
+                if not budget.acquire(size):
+                    return
+                try:
+                    block = shared_memory.SharedMemory(create=True, size=max(1, size))
+                except Exception:
+                    budget.release(size)
+                    raise
+                name = block.name
+                with lock:
+                    outstanding[name] = (block, size)
+                read_size = min(size, len(head))
+                block.buf[:read_size] = head[:read_size]
+                if size > read_size:
+                    advise_sequential(handle.fileno())
+                    read_size += handle.readinto(block.buf[read_size:size])
+            submit(
+                path,
+                name,
+                read_size,
+                read_size >= total,
+                lambda result: finish(name, result, slot),
+                lambda exc: finish(name, failed(path, str(exc)), slot),
+            )
+        except Exception as exc:
+            if name is not None:
+                release(name)
+            slot.put(failed(path, str(exc)))
+
+    window = max(1, readers) + pool.processes * 2
+    paths = iter(image_paths)
+    executor = ThreadPoolExecutor(max_workers=max(1, readers), thread_name_prefix="prefetch")
+    try:
+        while True:
+            while len(waiting) < window:
+                path = next(paths, None)
+                if path is None:
+                    break
+                slot = queue.Queue() if ordered else completed
+                executor.submit(read, path, slot)
+                waiting.append(slot)
+            if not waiting:
+                return
+            result = wait_completed(waiting.popleft(), cancel_event)
+            if result is None:
+                return
+            yield result
+    finally:
+        budget.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_prefetched_results(
+    pool: WorkerPool,
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    image_paths: Iterable[str],
+    *,
+    partial: PartialMatchPolicy | None = None,
+    readers: int = DEFAULT_READERS,
+    max_inflight_bytes: int = DEFAULT_INFLIGHT_BYTES,
+    cancel_event: CancelEvent | None = None,
+) -> Iterator[dict[str, Any]]:
+    """읽기(스레드) → 파싱(프로세스) 2단계로 process_image 결과를 완료 순서대로 내보낸다.
+
+    읽기 스레드는 파서가 메타데이터를 읽는 데 필요한 앞부분만 공유 메모리 블록에 올리고,
+    워커는 블록을 복사하지 않고 파싱한다. 앞부분에서 태그를 찾지 못하면 워커가 파일을
+    직접 연다. 공유 메모리에 잡힌 총량은 max_inflight_bytes 를 넘지 않는다.
+    cancel_event 가 설정되면 읽기를 멈춘다. 이미 보낸 작업은 풀에서 끝까지 실행되고,
+    결과는 버려지며 블록은 완료 콜백에서 해제된다.
+    """
+    key = pool.load_template(variable_specs, include_negative, partial)
+    yield from _iter_prefetched(
+        pool,
+        image_paths,
+        lambda path, name, size, complete, callback, error_callback: pool.submit_buffer(
+            key, path, name, size, complete, callback, error_callback
+        ),
+        lambda path, message: {"path": path, "matches": {}, "error": message},
+        ordered=False,
+        readers=readers,
+        max_inflight_bytes=max_inflight_bytes,
+        cancel_event=cancel_event,
+    )
+
+
+def iter_prefetched_tags(
+    pool: WorkerPool,
+    image_paths: Iterable[str],
+    include_negative: bool,
+    *,
+    readers: int = DEFAULT_READERS,
+    max_inflight_bytes: int = DEFAULT_INFLIGHT_BYTES,
+    cancel_event: CancelEvent | None = None,
+) -> Iterator[tuple[list[str] | None, str | None]]:
+    """WorkerPool.imap_tags 와 같이 경로 순서대로 (태그, 오류 메시지) 를 돌려준다.
+
+    읽기는 iter_prefetched_results 처럼 스레드에서 앞당긴다.
+    """
+    yield from _iter_prefetched(
+        pool,
+        image_paths,
+        lambda path, name, size, complete, callback, error_callback: pool.submit_tag_buffer(
+            include_negative, path, name, size, complete, callback, error_callback
+        ),
+        lambda path, message: (None, message),
+        ordered=True,
+        readers=readers,
+        max_inflight_bytes=max_inflight_bytes,
+        cancel_event=cancel_event,
+    )
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import atexit
+from collections import OrderedDict, deque
+from functools import partial as bind_args
+import hashlib
+from itertools import count, islice
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.pool import Pool
+from pathlib import Path
+import pickle
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Protocol
+
+from ..match.partial import PartialMatchPolicy
+from .compact import CompactBatch
+from .match_cache import template_fingerprint
+from .worker import extract_image_tags, init_worker, process_image, process_image_positions
+
+
+_WORKER_TEMPLATE_LIMIT = 4
+_POLL_INTERVAL = 0.1
+_worker_templates: "OrderedDict[str, tuple[list[dict[str, Any]], bool, PartialMatchPolicy | None]]" = (
+    OrderedDict()
+)
+_worker_active_key: str | None = None
+
+
+class CancelEvent(Protocol):
+    def is_set(self) -> bool: ...
+
+
+def template_key(
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    partial: PartialMatchPolicy | None = None,
+) -> str:
+    policy = partial.cache_key() if partial is not None else "strict"
+    joined = f"{template_fingerprint(variable_specs)}|{int(include_negative)}|{policy}"
+    return hashlib.blake2b(joined.encode("ascii"), digest_size=16).hexdigest()
+
+
+def _activate_template(store_dir: str, key: str) -> None:
+    # 워커 프로세스 안에서 실행된다. 처음 보는 key 만 저장소 파일에서 읽는다.
+    global _worker_active_key
+    if _worker_active_key == key:
+        return
+    template = _worker_templates.get(key)
+    if template is None:
+        with open(Path(store_dir) / f"{key}.pickle", "rb") as handle:
+            template = pickle.load(handle)
+        _worker_templates[key] = template
+        while len(_worker_templates) > _WORKER_TEMPLATE_LIMIT:
+            _worker_templates.popitem(last=False)
+    else:
+        _worker_templates.move_to_end(key)
+    init_worker(*template)
+    _worker_active_key = key
+
+
+def process_template_image(store_dir: str, key: str, path: str) -> dict[str, Any]:
+    try:
+        _activate_template(store_dir, key)
+    except Exception as exc:
+        return {"path": path, "matches": {}, "error": f"template load failed: {exc}"}
+    return process_image(path)
+
+
+def process_template_batch(
+    store_dir: str,
+    key: str,
+    start: int,
+    paths: list[str],
+) -> tuple[CompactBatch, float, float, float]:
+    """배치를 처리하고 (압축 결과, 벽시계 시간, CPU 시간, 시작 시각) 을 돌려준다.
+
+    결과에는 경로를 다시 싣지 않는다. start 는 부모가 디스패치한 경로 목록에서의 위치다.
+    """
+    started_at = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        _activate_template(store_dir, key)
+    except Exception as exc:
+        batch = CompactBatch.failed(start, len(paths), 0, f"template load failed: {exc}")
+    else:
+        batch = CompactBatch.encode(
+            start,
+            [process_image_positions(path) for path in paths],
+            len(_worker_templates[key][0]),
+        )
+    return (
+        batch,
+        time.perf_counter() - wall_start,
+        time.process_time() - cpu_start,
+        started_at,
+    )
+
+
+def extract_tags_batch(
+    include_negative: bool,
+    paths: list[str],
+) -> list[tuple[list[str] | None, str | None]]:
+    return [extract_image_tags(include_negative, path) for path in paths]
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    # 블록의 수명은 만든 쪽(부모)이 관리한다. 워커가 resource tracker 에 등록하면
+    # 워커 종료 시 블록이 해제되거나 경고가 남으므로 등록하지 않는다.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _parse_shared_buffer(shm_name: str, size: int, parse: Callable[[memoryview], Any]) -> Any:
+    # 블록을 복사하지 않고 memoryview 그대로 파싱한 뒤 닫는다.
+    block = _attach_shared_memory(shm_name)
+    view = block.buf[:size]
+    try:
+        return parse(view)
+    finally:
+        view.release()
+        block.close()
+
+
+def process_template_buffer(
+    store_dir: str,
+    key: str,
+    path: str,
+    shm_name: str,
+    size: int,
+    complete: bool = True,
+) -> dict[str, Any]:
+    try:
+        _activate_template(store_dir, key)
+        return _parse_shared_buffer(
+            shm_name, size, lambda data: process_image(path, data, complete)
+        )
+    except Exception as exc:
+        return {"path": path, "matches": {}, "error": str(exc)}
+
+
+def extract_tags_buffer(
+    include_negative: bool,
+    path: str,
+    shm_name: str,
+    size: int,
+    complete: bool = True,
+) -> tuple[list[str] | None, str | None]:
+    try:
+        return _parse_shared_buffer(
+            shm_name, size, lambda data: extract_image_tags(include_negative, path, data, complete)
+        )
+    except Exception as exc:
+        return None, str(exc)
+
+
+class WorkerPool:
+    """작업 사이에 재사용되는 워커 프로세스 풀.
+
+    템플릿(variable_specs + 옵션)은 내용 해시로 저장소 디렉터리에 한 번만 기록되고,
+    각 워커는 처음 보는 해시일 때만 읽어 들인다. 같은 템플릿으로 반복 실행하면
+    프로세스 기동과 spec 전송 비용이 들지 않는다.
+
+    여러 작업이 같은 풀을 나눠 쓰므로 작업을 취소할 때 풀을 종료하지 않는다. 작업은 새로
+    보내기를 멈추고 자기 결과만 버린다. 풀이 종료되면 끝나지 않은 submit_* 작업의
+    error_callback 이 불리므로 결과를 기다리는 쪽이 멈춰 있지 않는다.
+    """
+
+    def __init__(self, processes: int | None = None) -> None:
+        self._processes = processes or multiprocessing.cpu_count() or 2
+        self._pool: Pool | None = None
+        self._lock = threading.Lock()
+        self._store_dir = tempfile.mkdtemp(prefix="exif_worker_templates_")
+        self._stored: set[str] = set()
+        self._jobs = count()
+        self._pending: dict[int, tuple[Pool, Callable[[BaseException], None]]] = {}
+
+    @property
+    def processes(self) -> int:
+        return self._processes
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def _ensure_pool(self) -> Pool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(processes=self._processes)
+            return self._pool
+
+    def _settle(self, job: int) -> bool:
+        with self._lock:
+            return self._pending.pop(job, None) is not None
+
+    def _apply(
+        self,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ) -> None:
+        pool = self._ensure_pool()
+        with self._lock:
+            job = next(self._jobs)
+            self._pending[job] = (pool, error_callback)
+
+        def done(result: Any) -> None:
+            if self._settle(job):
+                callback(result)
+
+        def failed(exc: BaseException) -> None:
+            if self._settle(job):
+                error_callback(exc)
+
+        try:
+            pool.apply_async(func, args, callback=done, error_callback=failed)
+        except Exception:
+            self._settle(job)
+            raise
+
+    def _fail_pending(self, pool: Pool) -> None:
+        # 종료된 풀의 결과 처리 스레드는 멈췄으므로 남은 작업의 콜백은 여기서만 불린다.
+        with self._lock:
+            lost = [job for job, (owner, _callback) in self._pending.items() if owner is pool]
+            callbacks = [self._pending.pop(job)[1] for job in lost]
+        for error_callback in callbacks:
+            error_callback(RuntimeError("worker pool terminated"))
+
+    def load_template(
+        self,
+        variable_specs: list[dict[str, Any]],
+        include_negative: bool,
+        partial: PartialMatchPolicy | None = None,
+    ) -> str:
+        key = template_key(variable_specs, include_negative, partial)
+        with self._lock:
+            if key not in self._stored:
+                path = Path(self._store_dir) / f"{key}.pickle"
+                temp_path = path.with_suffix(".tmp")
+                with open(temp_path, "wb") as handle:
+                    pickle.dump(
+                        (variable_specs, include_negative, partial),
+                        handle,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                temp_path.replace(path)
+                self._stored.add(key)
+        return key
+
+    def imap_unordered(
+        self,
+        variable_specs: list[dict[str, Any]],
+        include_negative: bool,
+        image_paths: Iterable[str],
+        *,
+        partial: PartialMatchPolicy | None = None,
+        chunksize: int = 1,
+    ) -> Iterator[dict[str, Any]]:
+        key = self.load_template(variable_specs, include_negative, partial)
+        pool = self._ensure_pool()
+        func = bind_args(process_template_image, self._store_dir, key)
+        return pool.imap_unordered(func, image_paths, chunksize=chunksize)
+
+    def imap_tags(
+        self,
+        image_paths: Iterable[str],
+        include_negative: bool,
+        *,
+        chunksize: int = 8,
+        window: int | None = None,
+    ) -> Iterator[tuple[list[str] | None, str | None]]:
+        """경로 순서대로 (태그, 오류 메시지) 를 돌려준다. 템플릿을 올리지 않는다.
+
+        배치는 window 개(기본: 워커 수의 2배)까지만 앞서 보낸다. 소비자가 중간에 멈추면
+        이미 보낸 배치만 끝까지 실행되고 그 결과는 버려진다.
+        """
+        window = max(1, window or self._processes * 2)
+        paths = iter(image_paths)
+        waiting: deque[queue.Queue] = deque()
+        while True:
+            while len(waiting) < window:
+                batch = list(islice(paths, chunksize))
+                if not batch:
+                    break
+                slot: queue.Queue = queue.Queue()
+                self._apply(
+                    extract_tags_batch,
+                    (include_negative, batch),
+                    callback=slot.put,
+                    error_callback=lambda exc, slot=slot, size=len(batch): slot.put(
+                        [(None, str(exc))] * size
+                    ),
+                )
+                waiting.append(slot)
+            if not waiting:
+                return
+            yield from waiting.popleft().get()
+
+    def submit_tags(
+        self,
+        path: str,
+        include_negative: bool,
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ) -> None:
+        self._apply(extract_image_tags, (include_negative, path), callback, error_callback)
+
+    def submit_batch(
+        self,
+        key: str,
+        start: int,
+        paths: list[str],
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ) -> None:
+        self._apply(
+            process_template_batch,
+            (self._store_dir, key, start, paths),
+            callback,
+            error_callback,
+        )
+
+    def submit_buffer(
+        self,
+        key: str,
+        path: str,
+        shm_name: str,
+        size: int,
+        complete: bool,
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ) -> None:
+        self._apply(
+            process_template_buffer,
+            (self._store_dir, key, path, shm_name, size, complete),
+            callback,
+            error_callback,
+        )
+
+    def submit_tag_buffer(
+        self,
+        include_negative: bool,
+        path: str,
+        shm_name: str,
+        size: int,
+        complete: bool,
+        callback: Callable[[Any], None],
+        error_callback: Callable[[BaseException], None],
+    ) -> None:
+        self._apply(
+            extract_tags_buffer,
+            (include_negative, path, shm_name, size, complete),
+            callback,
+            error_callback,
+        )
+
+    def resize(self, processes: int) -> None:
+        """워커 수를 바꾼다. 기존 워커는 진행 중인 작업을 끝낸 뒤 종료된다."""
+        processes = max(1, int(processes))
+        with self._lock:
+            if processes == self._processes:
+                return
+            self._processes = processes
+            old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            old_pool.close()
+            old_pool.join()
+
+    def terminate(self) -> None:
+        """진행 중인 작업을 버리고 워커를 즉시 종료한다. 다음 사용 시 새로 띄운다.
+
+        풀을 쓰는 모든 작업이 영향을 받으므로 풀 주인(종료 처리 등)만 부른다.
+        """
+        with self._lock:
+            old_pool, self._pool = self._pool, None
+        if old_pool is not None:
+            old_pool.terminate()
+            old_pool.join()
+            self._fail_pending(old_pool)
+
+    def close(self) -> None:
+        self.terminate()
+        shutil.rmtree(self._store_dir, ignore_errors=True)
+        self._stored.clear()
+
+
+def wait_completed(completed: queue.Queue, cancel_event: CancelEvent | None) -> Any | None:
+    """완료 항목 하나를 기다린다. 기다리는 중 취소되면 None.
+
+    submit_* 작업은 풀이 종료돼도 error_callback 으로 끝나므로 취소 수단이 없어도 돌아온다.
+    """
+    if cancel_event is None:
+        return completed.get()
+    while not cancel_event.is_set():
+        try:
+            return completed.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return None
+
+
+_shared_pool: WorkerPool | None = None
+_shared_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = WorkerPool()
+        return _shared_pool
+
+
+def shutdown_worker_pool() -> None:
+    global _shared_pool
+    with _shared_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_worker_pool)
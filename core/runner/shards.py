@@ -0,0 +1,425 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path, PurePosixPath
+import queue
+import re
+import socket
+import time
+from typing import Any, Iterable, Iterator
+
+from ..match.partial import PartialMatchPolicy
+from ..utils import NameIndex
+from .compact import DictRow
+from .handlers import TaskReporter, consume_results, move_result, rename_result
+from .pool import CancelEvent, WorkerPool
+from .worker import init_worker, process_image
+
+JOB_FILE = "job.json"
+JOB_VERSION = 1
+DEFAULT_SHARD_SIZE = 500
+DEFAULT_LEASE_TIMEOUT = 300.0
+_SHARDS_DIR = "shards"
+_PENDING_DIR = "pending"
+_LEASED_DIR = "leased"
+_RESULTS_DIR = "results"
+_HEARTBEAT_INTERVAL = 10.0
+_WORKER_ID_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+# 작업 디렉터리 구조 (여러 호스트가 같은 공유 디렉터리를 본다):
+#   job.json               템플릿(variable_specs), 옵션, 기준 폴더, shard 수
+#   shards/00000.json      shard 별 이미지 목록 (기준 폴더 상대 경로, 생성 후 바뀌지 않음)
+#   pending/00000          아직 아무도 잡지 않은 shard 토큰
+#   leased/00000@<worker>  워커가 rename 으로 가져간 토큰. mtime 이 heartbeat 다.
+#   results/00000.jsonl    완료된 shard 의 process_image 결과 (임시 파일 → rename)
+
+
+class JobIncompleteError(RuntimeError):
+    pass
+
+
+class ShardLease:
+    """pending 토큰을 leased 로 rename 해서 얻은 shard 점유권."""
+
+    def __init__(self, job_dir: Path, shard_id: str, path: Path) -> None:
+        self.job_dir = job_dir
+        self.shard_id = shard_id
+        self.path = path
+        self._last_beat = time.monotonic()
+
+    def heartbeat(self, force: bool = False) -> bool:
+        """lease 파일의 mtime 을 갱신한다. 이미 회수됐으면 False."""
+        now = time.monotonic()
+        if not force and now - self._last_beat < _HEARTBEAT_INTERVAL:
+            return True
+        self._last_beat = now
+        try:
+            os.utime(self.path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _encode_specs(variable_specs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [
+        {
+            "name": spec["name"],
+            "values": [
+                {"name": value["name"], "tag_set": sorted(value["tag_set"])}
+                for value in spec["values"]
+            ],
+        }
+        for spec in variable_specs
+    ]
+
+
+def _decode_specs(payload: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [
+        {
+            "name": spec["name"],
+            "values": [
+                {"name": value["name"], "tag_set": set(value["tag_set"])}
+                for value in spec["values"]
+            ],
+        }
+        for spec in payload
+    ]
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # 같은 디렉터리 안의 rename 은 NFS/SMB 에서도 원자적이라 읽는 쪽이 반쯤 쓴 파일을 보지 않는다.
+    temp_path = path.with_name(f".{path.name}.{socket.gethostname()}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8", newline="\n") as handle:
+        handle.write(text)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp_path, path)
+
+
+def _default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def create_job(
+    job_dir: str | Path,
+    root: str | Path,
+    image_paths: Iterable[str],
+    variable_specs: list[dict[str, Any]],
+    *,
+    kind: str,
+    options: dict[str, Any],
+    include_negative: bool = False,
+    partial: PartialMatchPolicy | None = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> int:
+    """작업 디렉터리를 만들고 shard 수를 돌려준다.
+
+    kind 는 병합 시 적용할 작업("rename" 또는 "move"), options 는 그 작업의 인자다.
+    image_paths 는 root 아래에 있어야 하며 root 기준 상대 경로로 저장된다.
+    """
+    if kind not in _MERGE_HANDLERS:
+        raise ValueError(f"unknown job kind: {kind}")
+    job_path = Path(job_dir)
+    if (job_path / JOB_FILE).exists():
+        raise ValueError(f"job already exists: {job_path}")
+    root_path = Path(root).resolve()
+    relative = [
+        PurePosixPath(Path(path).resolve().relative_to(root_path)).as_posix()
+        for path in image_paths
+    ]
+    shard_size = max(1, shard_size)
+    shards = [relative[pos : pos + shard_size] for pos in range(0, len(relative), shard_size)]
+
+    for name in (_SHARDS_DIR, _PENDING_DIR, _LEASED_DIR, _RESULTS_DIR):
+        (job_path / name).mkdir(parents=True, exist_ok=True)
+    for index, listing in enumerate(shards):
+        shard_id = f"{index:05d}"
+        _write_atomic(job_path / _SHARDS_DIR / f"{shard_id}.json", json.dumps(listing))
+        (job_path / _PENDING_DIR / shard_id).touch()
+    manifest = {
+        "version": JOB_VERSION,
+        "kind": kind,
+        "options": options,
+        "root": str(root_path),
+        "include_negative": include_negative,
+        "partial": (
+            {"min_tags": partial.min_tags, "min_ratio": partial.min_ratio} if partial else None
+        ),
+        "variable_specs": _encode_specs(variable_specs),
+        "shard_count": len(shards),
+        "total": len(relative),
+    }
+    # job.json 을 마지막에 써야 워커가 반쯤 만들어진 작업을 잡지 않는다.
+    _write_atomic(job_path / JOB_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+    return len(shards)
+
+
+def load_job(job_dir: str | Path) -> dict[str, Any]:
+    with open(Path(job_dir) / JOB_FILE, "r", encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    if manifest.get("version") != JOB_VERSION:
+        raise ValueError(f"unsupported job version: {manifest.get('version')}")
+    return manifest
+
+
+def _shard_listing(job_dir: Path, shard_id: str) -> list[str]:
+    with open(job_dir / _SHARDS_DIR / f"{shard_id}.json", "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _result_path(job_dir: Path, shard_id: str) -> Path:
+    return job_dir / _RESULTS_DIR / f"{shard_id}.jsonl"
+
+
+def reclaim_stale_leases(
+    job_dir: str | Path,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+) -> int:
+    """heartbeat 가 lease_timeout 보다 오래 끊긴 lease 를 pending 으로 되돌린다."""
+    job_path = Path(job_dir)
+    reclaimed = 0
+    now = time.time()
+    for entry in os.scandir(job_path / _LEASED_DIR):
+        shard_id = entry.name.partition("@")[0]
+        try:
+            if now - entry.stat().st_mtime < lease_timeout:
+                continue
+            if _result_path(job_path, shard_id).exists():
+                # 결과를 쓴 뒤 lease 를 지우기 전에 멈춘 경우다.
+                os.remove(entry.path)
+                continue
+            os.rename(entry.path, job_path / _PENDING_DIR / shard_id)
+        except FileNotFoundError:
+            # 다른 프로세스가 먼저 회수했거나 워커가 방금 끝냈다.
+            continue
+        reclaimed += 1
+    return reclaimed
+
+
+def claim_shard(
+    job_dir: str | Path,
+    worker_id: str | None = None,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+) -> ShardLease | None:
+    """남은 shard 하나를 rename 으로 점유한다. 남은 것이 없으면 None."""
+    job_path = Path(job_dir)
+    worker = _WORKER_ID_RE.sub("_", worker_id or _default_worker_id())
+    reclaim_stale_leases(job_path, lease_timeout)
+    for shard_id in sorted(os.listdir(job_path / _PENDING_DIR)):
+        lease_path = job_path / _LEASED_DIR / f"{shard_id}@{worker}"
+        try:
+            # rename 은 한 프로세스만 성공한다. 진 쪽은 FileNotFoundError 를 받는다.
+            os.rename(job_path / _PENDING_DIR / shard_id, lease_path)
+        except FileNotFoundError:
+            continue
+        lease = ShardLease(job_path, shard_id, lease_path)
+        # rename 은 mtime 을 유지하므로 바로 갱신한다. 그 사이에 회수됐으면 다음 shard 로.
+        if not lease.heartbeat(force=True):
+            continue
+        if _result_path(job_path, shard_id).exists():
+            lease.release()
+            continue
+        return lease
+    return None
+
+
+def _iter_shard_results(
+    paths: list[str],
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    partial: PartialMatchPolicy | None,
+    pool: WorkerPool | None,
+) -> Iterator[dict[str, Any]]:
+    if pool is not None:
+        yield from pool.imap_unordered(
+            variable_specs,
+            include_negative,
+            paths,
+            partial=partial,
+            chunksize=max(1, len(paths) // (pool.processes * 4)),
+        )
+        return
+    init_worker(variable_specs, include_negative, partial)
+    for path in paths:
+        yield process_image(path)
+
+
+def process_shard(
+    lease: ShardLease,
+    manifest: dict[str, Any],
+    *,
+    root: str | Path | None = None,
+    pool: WorkerPool | None = None,
+) -> int:
+    """점유한 shard 를 처리해 결과 파일을 쓰고 lease 를 반납한다. 처리한 이미지 수를 돌려준다."""
+    root_path = Path(root or manifest["root"])
+    listing = _shard_listing(lease.job_dir, lease.shard_id)
+    absolute = {str(root_path / rel): rel for rel in listing}
+    partial_payload = manifest.get("partial")
+    partial = PartialMatchPolicy(**partial_payload) if partial_payload else None
+    lines: list[str] = []
+    for result in _iter_shard_results(
+        list(absolute),
+        _decode_specs(manifest["variable_specs"]),
+        bool(manifest.get("include_negative")),
+        partial,
+        pool,
+    ):
+        # 호스트마다 마운트 위치가 다를 수 있으므로 결과에는 상대 경로만 남긴다.
+        result["path"] = absolute[result["path"]]
+        lines.append(json.dumps(result, ensure_ascii=False))
+        lease.heartbeat()
+    text = "".join(f"{line}\n" for line in lines)
+    _write_atomic(_result_path(lease.job_dir, lease.shard_id), text)
+    lease.release()
+    return len(lines)
+
+
+def run_shard_worker(
+    job_dir: str | Path,
+    worker_id: str | None = None,
+    *,
+    root: str | Path | None = None,
+    pool: WorkerPool | None = None,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    cancel_event: CancelEvent | None = None,
+) -> int:
+    """남은 shard 가 없을 때까지 점유 → 처리 → 결과 기록을 반복하고 처리한 shard 수를 돌려준다.
+
+    pool 이 없으면 현재 프로세스에서 처리한다(프로세스 여러 개를 띄워 병렬화).
+    root 는 이 호스트에서 작업 기준 폴더가 마운트된 위치이며, 없으면 job.json 의 값을 쓴다.
+    """
+    manifest = load_job(job_dir)
+    processed = 0
+    while cancel_event is None or not cancel_event.is_set():
+        lease = claim_shard(job_dir, worker_id, lease_timeout)
+        if lease is None:
+            break
+        process_shard(lease, manifest, root=root, pool=pool)
+        processed += 1
+    return processed
+
+
+def job_status(job_dir: str | Path) -> dict[str, int]:
+    job_path = Path(job_dir)
+    manifest = load_job(job_path)
+    return {
+        "total": int(manifest["shard_count"]),
+        "pending": len(os.listdir(job_path / _PENDING_DIR)),
+        "leased": len(os.listdir(job_path / _LEASED_DIR)),
+        "done": sum(
+            1 for name in os.listdir(job_path / _RESULTS_DIR) if name.endswith(".jsonl")
+        ),
+    }
+
+
+def wait_for_job(
+    job_dir: str | Path,
+    *,
+    timeout: float | None = None,
+    poll_interval: float = 1.0,
+    lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+    cancel_event: CancelEvent | None = None,
+) -> bool:
+    """모든 shard 결과가 생길 때까지 기다린다. 기다리는 동안 끊긴 lease 를 회수한다."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        status = job_status(job_dir)
+        if status["done"] >= status["total"]:
+            return True
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+        if deadline is not None and time.monotonic() >= deadline:
+            return False
+        reclaim_stale_leases(job_dir, lease_timeout)
+        time.sleep(poll_interval)
+
+
+def iter_job_rows(
+    job_dir: str | Path,
+    root: str | Path | None = None,
+) -> Iterator[DictRow]:
+    """shard 결과를 작업 생성 시의 목록 순서대로 내보낸다.
+
+    어느 워커가 어떤 순서로 끝냈는지와 무관하게 순서가 같으므로 이름 충돌 해소 결과도 같다.
+    """
+    job_path = Path(job_dir)
+    manifest = load_job(job_path)
+    root_path = Path(root or manifest["root"])
+    missing = [
+        f"{index:05d}"
+        for index in range(int(manifest["shard_count"]))
+        if not _result_path(job_path, f"{index:05d}").exists()
+    ]
+    if missing:
+        raise JobIncompleteError(f"{len(missing)} shard(s) not finished: {', '.join(missing[:5])}")
+    for index in range(int(manifest["shard_count"])):
+        shard_id = f"{index:05d}"
+        by_path: dict[str, dict[str, Any]] = {}
+        with open(_result_path(job_path, shard_id), "r", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    result = json.loads(line)
+                    by_path[result["path"]] = result
+        for rel in _shard_listing(job_path, shard_id):
+            result = by_path.get(rel) or {"path": rel, "matches": {}, "error": "missing result"}
+            yield DictRow({**result, "path": str(root_path / rel)})
+
+
+def _merge_rename(
+    rows: list[DictRow],
+    options: dict[str, Any],
+    dry_run: bool,
+):
+    reserved = NameIndex(Path(row.path).name for row in rows)
+    order = list(options["order"])
+    template = options.get("template") or "_".join(f"[{name}]" for name in order)
+    prefix_mode = bool(options.get("prefix_mode"))
+    return lambda row: rename_result(row, order, template, prefix_mode, dry_run, reserved)
+
+
+def _merge_move(
+    rows: list[DictRow],
+    options: dict[str, Any],
+    dry_run: bool,
+):
+    reserved = NameIndex()
+    variable_name = options["variable_name"]
+    # 폴더 템플릿은 [value] 와 변수 이름([chara] 등) 둘 다 받는다.
+    template = (options.get("template") or "[value]").replace(f"[{variable_name}]", "[value]")
+    return lambda row: move_result(
+        row,
+        variable_name,
+        template,
+        options["target_root"],
+        dry_run,
+        reserved,
+    )
+
+
+_MERGE_HANDLERS = {"rename": _merge_rename, "move": _merge_move}
+
+
+def merge_job_task(
+    out_queue: "queue.Queue",
+    job_dir: str | Path,
+    dry_run: bool,
+    *,
+    root: str | Path | None = None,
+    cancel_event: CancelEvent | None = None,
+    progress_interval: float = 0.5,
+) -> None:
+    """완료된 작업의 결과를 목록 순서로 모아 rename/move 를 적용한다. 이벤트 형식은 rename_task 와 같다."""
+    manifest = load_job(job_dir)
+    rows = list(iter_job_rows(job_dir, root))
+    handle = _MERGE_HANDLERS[manifest["kind"]](rows, manifest["options"], dry_run)
+    reporter = TaskReporter(out_queue, len(rows), progress_interval)
+    consume_results((row for row in rows), reporter, handle, cancel_event)
+    out_queue.put(("done", None))
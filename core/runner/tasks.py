@@ -5,11 +5,15 @@ import os
 from pathlib import Path
 import queue
 import re
-import shutil
+from typing import Iterator
 
-from core.match import iter_search_results
-from core.utils import ensure_unique_name, render_template, sanitize_filename
-from .worker import init_worker, process_image
+from core.match import PartialMatchPolicy, iter_search_results
+from core.utils import NameIndex, ProgressThrottle
+from .autotune import PoolAutotuner, iter_tuned_rows
+from .compact import DictRow, MatchRow
+from .handlers import TaskReporter, consume_results, move_result, rename_result
+from .pipeline import iter_prefetched_results
+from .pool import CancelEvent, WorkerPool, get_worker_pool
 
 
 def _compute_chunksize(total: int) -> int:
@@ -17,6 +21,52 @@ def _compute_chunksize(total: int) -> int:
     return max(10, total // (cpu_count * 20) if total else 10)
 
 
+def _iter_results(
+    pool: WorkerPool,
+    variable_specs: list[dict],
+    include_negative: bool,
+    image_paths: list[str],
+    partial: PartialMatchPolicy | None,
+    autotune: bool,
+    prefetch: bool = False,
+    cancel_event: CancelEvent | None = None,
+) -> Iterator[MatchRow | DictRow]:
+    if prefetch:
+        # 느린 저장소에서는 읽기를 스레드로 앞당기고 워커는 파싱만 한다.
+        for result in iter_prefetched_results(
+            pool,
+            variable_specs,
+            include_negative,
+            image_paths,
+            partial=partial,
+            cancel_event=cancel_event,
+        ):
+            yield DictRow(result)
+        return
+    if autotune:
+        # 기본 경로: 워커는 경로 없이 상태 코드/값 위치 배열만 돌려준다.
+        yield from iter_tuned_rows(
+            pool,
+            variable_specs,
+            include_negative,
+            image_paths,
+            partial=partial,
+            tuner=PoolAutotuner(sample_files=min(256, max(1, len(image_paths) // 4))),
+            cancel_event=cancel_event,
+        )
+        return
+    # 배치 크기를 고정한다. 창 단위로 보내므로 취소하면 남은 경로는 풀에 보내지 않는다.
+    yield from iter_tuned_rows(
+        pool,
+        variable_specs,
+        include_negative,
+        image_paths,
+        partial=partial,
+        chunksize=_compute_chunksize(len(image_paths)),
+        cancel_event=cancel_event,
+    )
+
+
 def rename_task(
     out_queue: "queue.Queue",
     image_paths: list[str],
@@ -26,80 +76,31 @@ def rename_task(
     prefix_mode: bool,
     dry_run: bool,
     include_negative: bool,
+    partial: PartialMatchPolicy | None = None,
+    pool: WorkerPool | None = None,
+    autotune: bool = True,
+    prefetch: bool = False,
+    cancel_event: CancelEvent | None = None,
+    progress_interval: float = 0.5,
 ) -> None:
-    reserved = {Path(path).name.lower() for path in image_paths}
-    chunksize = _compute_chunksize(len(image_paths))
-
-    with multiprocessing.Pool(
-        processes=multiprocessing.cpu_count(),
-        initializer=init_worker,
-        initargs=(variable_specs, include_negative),
-    ) as pool:
-        for result in pool.imap_unordered(process_image, image_paths, chunksize=chunksize):
-            path = result.get("path")
-            if result.get("error"):
-                out_queue.put(
-                    (
-                        "result",
-                        "ERROR",
-                        {"source": path, "target": None, "message": str(result["error"])},
-                    )
-                )
-                continue
-
-            matches = result.get("matches", {})
-            status = "OK"
-            values_map: dict[str, str] = {}
-            for key in order:
-                match = matches.get(key)
-                if not match or match.get("status") != "OK":
-                    status = (
-                        "CONFLICT"
-                        if match and match.get("status") == "CONFLICT"
-                        else "UNKNOWN"
-                    )
-                    break
-                values_map[key] = match.get("values", [""])[0]
-
-            if status != "OK":
-                out_queue.put(
-                    (
-                        "result",
-                        status,
-                        {"source": path, "target": None, "message": None},
-                    )
-                )
-                continue
-
-            base_name = render_template(template, values_map)
-            base_name = sanitize_filename(base_name)
-            if prefix_mode:
-                stem = Path(path).stem
-                if base_name:
-                    joiner = "" if base_name.endswith("_") else "_"
-                    base_name = f"{base_name}{joiner}{stem}"
-                else:
-                    base_name = stem
-
-            ext = Path(path).suffix
-            new_name = ensure_unique_name(Path(path).parent, base_name, ext, reserved)
-            target = str(Path(path).with_name(new_name))
-            if not dry_run and target != path:
-                try:
-                    os.rename(path, target)
-                except Exception as exc:
-                    out_queue.put(
-                        (
-                            "result",
-                            "ERROR",
-                            {"source": path, "target": None, "message": str(exc)},
-                        )
-                    )
-                    continue
-            out_queue.put(
-                ("result", "OK", {"source": path, "target": target, "message": None})
-            )
-
+    reserved = NameIndex(Path(path).name for path in image_paths)
+    reporter = TaskReporter(out_queue, len(image_paths), progress_interval)
+    results = _iter_results(
+        pool or get_worker_pool(),
+        variable_specs,
+        include_negative,
+        image_paths,
+        partial,
+        autotune,
+        prefetch,
+        cancel_event,
+    )
+    consume_results(
+        results,
+        reporter,
+        lambda row: rename_result(row, order, template, prefix_mode, dry_run, reserved),
+        cancel_event,
+    )
     out_queue.put(("done", None))
 
 
@@ -112,89 +113,33 @@ def move_task(
     target_root: str,
     dry_run: bool,
     include_negative: bool,
+    partial: PartialMatchPolicy | None = None,
+    pool: WorkerPool | None = None,
+    autotune: bool = True,
+    prefetch: bool = False,
+    cancel_event: CancelEvent | None = None,
+    progress_interval: float = 0.5,
 ) -> None:
-    chunksize = _compute_chunksize(len(image_paths))
-    reserved_map: dict[str, set[str]] = {}
-
-    with multiprocessing.Pool(
-        processes=multiprocessing.cpu_count(),
-        initializer=init_worker,
-        initargs=(variable_specs, include_negative),
-    ) as pool:
-        for result in pool.imap_unordered(process_image, image_paths, chunksize=chunksize):
-            path = result.get("path")
-            if result.get("error"):
-                out_queue.put(
-                    (
-                        "result",
-                        "ERROR",
-                        {"source": path, "target": None, "message": str(result["error"])},
-                    )
-                )
-                continue
-
-            matches = result.get("matches", {})
-            match = matches.get(variable_name, {})
-            status = match.get("status") or "UNKNOWN"
-
-            if status != "OK":
-                out_queue.put(
-                    (
-                        "result",
-                        status,
-                        {"source": path, "target": None, "message": None},
-                    )
-                )
-                continue
-
-            value_name = match.get("values", [""])[0]
-            folder_name = render_template(template, {"value": value_name})
-            folder_name = sanitize_filename(folder_name)
-            if not folder_name:
-                out_queue.put(
-                    (
-                        "result",
-                        "ERROR",
-                        {"source": path, "target": None, "message": "empty folder name"},
-                    )
-                )
-                continue
-
-            target_folder = str(Path(target_root) / folder_name)
-            if target_folder not in reserved_map:
-                try:
-                    names = {
-                        p.name.lower()
-                        for p in Path(target_folder).glob("*")
-                        if p.is_file()
-                    }
-                except FileNotFoundError:
-                    names = set()
-                reserved_map[target_folder] = names
-
-            reserved = reserved_map[target_folder]
-            ext = Path(path).suffix
-            base = Path(path).stem
-            new_name = ensure_unique_name(target_folder, base, ext, reserved)
-            target = str(Path(target_folder) / new_name)
-
-            if not dry_run:
-                Path(target_folder).mkdir(parents=True, exist_ok=True)
-                try:
-                    shutil.move(path, target)
-                except Exception as exc:
-                    out_queue.put(
-                        (
-                            "result",
-                            "ERROR",
-                            {"source": path, "target": None, "message": str(exc)},
-                        )
-                    )
-                    continue
-            out_queue.put(
-                ("result", "OK", {"source": path, "target": target, "message": None})
-            )
-
+    reserved = NameIndex()
+    reporter = TaskReporter(out_queue, len(image_paths), progress_interval)
+    results = _iter_results(
+        pool or get_worker_pool(),
+        variable_specs,
+        include_negative,
+        image_paths,
+        partial,
+        autotune,
+        prefetch,
+        cancel_event,
+    )
+    consume_results(
+        results,
+        reporter,
+        lambda row: move_result(
+            row, variable_name, template, target_root, dry_run, reserved
+        ),
+        cancel_event,
+    )
     out_queue.put(("done", None))
 
 
@@ -258,15 +203,23 @@ def search_task(
     image_paths: list[str],
     required_tags: list[str],
     include_negative: bool,
-    progress_step: int = 200,
+    cancel_event: CancelEvent | None = None,
+    progress_interval: float = 0.5,
 ) -> None:
     total = len(image_paths)
+    throttle = ProgressThrottle(total, progress_interval)
     matches = 0
     errors = 0
+    processed = 0
 
-    for idx, result in enumerate(
-        iter_search_results(image_paths, required_tags, include_negative), start=1
-    ):
+    for result in iter_search_results(image_paths, required_tags, include_negative):
+        if cancel_event is not None and cancel_event.is_set():
+            out_queue.put(
+                ("progress", processed, total, matches, errors, throttle.rate(processed))
+            )
+            out_queue.put(("cancelled", processed, total))
+            break
+        processed += 1
         path = result.get("path")
         if result.get("error"):
             errors += 1
@@ -283,7 +236,9 @@ def search_task(
                 ("result", "OK", {"source": path, "target": None, "message": None})
             )
 
-        if idx % progress_step == 0 or idx == total:
-            out_queue.put(("progress", idx, total, matches, errors))
+        if throttle.ready(processed):
+            out_queue.put(
+                ("progress", processed, total, matches, errors, throttle.rate(processed))
+            )
 
     out_queue.put(("done", matches, errors))
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Iterator
+
+UNDO_VERSION = 1
+UNDO_SUFFIX = ".undo.jsonl"
+UNDONE_SUFFIX = ".undone"
+
+# 첫 줄은 header {"op": "header", "version", "kind", "params", "created_at"}.
+# 이후 한 줄에 완료된 파일 작업 하나: {"s": 원래 경로, "t": 바뀐 경로}.
+# kind 가 link 면 t 는 만든 링크이고, 되돌리기는 링크 삭제다.
+
+
+class UndoLog:
+    """적용된 rename/move/link 의 되돌리기 기록.
+
+    완료된 작업만 추가하며, 버퍼는 record 묶음이 끝날 때(flush) 비우고 닫을 때 fsync 한다.
+    마지막 묶음이 디스크에 닿기 전에 멈추면 그 묶음은 기록에 없을 수 있다.
+    """
+
+    def __init__(self, path: str | Path, kind: str, params: dict[str, Any] | None = None) -> None:
+        self.path = Path(path)
+        self.kind = kind
+        self.count = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = open(self.path, "x", encoding="utf-8", newline="\n")
+        header = {
+            "op": "header",
+            "version": UNDO_VERSION,
+            "kind": kind,
+            "params": params or {},
+            "created_at": time.time(),
+        }
+        self._handle.write(json.dumps(header, ensure_ascii=False))
+        self._handle.write("\n")
+
+    @classmethod
+    def create(
+        cls,
+        folder: str | Path,
+        kind: str,
+        params: dict[str, Any] | None = None,
+    ) -> "UndoLog":
+        # 이름 순서가 곧 시간 순서가 되도록 초 아래 자리까지 넣는다.
+        now = time.time_ns()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now // 1_000_000_000))
+        name = f"{stamp}-{now % 1_000_000_000:09d}-{kind}{UNDO_SUFFIX}"
+        return cls(Path(folder) / name, kind, params)
+
+    def record(self, source: str, target: str) -> None:
+        line = json.dumps({"s": source, "t": target}, ensure_ascii=False)
+        with self._lock:
+            self._handle.write(line)
+            self._handle.write("\n")
+            self.count += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle.closed:
+                return
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+            self._handle.close()
+        if not self.count:
+            # 실제로 바뀐 파일이 없으면 되돌릴 것도 없다.
+            self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "UndoLog":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+def read_undo_log(path: str | Path) -> tuple[dict[str, Any], list[tuple[str, str]]]:
+    """header 와 (원래 경로, 바뀐 경로) 목록을 기록된 순서대로 돌려준다."""
+    with open(path, "r", encoding="utf-8") as handle:
+        header = json.loads(handle.readline())
+        if header.get("op") != "header" or header.get("version") != UNDO_VERSION:
+            raise ValueError(f"not an undo log: {path}")
+        entries: list[tuple[str, str]] = []
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 마지막 줄이 쓰다 만 채로 끊긴 경우다.
+                continue
+            entries.append((str(entry["s"]), str(entry["t"])))
+    return header, entries
+
+
+def iter_undo_logs(folder: str | Path) -> Iterator[Path]:
+    """아직 되돌리지 않은 기록을 최신순으로."""
+    try:
+        paths = [path for path in Path(folder).iterdir() if path.name.endswith(UNDO_SUFFIX)]
+    except FileNotFoundError:
+        return iter(())
+    return iter(sorted(paths, key=lambda path: path.name, reverse=True))
@@ -3,17 +3,24 @@ from __future__ import annotations
 from typing import Any
 
 from ..extract.tags import extract_tags_from_image
+from ..match.partial import (
+    PartialMatchPolicy,
+    PartialVariableMatcher,
+    compile_partial_specs,
+    match_partial_specs,
+)
 
 
 _VARIABLE_SPECS: list[dict[str, Any]] = []
 _INCLUDE_NEGATIVE = False
+_PARTIAL_MATCHERS: list[PartialVariableMatcher] | None = None
 
 
 def _normalize_tag(tag: str) -> str:
     return " ".join(tag.split()).strip()
 
 
-def _normalize_tags(tags: list[str]) -> set[str]:
+def normalize_tag_set(tags: list[str]) -> set[str]:
     normalized: set[str] = set()
     for tag in tags:
         cleaned = _normalize_tag(tag)
@@ -31,7 +38,7 @@ def build_variable_specs(variables: list[dict[str, Any]]) -> list[dict[str, Any]
             values_spec.append(
                 {
                     "name": value.get("name") or "",
-                    "tag_set": _normalize_tags(list(tags)),
+                    "tag_set": normalize_tag_set(list(tags)),
                 }
             )
         name = var.get("name") or var.get("display_name") or var.get("key") or ""
@@ -39,38 +46,102 @@ def build_variable_specs(variables: list[dict[str, Any]]) -> list[dict[str, Any]
     return specs
 
 
+def match_spec_positions(spec: dict[str, Any], tag_set: set[str]) -> list[int]:
+    return [
+        pos
+        for pos, value in enumerate(spec["values"])
+        if value["tag_set"] and value["tag_set"].issubset(tag_set)
+    ]
+
+
+def match_variable_spec(spec: dict[str, Any], tag_set: set[str]) -> dict[str, Any]:
+    values = spec["values"]
+    matched = [values[pos]["name"] for pos in match_spec_positions(spec, tag_set)]
+    if not matched:
+        status = "UNKNOWN"
+    elif len(matched) == 1:
+        status = "OK"
+    else:
+        status = "CONFLICT"
+    return {"status": status, "values": matched}
+
+
 def match_variable_specs(
     variable_specs: list[dict[str, Any]],
     tags: list[str],
 ) -> dict[str, dict[str, Any]]:
-    tag_set = _normalize_tags(tags)
+    tag_set = normalize_tag_set(tags)
     matches: dict[str, dict[str, Any]] = {}
     for spec in variable_specs:
-        matched = [
-            value["name"]
-            for value in spec["values"]
-            if value["tag_set"] and value["tag_set"].issubset(tag_set)
-        ]
-        if not matched:
-            status = "UNKNOWN"
-        elif len(matched) == 1:
-            status = "OK"
-        else:
-            status = "CONFLICT"
-        matches[spec["name"]] = {"status": status, "values": matched}
+        matches[spec["name"]] = match_variable_spec(spec, tag_set)
     return matches
 
 
-def init_worker(variable_specs: list[dict[str, Any]], include_negative: bool) -> None:
-    global _VARIABLE_SPECS, _INCLUDE_NEGATIVE
+def init_worker(
+    variable_specs: list[dict[str, Any]],
+    include_negative: bool,
+    partial: PartialMatchPolicy | None = None,
+) -> None:
+    global _VARIABLE_SPECS, _INCLUDE_NEGATIVE, _PARTIAL_MATCHERS
     _VARIABLE_SPECS = variable_specs
     _INCLUDE_NEGATIVE = include_negative
-
-
-def process_image(path: str) -> dict[str, Any]:
+    _PARTIAL_MATCHERS = compile_partial_specs(variable_specs, partial) if partial else None
+
+
+def _extract_tags(
+    path: str,
+    data: bytes | memoryview | None,
+    complete: bool,
+    include_negative: bool,
+) -> list[str]:
+    if data is None:
+        return extract_tags_from_image(path, include_negative)
+    tags = extract_tags_from_image(data, include_negative)
+    if not tags and not complete:
+        # 앞부분에서 메타데이터를 찾지 못하면 파일 전체를 직접 연다.
+        tags = extract_tags_from_image(path, include_negative)
+    return tags
+
+
+def process_image(
+    path: str,
+    data: bytes | memoryview | None = None,
+    complete: bool = True,
+) -> dict[str, Any]:
+    """data 가 있으면 미리 읽은 파일 내용에서 태그를 뽑고, 없으면 path 를 직접 연다.
+
+    complete 가 False 이면 data 는 파일 앞부분(메타데이터)만 담고 있다.
+    """
     try:
-        tags = extract_tags_from_image(path, _INCLUDE_NEGATIVE)
-        matches = match_variable_specs(_VARIABLE_SPECS, tags)
+        tags = _extract_tags(path, data, complete, _INCLUDE_NEGATIVE)
+        if _PARTIAL_MATCHERS is not None:
+            matches = match_partial_specs(_PARTIAL_MATCHERS, normalize_tag_set(tags))
+        else:
+            matches = match_variable_specs(_VARIABLE_SPECS, tags)
         return {"path": path, "matches": matches, "error": None}
     except Exception as exc:
         return {"path": path, "matches": {}, "error": str(exc)}
+
+
+def extract_image_tags(
+    include_negative: bool,
+    path: str,
+    data: bytes | memoryview | None = None,
+    complete: bool = True,
+) -> tuple[list[str] | None, str | None]:
+    """템플릿 없이 태그만 뽑는다. (태그, None) 또는 실패 시 (None, 오류 메시지)."""
+    try:
+        return _extract_tags(path, data, complete, include_negative), None
+    except Exception as exc:
+        return None, str(exc)
+
+
+def process_image_positions(path: str) -> list[list[int]] | str:
+    """변수 순서대로 매치된 값 위치 목록을 돌려준다. 실패하면 오류 메시지 문자열."""
+    try:
+        tag_set = normalize_tag_set(extract_tags_from_image(path, _INCLUDE_NEGATIVE))
+        if _PARTIAL_MATCHERS is not None:
+            return [matcher.match_positions(tag_set) for matcher in _PARTIAL_MATCHERS]
+        return [match_spec_positions(spec, tag_set) for spec in _VARIABLE_SPECS]
+    except Exception as exc:
+        return str(exc)
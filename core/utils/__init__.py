@@ -1,6 +1,18 @@
-from .file_ops import ensure_unique_name, render_template, sanitize_filename
-from .files import iter_image_files
-from .progress import format_eta
+from .file_ops import (
+    NameIndex,
+    copy_file,
+    ensure_unique_name,
+    file_digest,
+    is_same_device,
+    link_file,
+    move_file,
+    render_template,
+    sanitize_filename,
+    target_exists,
+)
+from .files import IMAGE_EXTENSIONS, ScanStats, iter_image_files, scan_files
+from .progress import ProgressThrottle, format_eta
+from .read_order import READ_ORDERS, advise_sequential, disk_order, is_rotational, order_for_read
 from .tag_sets import (
     compute_common_tags,
     remove_common_tags,
@@ -8,11 +20,27 @@ from .tag_sets import (
 )
 
 __all__ = [
+    "NameIndex",
+    "copy_file",
     "ensure_unique_name",
+    "file_digest",
+    "is_same_device",
+    "link_file",
+    "move_file",
+    "target_exists",
     "render_template",
     "sanitize_filename",
+    "IMAGE_EXTENSIONS",
+    "ScanStats",
     "iter_image_files",
+    "scan_files",
+    "READ_ORDERS",
+    "advise_sequential",
+    "disk_order",
+    "is_rotational",
+    "order_for_read",
     "format_eta",
+    "ProgressThrottle",
     "compute_common_tags",
     "remove_common_tags",
     "remove_common_tags_from_values",
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import errno
+import hashlib
+import os
 from pathlib import Path
+import shutil
+import sys
+from typing import Iterable
 
 
 _INVALID_CHARS = '<>:"/\\|?*'
@@ -22,14 +28,230 @@ def render_template(template: str, mapping: dict[str, str]) -> str:
     return result.strip()
 
 
+def _normalize_extension(extension: str) -> str:
+    return extension if extension.startswith(".") or extension == "" else f".{extension}"
+
+
+class NameIndex:
+    """폴더별로 이미 쓰인 파일 이름(소문자)과 base 별 다음 @@@N 번호를 기억한다.
+
+    폴더는 처음 쓸 때 scandir 한 번으로 읽고, 이후 이름 배정은 디스크를 보지 않는다.
+    reserved 는 모든 폴더에 공통으로 예약할 이름이다(예: 작업 대상 이미지 이름).
+    이름은 추가만 되므로 번호 카운터는 뒤로 돌아갈 필요가 없다.
+    ensure_folder 는 있는 것으로 확인된 폴더를 기억해서 폴더마다 한 번만 만든다.
+    """
+
+    def __init__(self, reserved: Iterable[str] = ()) -> None:
+        self.reserved = {name.lower() for name in reserved}
+        self._folders: dict[str, set[str]] = {}
+        self._next_suffix: dict[tuple[str, str, str], int] = {}
+        self._existing: set[str] = set()
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and name.lower() in self.reserved
+
+    def add(self, name: str) -> None:
+        self.reserved.add(name.lower())
+
+    def update(self, names: Iterable[str]) -> None:
+        self.reserved.update(name.lower() for name in names)
+
+    def _folder_names(self, folder: str | Path) -> tuple[str, set[str]]:
+        key = os.path.normcase(os.path.abspath(folder))
+        names = self._folders.get(key)
+        if names is None:
+            try:
+                with os.scandir(key) as entries:
+                    names = {entry.name.lower() for entry in entries}
+            except (FileNotFoundError, NotADirectoryError):
+                names = set()
+            else:
+                self._existing.add(key)
+            self._folders[key] = names
+        return key, names
+
+    def unique_name(self, folder: str | Path, base_name: str, extension: str) -> str:
+        base = sanitize_filename(base_name)
+        ext = _normalize_extension(extension)
+        key, names = self._folder_names(folder)
+        reserved = self.reserved
+
+        candidate = f"{base}{ext}"
+        candidate_lower = candidate.lower()
+        if candidate_lower not in reserved and candidate_lower not in names:
+            names.add(candidate_lower)
+            return candidate
+
+        counter_key = (key, base.lower(), ext.lower())
+        index = self._next_suffix.get(counter_key, 1)
+        while True:
+            candidate = f"{base}@@@{index}{ext}"
+            candidate_lower = candidate.lower()
+            index += 1
+            if candidate_lower not in reserved and candidate_lower not in names:
+                break
+        self._next_suffix[counter_key] = index
+        names.add(candidate_lower)
+        return candidate
+
+    def ensure_folder(self, folder: str | Path) -> None:
+        path = os.path.abspath(folder)
+        key = os.path.normcase(path)
+        if key in self._existing:
+            return
+        # normcase 는 Windows 에서 소문자로 바꾸므로 만들 때는 원래 경로를 쓴다.
+        os.makedirs(path, exist_ok=True)
+        self._existing.add(key)
+        self._folders.setdefault(key, set())
+
+
+COPY_BUFFER_SIZE = 1024 * 1024
+# copy_file_range/sendfile 을 못 쓰는 조합(파일 시스템, 커널)에서 나는 오류. 첫 호출에서만 일반 복사로 넘어간다.
+_FAST_COPY_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EBADF,
+    getattr(errno, "EOPNOTSUPP", errno.EINVAL),
+    getattr(errno, "ENOTSUP", errno.EINVAL),
+}
+
+
+def _nearest_existing(path: str | Path) -> str:
+    current = os.path.abspath(path)
+    while not os.path.exists(current):
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    return current
+
+
+def is_same_device(source: str | Path, target: str | Path) -> bool:
+    """두 경로가 같은 파일 시스템에 있는지. target 은 아직 없어도 되며 가장 가까운 상위 폴더로 본다."""
+    try:
+        return os.stat(_nearest_existing(source)).st_dev == os.stat(_nearest_existing(target)).st_dev
+    except OSError:
+        return False
+
+
+def _fast_copy(copy_chunk, size: int) -> int:
+    # copy_chunk(count) 는 복사한 바이트 수를 돌려준다. 지원하지 않으면 0 을 돌려주고 끝낸다.
+    copied = 0
+    while copied < size:
+        try:
+            count = copy_chunk(min(size - copied, 1 << 30), copied)
+        except OSError as exc:
+            if copied == 0 and exc.errno in _FAST_COPY_UNSUPPORTED:
+                return 0
+            raise
+        if count == 0:
+            break
+        copied += count
+    return copied
+
+
+def _copy_data(src, dst, size: int) -> None:
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    copied = 0
+    if size and hasattr(os, "copy_file_range"):
+        # NFS 4.2/SMB3 에서는 서버 쪽 복사가 되어 데이터가 클라이언트를 거치지 않는다.
+        copied = _fast_copy(lambda count, _offset: os.copy_file_range(src_fd, dst_fd, count), size)
+    if copied == 0 and size and hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        copied = _fast_copy(lambda count, offset: os.sendfile(dst_fd, src_fd, offset, count), size)
+    if copied:
+        src.seek(copied)
+        dst.seek(copied)
+    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+
+def file_digest(path: str | Path) -> str:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(COPY_BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file(source: str | Path, target: str | Path, *, verify: bool = False) -> None:
+    """source 를 target 으로 복사한다. 임시 이름에 쓴 뒤 마지막에 target 으로 바꾸므로
+    중간에 끊겨도 target 이 반쯤 쓰인 채로 남지 않는다. verify 면 체크섬을 비교한다."""
+    target = Path(target)
+    partial = target.with_name(f".{target.name}.part")
+    try:
+        with open(source, "rb") as src, open(partial, "wb") as dst:
+            _copy_data(src, dst, os.fstat(src.fileno()).st_size)
+        shutil.copystat(source, partial)
+        if verify and file_digest(source) != file_digest(partial):
+            raise OSError(f"copy verification failed: {source}")
+        os.replace(partial, target)
+    except BaseException:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+        raise
+
+
+def move_file(
+    source: str | Path,
+    target: str | Path,
+    *,
+    cross_device: bool = False,
+    verify: bool = False,
+) -> None:
+    """같은 드라이브면 rename 한 번으로 옮기고, 다른 드라이브면 복사 후 원본을 지운다.
+
+    cross_device 를 미리 알면 rename 시도 없이 바로 복사한다. verify 면 복사본의
+    체크섬이 같을 때만 원본을 지운다.
+    """
+    if not cross_device:
+        try:
+            os.rename(source, target)
+            return
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                raise
+    copy_file(source, target, verify=verify)
+    os.remove(source)
+
+
+def link_file(source: str | Path, target: str | Path, *, hard: bool) -> None:
+    """파일을 옮기지 않고 target 에 링크를 만든다. hard 가 아니면 상대 경로 심볼릭 링크.
+
+    같은 원본을 가리키는 링크가 이미 있으면(중단 후 재실행) 그대로 둔다.
+    """
+    if os.path.lexists(target):
+        try:
+            if os.path.samefile(source, target):
+                return
+        except OSError:
+            pass
+    if hard:
+        os.link(source, target)
+    else:
+        relative = os.path.relpath(os.path.abspath(source), os.path.dirname(os.path.abspath(target)))
+        os.symlink(relative, target)
+
+
+def target_exists(source: str | Path, target: str | Path) -> bool:
+    """target 이 source 와 다른 파일로 이미 있으면 True. 대소문자만 다른 같은 파일은 False."""
+    try:
+        return not os.path.samefile(source, target)
+    except OSError:
+        return os.path.lexists(target)
+
+
 def ensure_unique_name(
     folder: str | Path,
     base_name: str,
     extension: str,
-    reserved: set[str],
+    reserved: set[str] | NameIndex,
 ) -> str:
+    if isinstance(reserved, NameIndex):
+        return reserved.unique_name(folder, base_name, extension)
     base = sanitize_filename(base_name)
-    ext = extension if extension.startswith(".") or extension == "" else f".{extension}"
+    ext = _normalize_extension(extension)
     candidate = f"{base}{ext}"
     candidate_lower = candidate.lower()
     folder_path = Path(folder)
@@ -1,15 +1,241 @@
 from __future__ import annotations
 
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from fnmatch import fnmatchcase
 import os
 from pathlib import Path
+import threading
+import time
+from typing import Iterable, Iterator, NamedTuple, Sequence
 
+IMAGE_EXTENSIONS = (".png", ".webp", ".jpg", ".jpeg")
+_FILE_ATTRIBUTE_HIDDEN = 0x2
 
-def iter_image_files(folder: str | Path) -> list[str]:
-    folder_path = Path(folder)
-    results: list[str] = []
-    for root, _dirs, files in os.walk(folder_path):
-        for name in files:
-            lower = name.lower()
-            if lower.endswith((".png", ".webp", ".jpg", ".jpeg")):
-                results.append(str(Path(root) / name))
-    return results
+
+def _matches(patterns: Sequence[str], rel_path: str, name: str) -> bool:
+    # 패턴은 작업 폴더 기준 상대 경로(/ 구분) 또는 이름에 대소문자 구분 없이 맞춘다.
+    rel_lower = rel_path.lower()
+    name_lower = name.lower()
+    return any(fnmatchcase(rel_lower, pattern) or fnmatchcase(name_lower, pattern) for pattern in patterns)
+
+
+def _is_hidden(entry: os.DirEntry) -> bool:
+    if entry.name.startswith("."):
+        return True
+    if os.name == "nt":
+        # Windows 에서는 scandir 가 속성을 함께 주므로 stat 호출 비용이 없다.
+        try:
+            attributes = entry.stat(follow_symlinks=False).st_file_attributes
+        except OSError:
+            return False
+        return bool(attributes & _FILE_ATTRIBUTE_HIDDEN)
+    return False
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _list_dir(path: str, sort: bool) -> list[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            listed = list(entries)
+    except OSError:
+        # os.walk 와 같이 읽을 수 없는 폴더는 건너뛴다.
+        return []
+    if sort:
+        listed.sort(key=lambda entry: entry.name)
+    return listed
+
+
+class ScanStats:
+    """폴더 스캔 통계. 스캔하는 스레드(내보내는 쪽)에서만 갱신한다."""
+
+    def __init__(self) -> None:
+        self.folders = 0
+        self.files = 0
+        self.elapsed = 0.0
+        self._start_time = time.monotonic()
+
+    def start(self) -> None:
+        self._start_time = time.monotonic()
+
+    def add_folder(self) -> None:
+        self.folders += 1
+        self.elapsed = time.monotonic() - self._start_time
+
+    def add_file(self) -> None:
+        self.files += 1
+
+    def folders_per_second(self) -> float:
+        return self.folders / self.elapsed if self.elapsed > 0 else 0.0
+
+    def format_summary(self) -> str:
+        return (
+            f"folders={self.folders} files={self.files} "
+            f"elapsed={self.elapsed:.2f}s rate={self.folders_per_second():.0f} folders/s"
+        )
+
+
+class _ScanOptions(NamedTuple):
+    suffixes: tuple[str, ...] | None
+    include: list[str]
+    exclude: list[str]
+    max_depth: int | None
+    skip_hidden: bool
+    sort: bool
+
+
+def _read_folder(
+    path: str,
+    depth: int,
+    prefix: str,
+    options: _ScanOptions,
+) -> tuple[list[os.DirEntry], list[tuple[os.DirEntry, str]]]:
+    """폴더 하나를 읽어 (파일 목록, [(내려갈 폴더, 상대 경로 접두어)]) 를 나열 순서대로 돌려준다."""
+    files: list[os.DirEntry] = []
+    folders: list[tuple[os.DirEntry, str]] = []
+    for entry in _list_dir(path, options.sort):
+        name = entry.name
+        if options.skip_hidden and _is_hidden(entry):
+            continue
+        rel_path = f"{prefix}{name}"
+        if _is_dir(entry):
+            if entry.is_symlink() or (options.max_depth is not None and depth >= options.max_depth):
+                continue
+            if options.exclude and _matches(options.exclude, rel_path, name):
+                continue
+            folders.append((entry, f"{rel_path}/"))
+            continue
+        if options.suffixes is not None and not name.lower().endswith(options.suffixes):
+            continue
+        if options.include and not _matches(options.include, rel_path, name):
+            continue
+        if options.exclude and _matches(options.exclude, rel_path, name):
+            continue
+        files.append(entry)
+    return files, folders
+
+
+def _scan_serial(root: str, options: _ScanOptions, stats: ScanStats) -> Iterator[os.DirEntry]:
+    # os.walk(topdown) 과 같이 폴더의 파일을 모두 내보낸 뒤 하위 폴더로 나열 순서대로 내려간다.
+    stack: list[tuple[str, int, str]] = [(root, 0, "")]
+    while stack:
+        path, depth, prefix = stack.pop()
+        files, folders = _read_folder(path, depth, prefix, options)
+        stats.add_folder()
+        for entry in files:
+            stats.add_file()
+            yield entry
+        stack.extend(
+            (entry.path, depth + 1, child_prefix) for entry, child_prefix in reversed(folders)
+        )
+
+
+def _scan_parallel(
+    root: str,
+    options: _ScanOptions,
+    stats: ScanStats,
+    workers: int,
+    ordered: bool,
+) -> Iterator[os.DirEntry]:
+    # 폴더를 읽자마자 하위 폴더 읽기를 스레드 풀에 넘기므로, 왕복 지연이 큰 공유 폴더에서도
+    # 최대 workers 개 폴더를 동시에 읽는다. 결과를 내보내는 일은 이 제너레이터에서만 한다.
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+
+    def read(path: str, depth: int, prefix: str) -> tuple[list[os.DirEntry], list[Future]]:
+        if stop.is_set():
+            return [], []
+        files, folders = _read_folder(path, depth, prefix, options)
+        children: list[Future] = []
+        for entry, child_prefix in folders:
+            try:
+                children.append(executor.submit(read, entry.path, depth + 1, child_prefix))
+            except RuntimeError:
+                # 소비자가 멈춰 풀이 이미 닫혔다.
+                return [], []
+        return files, children
+
+    try:
+        root_future = executor.submit(read, root, 0, "")
+        if ordered:
+            # 순서대로 내보내기: 직렬 스캔과 같은 순서로 각 폴더 결과를 기다린다.
+            stack = [root_future]
+            while stack:
+                files, children = stack.pop().result()
+                stats.add_folder()
+                for entry in files:
+                    stats.add_file()
+                    yield entry
+                stack.extend(reversed(children))
+        else:
+            pending = {root_future}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, children = future.result()
+                    stats.add_folder()
+                    pending.update(children)
+                    for entry in files:
+                        stats.add_file()
+                        yield entry
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def scan_files(
+    folder: str | Path,
+    *,
+    extensions: Iterable[str] | None = IMAGE_EXTENSIONS,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = (),
+    max_depth: int | None = None,
+    skip_hidden: bool = False,
+    sort: bool = False,
+    workers: int = 1,
+    ordered: bool = True,
+    stats: ScanStats | None = None,
+) -> Iterator[os.DirEntry]:
+    """folder 아래 파일을 os.scandir 로 찾으면서 바로 하나씩 내보낸다.
+
+    DirEntry 를 그대로 내보내므로 entry.stat() 은 한 번만 디스크를 본다(Windows 는 0번).
+    extensions 가 None 이면 확장자를 보지 않는다. include/exclude 는 상대 경로나 이름에
+    맞추는 glob 이고, exclude 에 맞는 폴더는 내려가지 않는다. max_depth 0 은 folder 바로
+    아래만 본다. 순서는 os.walk 와 같이 폴더의 파일을 먼저 내보낸 뒤 하위 폴더로 내려가고,
+    sort 면 폴더마다 이름순으로 읽는다. 폴더 심볼릭 링크는 따라가지 않는다.
+
+    workers 가 2 이상이면 하위 폴더를 스레드 workers 개로 동시에 읽는다(NAS/SMB 용).
+    ordered 면 결과 순서가 workers 1 과 같고, 아니면 폴더를 다 읽은 순서대로 내보낸다.
+    stats 를 주면 읽은 폴더/파일 수와 초당 폴더 수를 채운다.
+    """
+    options = _ScanOptions(
+        suffixes=tuple(ext.lower() for ext in extensions) if extensions is not None else None,
+        include=[pattern.lower() for pattern in include],
+        exclude=[pattern.lower() for pattern in exclude],
+        max_depth=max_depth,
+        skip_hidden=skip_hidden,
+        sort=sort,
+    )
+    root = os.fspath(Path(folder))
+    stats = stats if stats is not None else ScanStats()
+    stats.start()
+    if workers > 1:
+        return _scan_parallel(root, options, stats, workers, ordered)
+    return _scan_serial(root, options, stats)
+
+
+def iter_image_files(
+    folder: str | Path,
+    *,
+    sort: bool = False,
+    workers: int = 1,
+    stats: ScanStats | None = None,
+) -> Iterator[str]:
+    """folder 아래 이미지 경로를 찾는 대로 내보낸다. 순서와 옵션은 scan_files 와 같다."""
+    for entry in scan_files(folder, sort=sort, workers=workers, stats=stats):
+        yield entry.path
@@ -13,3 +13,24 @@ def format_eta(processed: int, total: int, start_time: float) -> str:
     minutes = (eta_seconds % 3600) // 60
     seconds = eta_seconds % 60
     return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressThrottle:
+    """진행 이벤트를 interval 초에 한 번 이하로 제한하고 처리 속도(개/초)를 계산한다."""
+
+    def __init__(self, total: int, interval: float = 0.5) -> None:
+        self.total = total
+        self.interval = interval
+        self.start_time = time.monotonic()
+        self._last_emit = float("-inf")
+
+    def ready(self, processed: int) -> bool:
+        now = time.monotonic()
+        if processed < self.total and now - self._last_emit < self.interval:
+            return False
+        self._last_emit = now
+        return True
+
+    def rate(self, processed: int) -> float:
+        elapsed = time.monotonic() - self.start_time
+        return processed / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Iterable
+
+READ_ORDERS = ("path", "disk", "auto")
+
+
+def is_rotational(path: str | Path) -> bool:
+    """path 가 있는 블록 장치가 회전식 디스크(HDD)면 True. 알 수 없으면 False.
+
+    Linux 의 /sys/dev/block 정보를 본다. 네트워크 드라이브나 다른 OS 는 False 다.
+    """
+    if not hasattr(os, "major"):
+        return False
+    try:
+        device = os.stat(path).st_dev
+        sys_dir = Path(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}").resolve(strict=True)
+    except OSError:
+        return False
+    # 파티션(sda1)이면 queue 정보는 상위 장치(sda)에 있다.
+    for candidate in (sys_dir, sys_dir.parent):
+        try:
+            return (candidate / "queue" / "rotational").read_text().strip() == "1"
+        except OSError:
+            continue
+    return False
+
+
+def _disk_key(item: os.DirEntry | str, devices: dict[str, int]) -> tuple[int, int]:
+    if isinstance(item, str):
+        stat = os.stat(item)
+        return stat.st_dev, stat.st_ino
+    # POSIX 에서 inode 는 폴더를 읽을 때 함께 받으므로 추가 호출이 없다.
+    # 장치 번호는 파일이 아니라 폴더마다 한 번만 stat 한다.
+    folder = os.path.dirname(item.path)
+    device = devices.get(folder)
+    if device is None:
+        device = devices[folder] = os.stat(folder).st_dev
+    return device, item.inode()
+
+
+def disk_order(entries: Iterable[os.DirEntry | str]) -> list[str]:
+    """스캔 결과(DirEntry)나 경로를 (장치, inode) 순서로 정렬해 경로 목록으로 돌려준다.
+
+    ext4/NTFS 등은 inode(파일 번호)가 가까우면 디스크 위치도 가까우므로 HDD 탐색이 줄어든다.
+    inode 가 같거나 의미 없는 파일 시스템에서는 원래 순서를 유지한다(안정 정렬).
+    경로 문자열은 stat 으로 inode 를 읽는다. 읽을 수 없는 항목은 원래 순서대로 맨 뒤에 둔다.
+    """
+    devices: dict[str, int] = {}
+    keyed: list[tuple[int, int, str]] = []
+    missing: list[str] = []
+    for item in entries:
+        path = os.fspath(item)
+        try:
+            device, inode = _disk_key(item, devices)
+        except OSError:
+            missing.append(path)
+            continue
+        keyed.append((device, inode, path))
+    keyed.sort(key=lambda item: (item[0], item[1]))
+    return [path for _dev, _ino, path in keyed] + missing
+
+
+def order_for_read(
+    entries: Iterable[os.DirEntry | str],
+    read_order: str,
+    folder: str | Path,
+) -> Iterable[str]:
+    """read_order 에 따라 읽을 순서를 정해 경로를 돌려준다.
+
+    path 는 받은 순서 그대로 하나씩(스캔 결과면 스트리밍 그대로), disk 는 disk_order,
+    auto 는 folder 가 HDD 에 있을 때만 disk_order. disk_order 는 정렬해야 하므로 끝까지
+    읽는다. scan_files 의 DirEntry 를 넘기면 파일마다 stat 하지 않는다.
+    """
+    if read_order not in READ_ORDERS:
+        raise ValueError(f"unknown read order: {read_order}")
+    if read_order == "disk" or (read_order == "auto" and is_rotational(folder)):
+        return disk_order(entries)
+    return (os.fspath(item) for item in entries)
+
+
+def advise_sequential(fd: int) -> None:
+    """파일 전체를 앞에서부터 읽는다고 커널에 알려 미리 읽기 창을 키운다. 지원하지 않으면 무시한다."""
+    advise = getattr(os, "posix_fadvise", None)
+    if advise is None:
+        return
+    try:
+        advise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    except OSError:
+        pass
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from pathlib import Path
 import queue
 import threading
 import tkinter as tk
 from tkinter import ttk
 
 from ..result_panel import ResultPanel
+from ..services import (
+    OperationPlan,
+    ResultSummary,
+    configure_match_cache,
+    configure_undo_dir,
+)
 from ..state import AppState
 from ..template_editor import TemplateEditorPanel
 from .logging_mixin import AppLoggingMixin, QueueLogHandler
@@ -41,6 +48,8 @@ class ExifTkApp(
         self._init_widget_state()
 
         self._setup_logging()
+        configure_match_cache(Path("cache") / "match_cache.sqlite3")
+        configure_undo_dir(Path("cache") / "undo")
         self._build_ui()
         self._refresh_template_ui()
         self.root.after(100, self._poll_log_queue)
@@ -51,7 +60,10 @@ class ExifTkApp(
         self.cancel_event: threading.Event | None = None
         self.worker_status_var: tk.StringVar | None = None
         self.worker_on_done = None
+        self.worker_on_batch = None
         self.current_task_name: str | None = None
+        # 마지막 드라이런 계획. 같은 조건으로 실행하면 태그 추출 없이 이 계획을 적용한다.
+        self.task_plans: dict[str, OperationPlan] = {}
 
     def _init_view_state(self) -> None:
         self.view_vars = create_view_vars()
@@ -110,6 +122,8 @@ class ExifTkApp(
         self.move_log_header = ""
         self.rename_log_records: list[dict] = []
         self.move_log_records: list[dict] = []
+        self.rename_log_stats = ResultSummary()
+        self.move_log_stats = ResultSummary()
         self.nav_buttons: dict[str, ttk.Button] = {}
         self.tab_frames: dict[str, ttk.Frame] = {}
         self.active_tab = "template"
@@ -3,10 +3,31 @@ from __future__ import annotations
 import logging
 from tkinter import filedialog, messagebox
 
-from ..services import move_images, rename_images, search_images
+from ..services import (
+    MissingTagStats,
+    OperationPlan,
+    apply_plan,
+    move_images,
+    rename_images,
+    search_images,
+)
 
 
 class TaskActionsMixin:
+    def _reusable_plan(self, task: str, dry_run: bool, params: dict) -> OperationPlan | None:
+        # 실행 때만 쓴다. 드라이런 조건이 바뀌었으면 계획을 버리고 처음부터 다시 매칭한다.
+        plan = None if dry_run else self.task_plans.get(task)
+        if plan is not None and not plan.matches(task, params):
+            return None
+        return plan
+
+    def _store_plan(self, task: str, dry_run: bool, plan: OperationPlan | None) -> None:
+        # 실행 후에는 파일이 바뀌었으므로 이전 계획을 다시 쓰지 않는다.
+        if dry_run and plan is not None:
+            self.task_plans[task] = plan
+        else:
+            self.task_plans.pop(task, None)
+
     def _open_task_log(self, task: str) -> None:
         self._show_tab("log")
         if not self.log_notebook:
@@ -35,24 +56,27 @@ class TaskActionsMixin:
             self.search_result_panel.clear()
         self.search_status_var.set("검색 중...")
 
-        def work(progress_cb, cancel_cb):
+        def work(progress_cb, cancel_cb, batch_cb):
             return search_images(
                 folder,
                 tags,
                 include_negative=include_negative,
                 progress_cb=progress_cb,
                 cancel_cb=cancel_cb,
+                batch_cb=batch_cb,
             )
 
-        def done(results):
+        def on_batch(records):
             if self.search_result_panel:
-                self.search_result_panel.set_results(results)
+                self.search_result_panel.append_results(records)
+
+        def done(results):
             ok_count = sum(1 for item in results if item.get("status") == "OK")
             err_count = sum(1 for item in results if item.get("status") == "ERROR")
             self.search_status_var.set(f"완료: 매치 {ok_count} / 오류 {err_count}")
             logging.info("검색 완료: match=%d error=%d", ok_count, err_count)
 
-        self._run_async("검색", work, done, self.search_status_var)
+        self._run_async("검색", work, done, self.search_status_var, on_batch=on_batch)
 
     def _reset_rename_form(self) -> None:
         self.rename_folder_var.set("")
@@ -100,12 +124,33 @@ class TaskActionsMixin:
             messagebox.showerror("파일명 변경", f"사용 템플릿 로드/검증 실패: {exc}")
             return
 
+        plan_params = {
+            "folder": folder,
+            "order": order_text,
+            "prefix_mode": prefix_mode,
+            "include_negative": include_negative,
+            "preset": task_preset.model_dump(),
+        }
+        plan = self._reusable_plan("rename", dry_run, plan_params)
+        prepared: dict[str, OperationPlan] = {}
+
         if self.rename_result_panel:
             self.rename_result_panel.clear()
         self.rename_status_var.set("파일명 변경 실행 중...")
+        log_header = (
+            f"폴더={folder} | 사용템플릿={task_template_label} | "
+            f"순서={order_text} | 드라이런={dry_run}"
+        )
+        if plan is not None:
+            log_header += " | 드라이런 계획 적용"
+        self._begin_task_result_log("rename", header=log_header)
 
-        def work(progress_cb, cancel_cb):
-            return rename_images(
+        def work(progress_cb, cancel_cb, batch_cb):
+            if plan is not None:
+                return apply_plan(
+                    plan, progress_cb=progress_cb, cancel_cb=cancel_cb, batch_cb=batch_cb
+                )
+            results = rename_images(
                 task_preset,
                 folder,
                 order_text,
@@ -114,27 +159,33 @@ class TaskActionsMixin:
                 include_negative=include_negative,
                 progress_cb=progress_cb,
                 cancel_cb=cancel_cb,
+                batch_cb=batch_cb,
+                missing_stats=MissingTagStats(),
             )
+            # 끝까지 돈 드라이런만 계획으로 남긴다.
+            if dry_run and not cancel_cb():
+                prepared["plan"] = OperationPlan.from_results("rename", results, plan_params)
+            return results
 
-        def done(results):
+        def on_batch(records):
+            # 결과 패널과 로그 표는 배치가 도착할 때마다 이어 붙인다.
             if self.rename_result_panel:
-                self.rename_result_panel.set_results(results)
+                self.rename_result_panel.append_results(records)
+            self._append_task_result_log("rename", records)
+
+        def done(results):
             counts = self._status_counts(results)
             self.rename_status_var.set(
                 f"완료: OK {counts['OK']} UNKNOWN {counts['UNKNOWN']} "
                 f"CONFLICT {counts['CONFLICT']} ERROR {counts['ERROR']}"
             )
-            self._write_task_result_log(
-                "rename",
-                results,
-                header=(
-                    f"폴더={folder} | 사용템플릿={task_template_label} | "
-                    f"순서={order_text} | 드라이런={dry_run}"
-                ),
-            )
+            self._store_plan("rename", dry_run, prepared.get("plan"))
+            self._finish_task_result_log("rename", header=log_header)
             logging.info("파일명 변경 완료: %s", counts)
 
-        self._run_async("파일명 변경", work, done, self.rename_status_var)
+        self._run_async(
+            "파일명 변경", work, done, self.rename_status_var, on_batch=on_batch
+        )
 
     def _pick_move_source(self) -> None:
         path = filedialog.askdirectory(title="작업 폴더 선택")
@@ -161,12 +212,35 @@ class TaskActionsMixin:
         except Exception as exc:
             messagebox.showerror("분류", f"사용 템플릿 로드/검증 실패: {exc}")
             return
+        plan_params = {
+            "folder": source,
+            "target_root": target,
+            "order": order_items,
+            "folder_template": folder_template,
+            "include_negative": include_negative,
+            "preset": task_preset.model_dump(),
+        }
+        plan = self._reusable_plan("move", dry_run, plan_params)
+        prepared: dict[str, OperationPlan] = {}
+
         if self.move_result_panel:
             self.move_result_panel.clear()
         self.move_status_var.set("분류 실행 중...")
+        log_header = (
+            f"작업폴더={source} | 사용템플릿={task_template_label} | "
+            f"순서={','.join(order_items)} | "
+            f"드라이런={dry_run}"
+        )
+        if plan is not None:
+            log_header += " | 드라이런 계획 적용"
+        self._begin_task_result_log("move", header=log_header)
 
-        def work(progress_cb, cancel_cb):
-            return move_images(
+        def work(progress_cb, cancel_cb, batch_cb):
+            if plan is not None:
+                return apply_plan(
+                    plan, progress_cb=progress_cb, cancel_cb=cancel_cb, batch_cb=batch_cb
+                )
+            results = move_images(
                 task_preset,
                 source,
                 target,
@@ -176,25 +250,26 @@ class TaskActionsMixin:
                 include_negative=include_negative,
                 progress_cb=progress_cb,
                 cancel_cb=cancel_cb,
+                batch_cb=batch_cb,
+                missing_stats=MissingTagStats(),
             )
+            if dry_run and not cancel_cb():
+                prepared["plan"] = OperationPlan.from_results("move", results, plan_params)
+            return results
 
-        def done(results):
+        def on_batch(records):
             if self.move_result_panel:
-                self.move_result_panel.set_results(results)
+                self.move_result_panel.append_results(records)
+            self._append_task_result_log("move", records)
+
+        def done(results):
             counts = self._status_counts(results)
             self.move_status_var.set(
                 f"완료: OK {counts['OK']} UNKNOWN {counts['UNKNOWN']} "
                 f"CONFLICT {counts['CONFLICT']} ERROR {counts['ERROR']}"
             )
-            self._write_task_result_log(
-                "move",
-                results,
-                header=(
-                    f"작업폴더={source} | 사용템플릿={task_template_label} | "
-                    f"순서={','.join(order_items)} | "
-                    f"드라이런={dry_run}"
-                ),
-            )
+            self._store_plan("move", dry_run, prepared.get("plan"))
+            self._finish_task_result_log("move", header=log_header)
             logging.info("분류 완료: %s", counts)
 
-        self._run_async("분류", work, done, self.move_status_var)
+        self._run_async("분류", work, done, self.move_status_var, on_batch=on_batch)
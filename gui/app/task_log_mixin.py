@@ -3,18 +3,94 @@ from __future__ import annotations
 import tkinter as tk
 from tkinter import ttk
 
+from ..services import ResultSummary
+
 
 class TaskLogMixin:
     def _write_task_result_log(self, task: str, results: list[dict], *, header: str = "") -> None:
+        stats = ResultSummary()
+        stats.add(results)
         if task == "rename":
             self.rename_log_records = list(results)
+            self.rename_log_stats = stats
             self.rename_log_header = header
             self._refresh_rename_log_tree()
         else:
             self.move_log_records = list(results)
+            self.move_log_stats = stats
             self.move_log_header = header
             self._refresh_move_log_tree()
 
+    def _begin_task_result_log(self, task: str, *, header: str = "") -> None:
+        self._write_task_result_log(task, [], header=header)
+
+    def _append_task_result_log(self, task: str, records: list[dict]) -> None:
+        """작업 중 도착한 결과를 로그 표에 이어 붙이고 요약만 갱신한다."""
+        if task == "rename":
+            tree = self.rename_log_tree
+            filter_vars = self.rename_log_filter_vars
+            self.rename_log_records.extend(records)
+        else:
+            tree = self.move_log_tree
+            filter_vars = self.move_log_filter_vars
+            self.move_log_records.extend(records)
+        self._task_log_stats(task).add(records)
+        if tree:
+            for item in records:
+                status = str(item.get("status") or "INFO")
+                if self._status_allowed(status, filter_vars):
+                    self._insert_task_log_row(tree, item)
+        self._update_task_log_summary(task)
+
+    def _finish_task_result_log(self, task: str, *, header: str = "") -> None:
+        if task == "rename":
+            self.rename_log_header = header
+        else:
+            self.move_log_header = header
+        self._update_task_log_summary(task)
+
+    def _task_log_stats(self, task: str) -> ResultSummary:
+        return self.rename_log_stats if task == "rename" else self.move_log_stats
+
+    def _update_task_log_summary(self, task: str) -> None:
+        if task == "rename":
+            tree, summary_var, header = (
+                self.rename_log_tree,
+                self.rename_log_summary_var,
+                self.rename_log_header,
+            )
+        else:
+            tree, summary_var, header = (
+                self.move_log_tree,
+                self.move_log_summary_var,
+                self.move_log_header,
+            )
+        shown = len(tree.get_children()) if tree else 0
+        summary_var.set(self._task_log_summary_text(self._task_log_stats(task), shown, header))
+
+    @staticmethod
+    def _task_log_summary_text(stats: ResultSummary, shown: int, header: str) -> str:
+        counts_all = stats.status_counts()
+        summary = (
+            f"전체 OK {counts_all['OK']} | UNKNOWN {counts_all['UNKNOWN']} | "
+            f"CONFLICT {counts_all['CONFLICT']} | ERROR {counts_all['ERROR']} | "
+            f"표시 {shown}/{stats.total}"
+        )
+        unknown = stats.format_unknown(3)
+        if unknown:
+            summary = f"{summary} | UNKNOWN 사유: {unknown}"
+        if header:
+            summary = f"{summary} | {header}"
+        return summary
+
+    @staticmethod
+    def _insert_task_log_row(tree: ttk.Treeview, item: dict) -> None:
+        status = str(item.get("status") or "INFO")
+        before = str(item.get("source") or "")
+        after = str(item.get("target") or "") or "-"
+        detail = str(item.get("message") or "") or "-"
+        tree.insert("", tk.END, values=(status, before, after, detail), tags=(status,))
+
     def _status_allowed(self, status: str, filter_vars: dict[str, tk.BooleanVar]) -> bool:
         if status in filter_vars:
             return bool(filter_vars[status].get())
@@ -24,6 +100,7 @@ class TaskLogMixin:
         self._refresh_task_log_tree(
             tree=self.rename_log_tree,
             records=self.rename_log_records,
+            stats=self.rename_log_stats,
             filter_vars=self.rename_log_filter_vars,
             summary_var=self.rename_log_summary_var,
             header=self.rename_log_header,
@@ -33,6 +110,7 @@ class TaskLogMixin:
         self._refresh_task_log_tree(
             tree=self.move_log_tree,
             records=self.move_log_records,
+            stats=self.move_log_stats,
             filter_vars=self.move_log_filter_vars,
             summary_var=self.move_log_summary_var,
             header=self.move_log_header,
@@ -43,6 +121,7 @@ class TaskLogMixin:
         *,
         tree: ttk.Treeview | None,
         records: list[dict],
+        stats: ResultSummary,
         filter_vars: dict[str, tk.BooleanVar],
         summary_var: tk.StringVar,
         header: str,
@@ -55,22 +134,10 @@ class TaskLogMixin:
             if self._status_allowed(status, filter_vars):
                 filtered_records.append(item)
 
-        counts_all = self._status_counts(records)
-        summary = (
-            f"전체 OK {counts_all['OK']} | UNKNOWN {counts_all['UNKNOWN']} | "
-            f"CONFLICT {counts_all['CONFLICT']} | ERROR {counts_all['ERROR']} | "
-            f"표시 {len(filtered_records)}/{len(records)}"
-        )
-        if header:
-            summary = f"{summary} | {header}"
-        summary_var.set(summary)
+        summary_var.set(self._task_log_summary_text(stats, len(filtered_records), header))
 
         for item_id in tree.get_children():
             tree.delete(item_id)
 
         for item in filtered_records:
-            status = str(item.get("status") or "INFO")
-            before = str(item.get("source") or "")
-            after = str(item.get("target") or "") or "-"
-            detail = str(item.get("message") or "") or "-"
-            tree.insert("", tk.END, values=(status, before, after, detail), tags=(status,))
+            self._insert_task_log_row(tree, item)
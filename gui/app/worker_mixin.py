@@ -8,7 +8,14 @@ from tkinter import messagebox
 
 
 class WorkerMixin:
-    def _run_async(self, task_name: str, work_fn, on_done, status_var: tk.StringVar) -> None:
+    def _run_async(
+        self,
+        task_name: str,
+        work_fn,
+        on_done,
+        status_var: tk.StringVar,
+        on_batch=None,
+    ) -> None:
         if self.worker_thread and self.worker_thread.is_alive():
             messagebox.showwarning(task_name, "다른 작업이 실행 중입니다. 완료/취소 후 다시 시도하세요.")
             return
@@ -19,6 +26,7 @@ class WorkerMixin:
         self.cancel_event = threading.Event()
         self.worker_status_var = status_var
         self.worker_on_done = on_done
+        self.worker_on_batch = on_batch
 
         def progress_cb(processed: int, total: int) -> None:
             if self.worker_queue:
@@ -27,9 +35,17 @@ class WorkerMixin:
         def cancel_cb() -> bool:
             return bool(self.cancel_event and self.cancel_event.is_set())
 
+        def batch_cb(records: list[dict]) -> None:
+            if self.worker_queue:
+                self.worker_queue.put(("batch", records))
+
         def runner() -> None:
             try:
-                result = work_fn(progress_cb, cancel_cb)
+                if on_batch is None:
+                    result = work_fn(progress_cb, cancel_cb)
+                else:
+                    # 결과를 배치 단위로 먼저 흘려보내 작업 중에도 화면에 표시한다.
+                    result = work_fn(progress_cb, cancel_cb, batch_cb)
                 if self.worker_queue:
                     self.worker_queue.put(("done", result))
             except Exception as exc:
@@ -53,6 +69,9 @@ class WorkerMixin:
                         self.worker_status_var.set(f"진행 중... {processed}/{total}")
                     label = self.current_task_name or "작업"
                     self.sidebar_job_var.set(f"{label}: {processed}/{total}")
+                elif kind == "batch":
+                    if self.worker_on_batch:
+                        self.worker_on_batch(payload)
                 elif kind == "done":
                     if self.worker_on_done:
                         self.worker_on_done(payload)
@@ -74,6 +93,7 @@ class WorkerMixin:
             self.cancel_event = None
             self.worker_status_var = None
             self.worker_on_done = None
+            self.worker_on_batch = None
             self.current_task_name = None
             return
 
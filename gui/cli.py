@@ -0,0 +1,611 @@
+"""Tk 없이 서비스(rename/move/search/변수 생성)를 실행하는 배치 CLI.
+
+결과는 레코드마다 JSON 한 줄(JSON Lines)로 stdout 또는 --output 파일에 쓰고,
+요약은 stderr 로 보낸다. 종료 코드는 ERROR 레코드 수(최대 EXIT_MAX_ERRORS)이다.
+tkinter 를 import 하지 않으므로 디스플레이가 없는 환경에서도 동작한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import queue
+import sys
+from typing import IO, Sequence
+
+from core.match import PartialMatchPolicy
+from core.preset import Preset, load_preset, save_preset
+from core.runner import (
+    JobIncompleteError,
+    OperationJournal,
+    iter_undo_logs,
+    WorkerPool,
+    build_variable_specs,
+    create_job,
+    merge_job_task,
+    run_shard_worker,
+    wait_for_job,
+)
+from core.runner.shards import DEFAULT_LEASE_TIMEOUT, DEFAULT_SHARD_SIZE
+from core.utils import READ_ORDERS, ScanStats, order_for_read, scan_files
+
+from .services import (
+    DEFAULT_IO_WORKERS,
+    OperationPlan,
+    ResultSummary,
+    apply_plan,
+    build_variable_from_folder,
+    configure_match_cache,
+    configure_undo_dir,
+    move_images,
+    rename_images,
+    search_images,
+    teardown_view,
+    template_to_variables_payload,
+    undo_operations,
+)
+
+EXIT_OK = 0
+EXIT_MAX_ERRORS = 100
+EXIT_FAILED = 101
+EXIT_USAGE = 102
+DEFAULT_CACHE_PATH = Path("cache") / "match_cache.sqlite3"
+DEFAULT_UNDO_DIR = Path("cache") / "undo"
+
+
+class CliUsageError(Exception):
+    pass
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    # argparse 기본 종료 코드(2)는 오류 2건과 구분되지 않으므로 따로 올린다.
+    def error(self, message: str) -> None:  # type: ignore[override]
+        raise CliUsageError(f"{self.prog}: {message}")
+
+
+class JsonLinesWriter:
+    """서비스 batch_cb 로 받은 레코드를 바로 한 줄씩 쓰고 요약을 누적한다."""
+
+    def __init__(self, stream: IO[str]) -> None:
+        self.stream = stream
+        self.summary = ResultSummary()
+
+    def write(self, records: list[dict]) -> None:
+        for record in records:
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=str))
+            self.stream.write("\n")
+        self.stream.flush()
+        self.summary.add(records)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = _ArgumentParser(prog="exif-cli", description="태그 기반 이미지 정리 배치 실행")
+    common = _ArgumentParser(add_help=False)
+    common.add_argument("--output", "-o", help="JSON Lines 출력 파일 (기본: stdout)")
+    common.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    common.add_argument(
+        "--include-negative",
+        action="store_true",
+        help="네거티브 프롬프트 태그도 포함",
+    )
+
+    template_args = _ArgumentParser(add_help=False)
+    template_args.add_argument("--preset", required=True, help="템플릿(preset) JSON 경로")
+    template_args.add_argument("--order", required=True, help="변수 순서 (쉼표 구분)")
+    template_args.add_argument("--min-tags", type=int, default=None, help="부분 매칭: 최소 태그 수")
+    template_args.add_argument("--min-ratio", type=float, default=None, help="부분 매칭: 최소 비율")
+
+    cache_args = _ArgumentParser(add_help=False)
+    cache_args.add_argument(
+        "--cache",
+        default=str(DEFAULT_CACHE_PATH),
+        help="매치 캐시 sqlite 경로 (빈 문자열이면 메모리만 사용)",
+    )
+
+    io_args = _ArgumentParser(add_help=False)
+    io_args.add_argument(
+        "--io-workers",
+        type=int,
+        default=DEFAULT_IO_WORKERS,
+        help=f"동시에 실행할 파일 작업 수 (기본: {DEFAULT_IO_WORKERS}, 1 이면 순서대로)",
+    )
+    io_args.add_argument(
+        "--undo-dir",
+        default=str(DEFAULT_UNDO_DIR),
+        help="적용한 작업의 되돌리기 기록 폴더 (빈 문자열이면 기록하지 않음)",
+    )
+    io_args.add_argument(
+        "--verify-copy",
+        action="store_true",
+        help="분류: 다른 드라이브로 옮길 때 복사본 체크섬을 확인한 뒤 원본 삭제",
+    )
+
+    scan_args = _ArgumentParser(add_help=False)
+    scan_args.add_argument(
+        "--scan-workers",
+        type=int,
+        default=1,
+        help="하위 폴더를 동시에 읽을 스레드 수 (기본: 1, NAS/SMB 공유 폴더는 8~32 권장)",
+    )
+    scan_args.add_argument(
+        "--read-order",
+        choices=READ_ORDERS,
+        default="path",
+        help="이미지를 읽는 순서: path 경로순, disk 디스크 위치(inode)순, auto HDD 일 때만 disk (기본: path)",
+    )
+    scan_args.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="읽기 스레드가 이미지 메타데이터를 미리 읽어 워커에 넘김 (NAS 등 느린 저장소용)",
+    )
+
+    match_args = _ArgumentParser(
+        add_help=False,
+        parents=[template_args, cache_args, io_args, scan_args],
+    )
+    match_args.add_argument("--apply", action="store_true", help="실제로 실행 (기본: 미리보기)")
+    match_args.add_argument(
+        "--journal",
+        default=None,
+        help="작업 기록 파일. 중단되면 resume 명령으로 이어서 실행 (--apply 필요)",
+    )
+    match_args.add_argument(
+        "--save-plan",
+        default=None,
+        help="미리보기 결과를 계획 파일로 저장. apply-plan 으로 태그 추출 없이 실행",
+    )
+
+    sub = parser.add_subparsers(dest="command", required=True, parser_class=_ArgumentParser)
+
+    rename = sub.add_parser("rename", parents=[common, match_args], help="파일명 변경")
+    rename.add_argument("folder")
+    rename.add_argument("--template", default="", help="파일명 템플릿 (예: [char]_[pose])")
+    rename.add_argument("--prefix", action="store_true", help="기존 파일명 앞에 붙이기")
+
+    move = sub.add_parser("move", parents=[common, match_args], help="폴더 분류 이동")
+    move.add_argument("folder")
+    move.add_argument("target_root")
+    move.add_argument("--folder-template", default="", help="폴더 템플릿 (예: [char]/[pose])")
+    move.add_argument(
+        "--link",
+        action="store_true",
+        help="옮기지 않고 링크로 분류 보기 생성 (같은 드라이브는 하드 링크, 아니면 심볼릭 링크)",
+    )
+
+    undo = sub.add_parser(
+        "undo",
+        parents=[common, io_args],
+        help="적용한 rename/move 를 되돌리기 기록으로 원래대로 (기본: 가장 최근 기록)",
+    )
+    undo.add_argument("log", nargs="?", default=None)
+
+    teardown = sub.add_parser(
+        "view-teardown",
+        parents=[common],
+        help="--link 로 만든 분류 보기의 링크 삭제 (원본은 그대로)",
+    )
+    teardown.add_argument("target_root")
+
+    plan = sub.add_parser(
+        "apply-plan",
+        parents=[common, io_args],
+        help="--save-plan 으로 저장한 계획을 실행 (변경된 파일은 건너뜀)",
+    )
+    plan.add_argument("plan")
+    plan.add_argument("--journal", default=None, help="작업 기록 파일 (resume 으로 이어서 실행)")
+    plan.set_defaults(apply=True)
+
+    resume = sub.add_parser(
+        "resume",
+        parents=[common, cache_args, io_args, scan_args],
+        help="중단된 rename/move 를 작업 기록에서 이어서 실행",
+    )
+    resume.add_argument("journal")
+
+    search = sub.add_parser("search", parents=[common, scan_args], help="태그 검색")
+    search.add_argument("folder")
+    search.add_argument("tags", help="검색 태그 (쉼표 구분, 모두 포함)")
+
+    build = sub.add_parser("build-variable", parents=[common], help="폴더에서 변수 생성")
+    build.add_argument("folder")
+    build.add_argument("--name", default=None, help="변수 이름 (기본: 폴더 이름)")
+    build.add_argument(
+        "--save-to",
+        default=None,
+        help="변수를 추가(같은 이름이면 교체)할 preset JSON 경로",
+    )
+
+    job_create = sub.add_parser(
+        "job-create",
+        parents=[common, template_args, scan_args],
+        help="공유 디렉터리에 분산 작업 생성",
+    )
+    job_create.add_argument("job_dir")
+    job_create.add_argument("folder")
+    job_create.add_argument("--kind", choices=("rename", "move"), default="rename")
+    job_create.add_argument("--template", default="", help="rename: 파일명 템플릿, move: 폴더 템플릿")
+    job_create.add_argument("--prefix", action="store_true", help="rename: 기존 파일명 앞에 붙이기")
+    job_create.add_argument("--target-root", default=None, help="move: 대상 루트 폴더")
+    job_create.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+
+    lease_args = _ArgumentParser(add_help=False)
+    lease_args.add_argument("job_dir")
+    lease_args.add_argument("--root", default=None, help="이 호스트에서 작업 기준 폴더의 경로")
+    lease_args.add_argument(
+        "--lease-timeout",
+        type=float,
+        default=DEFAULT_LEASE_TIMEOUT,
+        help="heartbeat 가 이 시간(초) 넘게 없으면 shard 를 회수",
+    )
+
+    job_work = sub.add_parser(
+        "job-work",
+        parents=[common, lease_args],
+        help="분산 작업의 shard 를 처리",
+    )
+    job_work.add_argument("--worker-id", default=None)
+
+    job_merge = sub.add_parser(
+        "job-merge",
+        parents=[common, lease_args],
+        help="분산 작업 결과를 모아 적용",
+    )
+    job_merge.add_argument("--apply", action="store_true", help="실제로 실행 (기본: 미리보기)")
+    job_merge.add_argument(
+        "--wait",
+        type=float,
+        default=None,
+        help="모든 shard 가 끝날 때까지 최대 이 시간(초) 기다림",
+    )
+    return parser
+
+
+def _partial_policy(args: argparse.Namespace) -> PartialMatchPolicy | None:
+    if args.min_tags is None and args.min_ratio is None:
+        return None
+    return PartialMatchPolicy(min_tags=args.min_tags, min_ratio=args.min_ratio)
+
+
+_JOURNAL_PARAMS = (
+    "plan",
+    "preset",
+    "folder",
+    "target_root",
+    "order",
+    "template",
+    "prefix",
+    "folder_template",
+    "link",
+    "include_negative",
+    "min_tags",
+    "min_ratio",
+)
+_JOURNAL_PATH_PARAMS = ("plan", "preset", "folder", "target_root")
+
+
+def _journal_params(args: argparse.Namespace) -> dict:
+    params = {key: getattr(args, key) for key in _JOURNAL_PARAMS if hasattr(args, key)}
+    for key in _JOURNAL_PATH_PARAMS:
+        if key in params:
+            params[key] = str(Path(params[key]).resolve())
+    return params
+
+
+def _open_journal(args: argparse.Namespace) -> OperationJournal | None:
+    if not args.journal:
+        return None
+    if not args.apply:
+        raise ValueError("--journal 은 --apply 와 함께 사용해야 합니다.")
+    journal = OperationJournal(args.journal, args.command, _journal_params(args))
+    if journal.done or journal.skipped:
+        print(
+            f"재개: 완료 {len(journal.done)}개, 건너뜀 {len(journal.skipped)}개 "
+            f"(중단 시점 복구 {journal.recovered}개)",
+            file=sys.stderr,
+        )
+    return journal
+
+
+def _check_save_plan(args: argparse.Namespace) -> None:
+    if getattr(args, "save_plan", None) and args.apply:
+        raise ValueError("--save-plan 은 미리보기(--apply 없이)에서만 사용할 수 있습니다.")
+    if getattr(args, "save_plan", None) and getattr(args, "link", False):
+        raise ValueError("--save-plan 은 --link 와 함께 사용할 수 없습니다.")
+
+
+def _save_plan(args: argparse.Namespace, results: list[dict]) -> None:
+    if not getattr(args, "save_plan", None):
+        return
+    plan = OperationPlan.from_results(args.command, results, _journal_params(args))
+    plan.save(args.save_plan)
+    print(f"계획 저장: {args.save_plan} ({len(plan.entries)}개)", file=sys.stderr)
+
+
+def _report_scan(stats: ScanStats) -> None:
+    print(
+        f"폴더 스캔: 폴더 {stats.folders}개, 이미지 {stats.files}개, {stats.elapsed:.1f}초 "
+        f"({stats.folders_per_second():.0f} 폴더/초)",
+        file=sys.stderr,
+    )
+
+
+def _run_rename(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    _check_save_plan(args)
+    journal = _open_journal(args)
+    scan_stats = ScanStats()
+    try:
+        results = rename_images(
+            load_preset(args.preset),
+            args.folder,
+            args.order,
+            template=args.template,
+            dry_run=not args.apply,
+            prefix_mode=args.prefix,
+            include_negative=args.include_negative,
+            batch_cb=writer.write,
+            pool=pool,
+            partial=_partial_policy(args),
+            journal=journal,
+            io_workers=args.io_workers,
+            scan_workers=args.scan_workers,
+            scan_stats=scan_stats,
+            read_order=args.read_order,
+            prefetch=args.prefetch,
+        )
+    finally:
+        if journal is not None:
+            journal.close()
+    _report_scan(scan_stats)
+    _save_plan(args, results)
+
+
+def _run_move(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    _check_save_plan(args)
+    journal = _open_journal(args)
+    scan_stats = ScanStats()
+    try:
+        results = move_images(
+            load_preset(args.preset),
+            args.folder,
+            args.target_root,
+            args.order,
+            folder_template=args.folder_template,
+            dry_run=not args.apply,
+            include_negative=args.include_negative,
+            batch_cb=writer.write,
+            pool=pool,
+            partial=_partial_policy(args),
+            journal=journal,
+            io_workers=args.io_workers,
+            verify_copy=args.verify_copy,
+            link=getattr(args, "link", False),
+            scan_workers=args.scan_workers,
+            scan_stats=scan_stats,
+            read_order=args.read_order,
+            prefetch=args.prefetch,
+        )
+    finally:
+        if journal is not None:
+            journal.close()
+    _report_scan(scan_stats)
+    _save_plan(args, results)
+
+
+def _run_apply_plan(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    plan = OperationPlan.load(args.plan)
+    journal = _open_journal(args)
+    try:
+        apply_plan(
+            plan,
+            batch_cb=writer.write,
+            journal=journal,
+            io_workers=args.io_workers,
+            verify_copy=args.verify_copy,
+        )
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def _run_undo(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    log_path = args.log
+    if log_path is None and args.undo_dir:
+        log_path = next(iter_undo_logs(args.undo_dir), None)
+    if log_path is None:
+        raise ValueError("되돌릴 기록이 없습니다.")
+    print(f"되돌리기: {log_path}", file=sys.stderr)
+    undo_operations(log_path, batch_cb=writer.write, io_workers=args.io_workers)
+
+
+def _run_view_teardown(
+    args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool
+) -> None:
+    teardown_view(args.target_root, batch_cb=writer.write)
+
+
+def _run_resume(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    header = OperationJournal.read_header(args.journal)
+    kind = header.get("kind")
+    if kind not in ("rename", "move", "apply-plan"):
+        raise ValueError(f"재개할 수 없는 작업 기록입니다: {kind}")
+    resumed = argparse.Namespace(
+        **header["params"],
+        command=kind,
+        apply=True,
+        journal=args.journal,
+        io_workers=args.io_workers,
+        verify_copy=args.verify_copy,
+        scan_workers=args.scan_workers,
+        read_order=args.read_order,
+        prefetch=args.prefetch,
+    )
+    _COMMANDS[kind](resumed, writer, pool)
+
+
+def _run_search(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    scan_stats = ScanStats()
+    search_images(
+        args.folder,
+        args.tags,
+        include_negative=args.include_negative,
+        batch_cb=writer.write,
+        pool=pool,
+        scan_workers=args.scan_workers,
+        scan_stats=scan_stats,
+        read_order=args.read_order,
+        prefetch=args.prefetch,
+    )
+    _report_scan(scan_stats)
+
+
+def _run_build(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    variable, stats = build_variable_from_folder(
+        args.folder,
+        variable_name=args.name,
+        include_negative=args.include_negative,
+        pool=pool,
+    )
+    if args.save_to:
+        path = Path(args.save_to)
+        preset = load_preset(path) if path.is_file() else Preset(name=path.stem)
+        variables = [item for item in preset.variables if item.name != variable.name]
+        variables.append(variable)
+        save_preset(path, preset.model_copy(update={"variables": variables}))
+    writer.write(
+        [
+            {
+                "status": "OK",
+                "source": args.folder,
+                "target": args.save_to,
+                "message": None,
+                "variable": variable.model_dump(),
+                "stats": stats,
+            }
+        ]
+    )
+
+
+def _run_job_create(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    order = [item.strip() for item in args.order.split(",") if item.strip()]
+    if args.kind == "move":
+        if len(order) != 1 or not args.target_root:
+            raise ValueError("move 작업은 --order 변수 1개와 --target-root 가 필요합니다.")
+        options = {
+            "variable_name": order[0],
+            "template": args.template,
+            "target_root": str(Path(args.target_root).resolve()),
+        }
+    else:
+        options = {"order": order, "template": args.template, "prefix_mode": args.prefix}
+    variable_specs = build_variable_specs(template_to_variables_payload(load_preset(args.preset)))
+    selected = [spec for spec in variable_specs if spec["name"] in order]
+    missing = sorted(set(order) - {spec["name"] for spec in selected})
+    if missing:
+        raise ValueError(f"템플릿에 없는 변수: {', '.join(missing)}")
+    scan_stats = ScanStats()
+    image_paths = scan_files(args.folder, workers=args.scan_workers, stats=scan_stats)
+    shard_count = create_job(
+        args.job_dir,
+        args.folder,
+        order_for_read(image_paths, args.read_order, args.folder),
+        selected,
+        kind=args.kind,
+        options=options,
+        include_negative=args.include_negative,
+        partial=_partial_policy(args),
+        shard_size=args.shard_size,
+    )
+    _report_scan(scan_stats)
+    writer.write(
+        [{"status": "OK", "source": args.folder, "target": args.job_dir, "shards": shard_count}]
+    )
+
+
+def _run_job_work(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    processed = run_shard_worker(
+        args.job_dir,
+        args.worker_id,
+        root=args.root,
+        pool=pool,
+        lease_timeout=args.lease_timeout,
+    )
+    writer.write([{"status": "OK", "source": args.job_dir, "target": None, "shards": processed}])
+
+
+def _run_job_merge(args: argparse.Namespace, writer: JsonLinesWriter, pool: WorkerPool) -> None:
+    if args.wait is not None and not wait_for_job(
+        args.job_dir,
+        timeout=args.wait,
+        lease_timeout=args.lease_timeout,
+    ):
+        raise JobIncompleteError("shard 처리가 끝나지 않았습니다.")
+    out_queue: queue.Queue = queue.Queue()
+    merge_job_task(out_queue, args.job_dir, not args.apply, root=args.root)
+    records: list[dict] = []
+    while True:
+        item = out_queue.get()
+        if item[0] == "done":
+            break
+        if item[0] == "result":
+            records.append({"status": item[1], **item[2]})
+            if len(records) >= 200:
+                writer.write(records)
+                records = []
+    writer.write(records)
+
+
+_COMMANDS = {
+    "rename": _run_rename,
+    "move": _run_move,
+    "search": _run_search,
+    "build-variable": _run_build,
+    "apply-plan": _run_apply_plan,
+    "undo": _run_undo,
+    "view-teardown": _run_view_teardown,
+    "resume": _run_resume,
+    "job-create": _run_job_create,
+    "job-work": _run_job_work,
+    "job-merge": _run_job_merge,
+}
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    try:
+        args = build_parser().parse_args(argv)
+    except CliUsageError as exc:
+        print(exc, file=sys.stderr)
+        return EXIT_USAGE
+
+    if getattr(args, "cache", None) is not None:
+        configure_match_cache(args.cache or None)
+    if getattr(args, "undo_dir", None) is not None and args.command != "undo":
+        configure_undo_dir(args.undo_dir or None)
+    output: IO[str] = (
+        open(args.output, "w", encoding="utf-8", newline="\n") if args.output else sys.stdout
+    )
+    pool = WorkerPool(args.workers)
+    writer = JsonLinesWriter(output)
+    try:
+        _COMMANDS[args.command](args, writer, pool)
+    except (OSError, ValueError, JobIncompleteError) as exc:
+        print(f"실패: {exc}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        pool.close()
+        if getattr(args, "cache", None) is not None:
+            configure_match_cache(None)
+        configure_undo_dir(None)
+        if output is not sys.stdout:
+            output.close()
+
+    summary = writer.summary
+    counts = ", ".join(f"{status}={count}" for status, count in summary.status_counts().items())
+    print(f"{args.command}: total={summary.total} {counts}", file=sys.stderr)
+    if summary.unknown_reasons:
+        print(f"UNKNOWN 사유: {summary.format_unknown()}", file=sys.stderr)
+    return min(summary.counts["ERROR"], EXIT_MAX_ERRORS)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
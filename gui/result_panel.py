@@ -159,8 +159,40 @@ class ResultPanel(ResultPanelListMixin, ResultPanelThumbnailMixin, ResultPanelLa
         self.apply_filters()
 
     def append_result(self, record: dict) -> None:
-        self.records.append(record)
-        self.apply_filters()
+        self.append_results([record])
+
+    def append_results(self, records: list[dict]) -> None:
+        """작업 중 도착한 결과를 전체 재구성 없이 목록/필터/썸네일에 이어 붙인다."""
+        if not records:
+            return
+        start = len(self.records)
+        self.records.extend(records)
+        if start == 0:
+            self.apply_filters()
+            return
+        new_indices = [
+            idx
+            for idx in range(start, len(self.records))
+            if self._is_visible(self.records[idx].get("status"))
+        ]
+        if not new_indices:
+            return
+        had_visible = bool(self.filtered_indices)
+        self.filtered_indices.extend(new_indices)
+        if self.list_fill_after_id is None:
+            # 채우기가 끝난 상태면 새 줄만 넣는다. 진행 중이면 남은 청크가 이어서 채운다.
+            self.listbox.insert(tk.END, *(self._to_text(self.records[idx]) for idx in new_indices))
+            self.list_fill_cursor = len(self.filtered_indices)
+        if bool(self.show_thumbnails_var.get()):
+            self._last_thumb_source_indices.extend(new_indices)
+        if not had_visible:
+            self._select_list_index(0)
+        chunk = self._chunk_size_for_current_layout()
+        if self.visible_count < chunk:
+            self.visible_count = min(chunk, len(self._last_thumb_source_indices))
+            self._render_thumbnail_grid()
+        else:
+            self._update_load_more_button()
 
     def apply_filters(self) -> None:
         prev_path = self.preview_path
@@ -3,24 +3,52 @@ from __future__ import annotations
 from core.extract import extract_tags_from_image
 
 from .services_ops import (
+    DEFAULT_IO_WORKERS,
     CancelCallback,
+    MissingTagStats,
+    OperationPlan,
+    PlanEntry,
     ProgressCallback,
+    ResultBatchCallback,
+    ResultSummary,
+    apply_plan,
     build_variable_from_folder,
     build_variable_from_preset_json,
+    configure_match_cache,
+    configure_undo_dir,
+    get_match_cache,
+    match_folder,
     move_images,
     rename_images,
+    scan_folder,
     search_images,
+    teardown_view,
     template_to_variables_payload,
+    undo_operations,
 )
 
 __all__ = [
     "extract_tags_from_image",
+    "DEFAULT_IO_WORKERS",
     "ProgressCallback",
     "CancelCallback",
+    "ResultBatchCallback",
+    "ResultSummary",
+    "MissingTagStats",
     "template_to_variables_payload",
+    "configure_match_cache",
+    "configure_undo_dir",
+    "get_match_cache",
     "build_variable_from_folder",
     "build_variable_from_preset_json",
     "search_images",
     "rename_images",
     "move_images",
+    "teardown_view",
+    "undo_operations",
+    "OperationPlan",
+    "PlanEntry",
+    "apply_plan",
+    "scan_folder",
+    "match_folder",
 ]
@@ -1,16 +1,45 @@
+from .aio_ops import match_folder, scan_folder
 from .build_ops import build_variable_from_folder, build_variable_from_preset_json
-from .common import CancelCallback, ProgressCallback, template_to_variables_payload
+from .common import (
+    DEFAULT_IO_WORKERS,
+    CancelCallback,
+    MissingTagStats,
+    ProgressCallback,
+    ResultBatchCallback,
+    ResultSummary,
+    configure_match_cache,
+    configure_undo_dir,
+    get_match_cache,
+    template_to_variables_payload,
+)
 from .move_ops import move_images
+from .plan_ops import OperationPlan, PlanEntry, apply_plan
 from .rename_ops import rename_images
 from .search_ops import search_images
+from .undo_ops import undo_operations
+from .view_ops import teardown_view
 
 __all__ = [
+    "DEFAULT_IO_WORKERS",
     "ProgressCallback",
     "CancelCallback",
+    "ResultBatchCallback",
+    "ResultSummary",
+    "MissingTagStats",
     "template_to_variables_payload",
+    "configure_match_cache",
+    "configure_undo_dir",
+    "get_match_cache",
     "build_variable_from_folder",
     "build_variable_from_preset_json",
     "search_images",
     "rename_images",
     "move_images",
+    "teardown_view",
+    "undo_operations",
+    "OperationPlan",
+    "PlanEntry",
+    "apply_plan",
+    "scan_folder",
+    "match_folder",
 ]
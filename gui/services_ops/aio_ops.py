@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from core.match import PartialMatchPolicy
+from core.preset import Preset
+from core.runner import MatchCache, WorkerPool, build_variable_specs, get_worker_pool
+from core.utils import iter_image_files
+
+from .common import (
+    get_match_cache,
+    lookup_tag_cache,
+    store_tag_cache,
+    tag_cache_key,
+    template_to_variables_payload,
+)
+
+
+def _resolve(
+    loop: asyncio.AbstractEventLoop,
+    future: asyncio.Future,
+    value: Any,
+    error: bool,
+) -> None:
+    # 풀의 결과 스레드에서 호출된다. 루프가 이미 닫혔으면 결과를 버린다.
+    def settle() -> None:
+        if future.done():
+            return
+        if error:
+            future.set_exception(value)
+        else:
+            future.set_result(value)
+
+    try:
+        loop.call_soon_threadsafe(settle)
+    except RuntimeError:
+        pass
+
+
+def _cached_tags(path: str, include_negative: bool) -> tuple[Any, list[str] | None]:
+    key = tag_cache_key(path, include_negative)
+    return key, lookup_tag_cache(key)
+
+
+async def _scan_one(
+    pool: WorkerPool,
+    path: str,
+    include_negative: bool,
+    timeout: float | None = None,
+) -> dict[str, Any]:
+    loop = asyncio.get_running_loop()
+    # stat 은 NAS 에서 오래 걸릴 수 있으므로 이벤트 루프 밖에서 한다.
+    key, tags = await loop.run_in_executor(None, _cached_tags, path, include_negative)
+    if tags is not None:
+        return {"path": path, "tags": tags, "error": None, "cached": True}
+    future: asyncio.Future = loop.create_future()
+    # 풀이 종료되면 WorkerPool 이 error_callback 을 부르므로 future 는 항상 끝난다.
+    # 워커가 멈춘 파일(NAS 응답 없음 등)은 timeout 으로 끊는다.
+    pool.submit_tags(
+        path,
+        include_negative,
+        callback=lambda value: _resolve(loop, future, value, False),
+        error_callback=lambda exc: _resolve(loop, future, exc, True),
+    )
+    try:
+        tags, error = await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        return {"path": path, "tags": [], "error": "timed out", "cached": False}
+    except Exception as exc:
+        return {"path": path, "tags": [], "error": str(exc), "cached": False}
+    if error is not None:
+        return {"path": path, "tags": [], "error": error, "cached": False}
+    store_tag_cache(key, tags)
+    return {"path": path, "tags": tags, "error": None, "cached": False}
+
+
+async def _iter_bounded(
+    paths: list[str],
+    start: Callable[[str], Awaitable[dict[str, Any]]],
+    concurrency: int,
+) -> AsyncIterator[dict[str, Any]]:
+    # 소비자가 결과를 가져갈 때마다 한 개씩 새로 시작하므로 진행 중인 작업은 concurrency 개를 넘지 않는다.
+    # 태스크가 취소되거나 소비자가 중간에 멈추면 남은 작업도 취소한다.
+    pending: deque[asyncio.Task] = deque()
+    remaining = iter(paths)
+
+    def start_next() -> None:
+        path = next(remaining, None)
+        if path is not None:
+            pending.append(asyncio.ensure_future(start(path)))
+
+    try:
+        for _ in range(concurrency):
+            start_next()
+        while pending:
+            result = await pending.popleft()
+            start_next()
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def scan_folder(
+    folder: str,
+    *,
+    include_negative: bool = False,
+    pool: WorkerPool | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """폴더 이미지의 태그를 이벤트 루프를 막지 않고 경로 순서대로 내보낸다.
+
+    결과는 {"path", "tags", "error", "cached"}. 추출은 워커 프로세스 풀에서 하고,
+    GUI 와 같은 태그 캐시를 쓴다. concurrency 기본값은 워커 수의 두 배다.
+    timeout 을 주면 파일 하나가 그 시간(초) 안에 끝나지 않을 때 오류 결과로 내보낸다.
+    """
+    pool = pool or get_worker_pool()
+    loop = asyncio.get_running_loop()
+    paths = await loop.run_in_executor(None, list, iter_image_files(folder))
+    limit = max(1, concurrency or pool.processes * 2)
+    results = _iter_bounded(
+        paths,
+        lambda path: _scan_one(pool, path, include_negative, timeout),
+        limit,
+    )
+    # 소비자가 중간에 멈추면 진행 중인 작업을 바로 취소하도록 명시적으로 닫는다.
+    async with aclosing(results):
+        async for result in results:
+            yield result
+
+
+async def match_folder(
+    preset: Preset,
+    folder: str,
+    order: list[str] | str | None = None,
+    *,
+    include_negative: bool = False,
+    partial: PartialMatchPolicy | None = None,
+    match_cache: MatchCache | None = None,
+    pool: WorkerPool | None = None,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """scan_folder 결과를 템플릿 변수와 매치해서 process_image 와 같은 dict 로 내보낸다.
+
+    order 를 주면 그 변수만 매치한다. 매치 결과는 GUI 와 같은 매치 캐시를 거친다.
+    캐시는 SQLite 를 읽고 쓰므로 bind/match 는 이벤트 루프 밖에서 실행한다.
+    """
+    if isinstance(order, str):
+        order = [item.strip() for item in order.split(",") if item.strip()]
+    variable_specs = build_variable_specs(template_to_variables_payload(preset))
+    if order:
+        names = {spec["name"] for spec in variable_specs}
+        missing = [name for name in order if name not in names]
+        if missing:
+            raise ValueError(f"템플릿에 없는 변수: {', '.join(missing)}")
+        variable_specs = [spec for spec in variable_specs if spec["name"] in set(order)]
+    loop = asyncio.get_running_loop()
+    cache = match_cache or get_match_cache()
+    matcher = await loop.run_in_executor(None, cache.bind, variable_specs, partial)
+    scanned_results = scan_folder(
+        folder,
+        include_negative=include_negative,
+        pool=pool,
+        concurrency=concurrency,
+        timeout=timeout,
+    )
+    try:
+        async with aclosing(scanned_results):
+            async for scanned in scanned_results:
+                if scanned["error"] is not None:
+                    yield {"path": scanned["path"], "matches": {}, "error": scanned["error"]}
+                    continue
+                matches = await loop.run_in_executor(None, matcher.match, scanned["tags"])
+                yield {"path": scanned["path"], "matches": matches, "error": None}
+    finally:
+        await loop.run_in_executor(None, matcher.flush)
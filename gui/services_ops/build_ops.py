@@ -8,6 +8,7 @@ from core.adapters.nais import import_nais_payload
 from core.adapters.scene_preset import import_scene_preset_payload
 from core.match import filter_value_conflicts
 from core.preset import Variable
+from core.runner import WorkerPool
 
 from .common import ProgressCallback
 
@@ -18,12 +19,14 @@ def build_variable_from_folder(
     variable_name: str | None = None,
     include_negative: bool = False,
     progress_cb: ProgressCallback | None = None,
+    pool: WorkerPool | None = None,
 ) -> tuple[Variable, dict]:
     payload, stats = build_nais_from_folder(
         folder,
         include_negative=include_negative,
         progress_step=100,
         progress_cb=progress_cb,
+        pool=pool,
     )
     auto_name, values = import_nais_payload(payload)
     filtered_values, summary = filter_value_conflicts(values)
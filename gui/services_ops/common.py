@@ -1,21 +1,328 @@
 from __future__ import annotations
 
-from collections import OrderedDict
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 from pathlib import Path
 import threading
-from typing import Callable
+import time
+from typing import Any, Callable, Iterable, Iterator
 
 from core.extract import extract_tags_from_image as _core_extract_tags_from_image
+from core.index import TagIndex
 from core.preset import Preset
-from core.utils import sanitize_filename
+from core.runner import (
+    MatchCache,
+    OperationJournal,
+    UndoLog,
+    WorkerPool,
+    iter_prefetched_tags,
+)
+from core.utils import sanitize_filename, target_exists
 
 ProgressCallback = Callable[[int, int], None]
 CancelCallback = Callable[[], bool]
+ResultBatchCallback = Callable[[list[dict]], None]
 
 _TAG_CACHE_MAX = 10000
+# 파일 작업 동시 실행 수. NAS 에서는 rename 한 번이 네트워크 왕복이라 동시에 여러 개를 보낸다.
+DEFAULT_IO_WORKERS = 8
 _TAG_CACHE_LOCK = threading.Lock()
 _TAG_CACHE: OrderedDict[tuple[str, int, int, bool], list[str]] = OrderedDict()
+_MATCH_CACHE_LOCK = threading.Lock()
+_MATCH_CACHE: MatchCache | None = None
+_UNDO_DIR: Path | None = None
+
+
+class ResultBatcher:
+    """서비스 결과를 모으면서, batch_cb 가 있으면 batch_size 개 또는 interval 초마다 넘긴다.
+
+    results 는 전체 결과 목록이며 콜백에 넘긴 레코드와 같은 객체를 가리킨다.
+    """
+
+    def __init__(
+        self,
+        batch_cb: ResultBatchCallback | None = None,
+        *,
+        batch_size: int = 200,
+        interval: float = 0.25,
+    ) -> None:
+        self.batch_cb = batch_cb
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.results: list[dict] = []
+        self._pending: list[dict] = []
+        self._last_flush = time.monotonic()
+
+    def add(self, record: dict) -> None:
+        self.results.append(record)
+        if self.batch_cb is None:
+            return
+        self._pending.append(record)
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if self.batch_cb is None or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self.batch_cb(pending)
+
+
+class CountedPaths:
+    """경로를 하나씩 넘기면서 지금까지 넘긴 개수를 센다.
+
+    스캔을 끝까지 기다리지 않고 처리할 때 진행률의 전체 개수로 쓴다. 결과를 앞서 읽는
+    iter_image_tags 뒤에 두면 count 는 항상 처리한 개수 이상이다.
+    """
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        self._paths = iter(paths)
+        self.count = 0
+
+    def __iter__(self) -> "CountedPaths":
+        return self
+
+    def __next__(self) -> str:
+        path = next(self._paths)
+        self.count += 1
+        return path
+
+
+class ResultSummary:
+    """상태별 개수와 UNKNOWN 사유 빈도를 결과가 도착할 때마다 누적한다."""
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.counts: Counter[str] = Counter()
+        self.unknown_reasons: Counter[str] = Counter()
+
+    def add(self, records: list[dict]) -> None:
+        for record in records:
+            status = str(record.get("status") or "INFO")
+            self.total += 1
+            self.counts[status] += 1
+            message = record.get("message")
+            if status == "UNKNOWN" and message:
+                self.unknown_reasons[str(message)] += 1
+
+    def status_counts(self) -> dict[str, int]:
+        return {status: self.counts[status] for status in ("OK", "UNKNOWN", "CONFLICT", "ERROR")}
+
+    def format_unknown(self, n: int = 3) -> str:
+        return "; ".join(
+            f"{reason} x{count}" for reason, count in self.unknown_reasons.most_common(n)
+        )
+
+
+_PendingOperation = tuple[str, str, dict]
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _chain_order(items: list[_PendingOperation]) -> list[_PendingOperation]:
+    # 다른 작업이 비워 줄 이름으로 가는 작업은 그 작업 뒤에 둔다. 순환이면 남은 순서대로 두고,
+    # 대상이 이미 있으므로 실행 단계에서 ERROR 가 된다.
+    ordered: list[_PendingOperation] = []
+    remaining = items
+    while remaining:
+        sources = {_path_key(source) for source, _target, _record in remaining}
+        ready: list[_PendingOperation] = []
+        waiting: list[_PendingOperation] = []
+        for item in remaining:
+            source, target, _record = item
+            target_key = _path_key(target)
+            if target_key in sources and target_key != _path_key(source):
+                waiting.append(item)
+            else:
+                ready.append(item)
+        if not ready:
+            ordered.extend(waiting)
+            break
+        ordered.extend(ready)
+        remaining = waiting
+    return ordered
+
+
+def operation_chains(pending: list[_PendingOperation]) -> list[list[_PendingOperation]]:
+    """원본/대상 이름을 공유하는 작업끼리 묶는다. 묶음끼리는 동시에 실행해도 안전하다."""
+    parent = list(range(len(pending)))
+
+    def find(idx: int) -> int:
+        while parent[idx] != idx:
+            parent[idx] = parent[parent[idx]]
+            idx = parent[idx]
+        return idx
+
+    owner: dict[str, int] = {}
+    for idx, (source, target, _record) in enumerate(pending):
+        for path in (source, target):
+            other = owner.setdefault(_path_key(path), idx)
+            if other != idx:
+                parent[find(idx)] = find(other)
+    groups: dict[int, list[_PendingOperation]] = {}
+    for idx, item in enumerate(pending):
+        groups.setdefault(find(idx), []).append(item)
+    return [_chain_order(items) if len(items) > 1 else items for items in groups.values()]
+
+
+class FileOperations:
+    """rename/move 의 실제 파일 작업 실행기.
+
+    journal 이 없고 buffered 도 아니며 workers 가 1 이면 submit 즉시 실행한다. 그 외에는
+    batch_size 개씩 모아 대상 폴더별로 정렬하고, journal 이 있으면 plan 을 먼저 fsync 한다.
+    workers 가 2 이상이면 이름을 공유하지 않는 작업끼리 스레드 풀에서 동시에 실행하며,
+    이름이 이어지는 작업(a→b, b→c)은 한 묶음으로 안전한 순서대로 실행한다.
+    완료/실패 기록과 결과 레코드 전달은 호출 스레드에서 끝난 순서대로 한다.
+    undo_log 가 있으면 완료된 작업을 되돌리기 기록에 남긴다.
+    """
+
+    def __init__(
+        self,
+        execute: Callable[[str, str], None],
+        batcher: ResultBatcher,
+        journal: OperationJournal | None = None,
+        *,
+        batch_size: int = 64,
+        buffered: bool = False,
+        workers: int = 1,
+        undo_log: UndoLog | None = None,
+    ) -> None:
+        self.execute = execute
+        self.batcher = batcher
+        self.journal = journal
+        self.undo_log = undo_log
+        self.workers = max(1, workers)
+        # 동시 실행 때는 묶음 경계에서 스레드가 놀지 않도록 묶음을 키운다.
+        self.batch_size = max(1, batch_size, self.workers * 16 if self.workers > 1 else 0)
+        self.buffered = buffered or journal is not None or self.workers > 1
+        self._pending: list[_PendingOperation] = []
+
+    def submit(self, source: str, target: str, record: dict) -> None:
+        if not self.buffered:
+            self._run(source, target, record)
+            return
+        self._pending.append((source, target, record))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def skip(self, record: dict) -> None:
+        """파일 작업 없이 끝난 결과(UNKNOWN/CONFLICT/ERROR)."""
+        if self.journal is not None:
+            status = str(record.get("status") or "")
+            if status == "ERROR":
+                self.journal.mark_failed(record["source"], str(record.get("message") or ""))
+            else:
+                self.journal.mark_skipped(record["source"], status, record.get("message"))
+        self.batcher.add(record)
+
+    def _apply(self, source: str, target: str) -> Exception | None:
+        try:
+            if target != source:
+                # 대상 이름은 폴더를 읽은 시점 기준이므로 그 뒤에 생긴 파일은 덮어쓰지 않는다.
+                if target_exists(source, target):
+                    raise FileExistsError(f"대상 파일이 이미 있습니다: {target}")
+                self.execute(source, target)
+        except Exception as exc:
+            return exc
+        return None
+
+    def _apply_chain(
+        self, chain: list[_PendingOperation]
+    ) -> list[tuple[_PendingOperation, Exception | None]]:
+        return [(item, self._apply(item[0], item[1])) for item in chain]
+
+    def _run(self, source: str, target: str, record: dict) -> None:
+        self._report(source, target, record, self._apply(source, target))
+
+    def _report(self, source: str, target: str, record: dict, error: Exception | None) -> None:
+        if error is not None:
+            if self.journal is not None:
+                self.journal.mark_failed(source, str(error))
+            self.batcher.add(
+                {
+                    "status": "ERROR",
+                    "source": source,
+                    "target": None,
+                    "message": str(error),
+                    "preview": source,
+                }
+            )
+            return
+        if self.journal is not None:
+            self.journal.mark_done(source, target)
+        if self.undo_log is not None and target != source:
+            self.undo_log.record(source, target)
+        self.batcher.add(record)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        # 같은 대상 폴더끼리 모아서 실행한다(정렬은 안정적이므로 폴더 안 순서는 유지).
+        pending.sort(key=lambda item: os.path.dirname(item[1]))
+        if self.journal is not None:
+            self.journal.plan_many((source, target) for source, target, _record in pending)
+        chains = operation_chains(pending)
+        if self.workers <= 1 or len(chains) <= 1:
+            for chain in chains:
+                for source, target, record in chain:
+                    self._run(source, target, record)
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(chains)),
+                thread_name_prefix="file-ops",
+            ) as executor:
+                futures = [executor.submit(self._apply_chain, chain) for chain in chains]
+                for future in as_completed(futures):
+                    for (source, target, record), error in future.result():
+                        self._report(source, target, record, error)
+        if self.journal is not None:
+            self.journal.sync()
+        if self.undo_log is not None:
+            self.undo_log.flush()
+
+    def close(self) -> None:
+        """남은 작업을 실행하고 되돌리기 기록을 닫는다."""
+        self.flush()
+        if self.undo_log is not None:
+            self.undo_log.close()
+
+
+def configure_match_cache(path: str | Path | None) -> MatchCache:
+    global _MATCH_CACHE
+    with _MATCH_CACHE_LOCK:
+        if _MATCH_CACHE is not None:
+            _MATCH_CACHE.close()
+        _MATCH_CACHE = MatchCache(path)
+        return _MATCH_CACHE
+
+
+def configure_undo_dir(path: str | Path | None) -> None:
+    """적용한 rename/move 의 되돌리기 기록을 남길 폴더. None 이면 기록하지 않는다."""
+    global _UNDO_DIR
+    _UNDO_DIR = Path(path) if path else None
+
+
+def open_undo_log(kind: str, params: dict | None = None) -> UndoLog | None:
+    if _UNDO_DIR is None:
+        return None
+    return UndoLog.create(_UNDO_DIR, kind, params)
+
+
+def get_match_cache() -> MatchCache:
+    global _MATCH_CACHE
+    with _MATCH_CACHE_LOCK:
+        if _MATCH_CACHE is None:
+            # 경로를 설정하지 않았으면 프로세스 메모리에만 유지한다.
+            _MATCH_CACHE = MatchCache()
+        return _MATCH_CACHE
 
 
 def tag_cache_key(path: str, include_negative: bool) -> tuple[str, int, int, bool] | None:
@@ -26,27 +333,115 @@ def tag_cache_key(path: str, include_negative: bool) -> tuple[str, int, int, boo
     return (os.path.abspath(path), int(stat.st_size), int(stat.st_mtime_ns), include_negative)
 
 
+def lookup_tag_cache(key: tuple[str, int, int, bool] | None) -> list[str] | None:
+    if key is None:
+        return None
+    with _TAG_CACHE_LOCK:
+        cached = _TAG_CACHE.get(key)
+        if cached is None:
+            return None
+        _TAG_CACHE.move_to_end(key)
+        return list(cached)
+
+
+def store_tag_cache(key: tuple[str, int, int, bool] | None, tags: list[str]) -> None:
+    if key is None:
+        return
+    with _TAG_CACHE_LOCK:
+        _TAG_CACHE[key] = list(tags)
+        _TAG_CACHE.move_to_end(key)
+        while len(_TAG_CACHE) > _TAG_CACHE_MAX:
+            _TAG_CACHE.popitem(last=False)
+
+
+def _key_stamp(key: tuple[str, int, int, bool] | None) -> tuple[int, int] | None:
+    # 태그를 뽑기 직전에 본 (크기, 수정 시각 ns). 계획 파일이 변경 여부를 확인할 때 쓴다.
+    return None if key is None else (key[1], key[2])
+
+
 def get_tags_cached(path: str, include_negative: bool) -> tuple[list[str], bool | None]:
-    key = tag_cache_key(path, include_negative)
-    if key is not None:
-        with _TAG_CACHE_LOCK:
-            cached = _TAG_CACHE.get(key)
-            if cached is not None:
-                _TAG_CACHE.move_to_end(key)
-                return list(cached), True
+    return _tags_for_key(path, tag_cache_key(path, include_negative), include_negative)
+
+
+def _tags_for_key(
+    path: str,
+    key: tuple[str, int, int, bool] | None,
+    include_negative: bool,
+) -> tuple[list[str], bool | None]:
+    cached = lookup_tag_cache(key)
+    if cached is not None:
+        return cached, True
 
     tags = _resolve_extract_tags_fn()(path, include_negative)
 
     if key is not None:
-        with _TAG_CACHE_LOCK:
-            _TAG_CACHE[key] = list(tags)
-            _TAG_CACHE.move_to_end(key)
-            while len(_TAG_CACHE) > _TAG_CACHE_MAX:
-                _TAG_CACHE.popitem(last=False)
+        store_tag_cache(key, tags)
         return tags, False
     return tags, None
 
 
+def iter_image_tags(
+    image_paths: Iterable[str],
+    include_negative: bool,
+    pool: WorkerPool | None = None,
+    prefetch: bool = False,
+) -> Iterator[tuple[str, list[str] | Exception, bool | None, tuple[int, int] | None]]:
+    """경로 순서대로 (경로, 태그 또는 예외, 캐시 적중 여부, 스탬프) 를 내보낸다.
+
+    스탬프는 태그를 조회/추출하기 직전에 본 원본의 (크기, 수정 시각 ns) 이다.
+
+    image_paths 는 스캔 제너레이터를 그대로 받을 수 있고, 필요한 만큼만 앞서 읽는다.
+    pool 이 있으면 태그 캐시에 없는 파일만 워커 프로세스에서 추출하고 결과를 캐시에 채운다.
+    prefetch 이면 읽기 스레드가 파일 앞부분을 미리 읽어 워커에 넘긴다(느린 저장소용).
+    중간에 멈추면 이미 보낸 추출 배치만 끝까지 실행되고 나머지는 풀에 보내지 않는다.
+    """
+    if pool is None:
+        for path in image_paths:
+            key = tag_cache_key(path, include_negative)
+            try:
+                tags, cache_status = _tags_for_key(path, key, include_negative)
+            except Exception as exc:
+                yield path, exc, None, _key_stamp(key)
+                continue
+            yield path, tags, cache_status, _key_stamp(key)
+        return
+
+    # 캐시 조회는 추출 쪽이 다음 미스를 찾을 때 함께 한다. looked_up 에는 조회했지만 아직
+    # 내보내지 않은 경로가 순서대로 쌓이고, 추출 결과는 그 안의 미스 순서와 같다.
+    looked_up: deque[tuple[str, Any, list[str] | None]] = deque()
+    extracted_ahead: deque[tuple[list[str] | None, str | None]] = deque()
+
+    def misses() -> Iterator[str]:
+        for path in image_paths:
+            key = tag_cache_key(path, include_negative)
+            cached = lookup_tag_cache(key)
+            looked_up.append((path, key, cached))
+            if cached is None:
+                yield path
+
+    if prefetch:
+        extracted = iter_prefetched_tags(pool, misses(), include_negative)
+    else:
+        extracted = pool.imap_tags(misses(), include_negative)
+    while True:
+        if not looked_up:
+            result = next(extracted, None)
+            if result is not None:
+                extracted_ahead.append(result)
+            if not looked_up:
+                return
+        path, key, tags = looked_up.popleft()
+        if tags is not None:
+            yield path, tags, True, _key_stamp(key)
+            continue
+        tags, error = extracted_ahead.popleft() if extracted_ahead else next(extracted)
+        if error is not None:
+            yield path, RuntimeError(error), None, _key_stamp(key)
+            continue
+        store_tag_cache(key, tags)
+        yield path, tags, False if key is not None else None, _key_stamp(key)
+
+
 def _resolve_extract_tags_fn():
     try:
         # 테스트에서 기존 경로(gui.services.extract_tags_from_image)를 패치하는 경우를 호환한다.
@@ -97,10 +492,67 @@ def sanitize_folder_template_path(path_text: str) -> str:
     return str(Path(*parts))
 
 
+class ValueSpecIndex:
+    """변수 하나의 (값 이름, 태그셋) 목록을 태그 역색인으로 감싼다.
+
+    작업 시작 시 변수마다 한 번 만들어 두면, UNKNOWN 이미지마다 전체 값을 훑지 않고
+    이미지 태그와 겹치는 값만 집계해서 가장 가까운 값을 찾는다.
+    """
+
+    def __init__(self, value_specs: list[tuple[str, set[str]]]) -> None:
+        self.value_specs = value_specs
+        self.index = TagIndex(
+            (pos, frozenset(required)) for pos, (_name, required) in enumerate(value_specs)
+        )
+
+    def __len__(self) -> int:
+        return len(self.value_specs)
+
+    def nearest(self, image_tag_set: set[str], k: int = 1) -> list[tuple[str, int, set[str]]]:
+        """(값 이름, 겹친 태그 수, 값 태그셋) 을 겹침이 큰 순으로 최대 k 개."""
+        return [
+            (self.value_specs[pos][0], overlap, self.value_specs[pos][1])
+            for pos, overlap in self.index.nearest(image_tag_set, k)
+        ]
+
+
+class MissingTagStats:
+    """작업 전체에서 UNKNOWN 의 가장 가까운 값 기준 누락 태그를 변수별로 집계한다."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, Counter[str]] = {}
+        self._unknown_counts: Counter[str] = Counter()
+
+    def record(self, variable_name: str, missing: set[str]) -> None:
+        with self._lock:
+            self._unknown_counts[variable_name] += 1
+            self._counters.setdefault(variable_name, Counter()).update(missing)
+
+    def most_common(self, variable_name: str, n: int = 5) -> list[tuple[str, int]]:
+        with self._lock:
+            counter = self._counters.get(variable_name)
+            return counter.most_common(n) if counter else []
+
+    def summary(self, n: int = 5) -> dict[str, list[tuple[str, int]]]:
+        with self._lock:
+            return {name: counter.most_common(n) for name, counter in self._counters.items()}
+
+    def format_summary(self, n: int = 5) -> str:
+        parts: list[str] = []
+        for name, items in self.summary(n).items():
+            if not items:
+                continue
+            preview = ", ".join(f"{tag} x{count}" for tag, count in items)
+            parts.append(f"{name}(UNKNOWN {self._unknown_counts[name]}): {preview}")
+        return "; ".join(parts)
+
+
 def explain_unknown_match(
     variable_name: str,
-    value_specs: list[tuple[str, set[str]]],
+    value_specs: list[tuple[str, set[str]]] | ValueSpecIndex,
     image_tags: list[str],
+    missing_stats: MissingTagStats | None = None,
 ) -> str:
     if not value_specs:
         return f"변수 '{variable_name}'에 매칭 태그가 없습니다."
@@ -109,29 +561,23 @@ def explain_unknown_match(
     if not image_tag_set:
         return "이미지에서 태그를 추출하지 못했습니다."
 
-    best_name = ""
-    best_overlap = 0
-    best_required_count = 0
-    best_missing: set[str] = set()
-
-    for name, required in value_specs:
-        overlap = len(required & image_tag_set)
-        if overlap > best_overlap:
-            best_overlap = overlap
-            best_name = name
-            best_required_count = len(required)
-            best_missing = required - image_tag_set
-
-    if best_overlap <= 0:
+    index = value_specs if isinstance(value_specs, ValueSpecIndex) else ValueSpecIndex(value_specs)
+    nearest = index.nearest(image_tag_set, 1)
+    if not nearest:
         return "템플릿 태그와 일치하는 항목이 없습니다."
 
+    best_name, best_overlap, required = nearest[0]
+    best_missing = required - image_tag_set
+    if missing_stats is not None:
+        missing_stats.record(variable_name, best_missing)
+
     missing_preview = ", ".join(sorted(best_missing)[:4])
     if missing_preview:
         return (
-            f"가까운 값 '{best_name}' 매치 {best_overlap}/{best_required_count}, "
+            f"가까운 값 '{best_name}' 매치 {best_overlap}/{len(required)}, "
             f"누락 태그: {missing_preview}"
         )
-    return f"가까운 값 '{best_name}' 매치 {best_overlap}/{best_required_count}"
+    return f"가까운 값 '{best_name}' 매치 {best_overlap}/{len(required)}"
 
 
 def template_to_variables_payload(preset: Preset) -> list[dict]:
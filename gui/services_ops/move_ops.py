@@ -2,26 +2,65 @@ from __future__ import annotations
 
 from collections import Counter
 import logging
+import os
 from pathlib import Path
-import shutil
+from typing import Callable
 
+from core.match import PartialMatchPolicy
 from core.preset import Preset
-from core.runner import build_variable_specs, match_variable_specs
-from core.utils import ensure_unique_name, iter_image_files, render_template
+from core.runner import MatchCache, OperationJournal, WorkerPool, build_variable_specs
+from core.utils import (
+    NameIndex,
+    ScanStats,
+    ensure_unique_name,
+    is_same_device,
+    move_file,
+    order_for_read,
+    render_template,
+    scan_files,
+)
 
 from .common import (
+    DEFAULT_IO_WORKERS,
     CancelCallback,
+    CountedPaths,
+    FileOperations,
+    MissingTagStats,
     ProgressCallback,
+    ResultBatchCallback,
+    ResultBatcher,
+    ValueSpecIndex,
     build_variable_value_specs,
     explain_unknown_match,
-    get_tags_cached,
+    get_match_cache,
+    iter_image_tags,
+    open_undo_log,
     sanitize_folder_template_path,
     template_to_variables_payload,
 )
+from .view_ops import ViewManifest, folder_linker
 
 _logger = logging.getLogger(__name__)
 
 
+def folder_mover(
+    names: NameIndex,
+    *,
+    cross_device: bool = False,
+    verify: bool = False,
+) -> Callable[[str, str], None]:
+    """대상 폴더는 names 기준으로 폴더마다 한 번만 만들고 파일을 옮기는 실행 함수.
+
+    cross_device 면 rename 을 시도하지 않고 바로 복사 후 삭제한다(verify 면 체크섬 확인).
+    """
+
+    def execute(source: str, target: str) -> None:
+        names.ensure_folder(Path(target).parent)
+        move_file(source, target, cross_device=cross_device, verify=verify)
+
+    return execute
+
+
 def move_images(
     preset: Preset,
     folder: str,
@@ -33,11 +72,33 @@ def move_images(
     include_negative: bool = False,
     progress_cb: ProgressCallback | None = None,
     cancel_cb: CancelCallback | None = None,
+    batch_cb: ResultBatchCallback | None = None,
+    pool: WorkerPool | None = None,
+    match_cache: MatchCache | None = None,
+    partial: PartialMatchPolicy | None = None,
+    missing_stats: MissingTagStats | None = None,
+    journal: OperationJournal | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    verify_copy: bool = False,
+    link: bool = False,
+    scan_workers: int = 1,
+    scan_stats: ScanStats | None = None,
+    read_order: str = "path",
+    prefetch: bool = False,
 ) -> list[dict]:
+    """태그 매치 결과로 folder_template 폴더 구조에 분류한다.
+
+    link 면 파일을 옮기지 않고 같은 드라이브는 하드 링크, 다른 드라이브는 상대 경로
+    심볼릭 링크로 보기(view)를 만든다. 보기는 teardown_view 로 지운다.
+    """
     if isinstance(order, str):
         order = [item.strip() for item in order.split(",") if item.strip()]
     if not order:
         raise ValueError("분류 변수 순서를 입력하세요.")
+    if link and os.path.normcase(os.path.abspath(folder)) == os.path.normcase(
+        os.path.abspath(target_root)
+    ):
+        raise ValueError("링크 모드는 작업 폴더와 다른 대상 폴더가 필요합니다.")
 
     variables_payload = template_to_variables_payload(preset)
     variable_specs = build_variable_specs(variables_payload)
@@ -45,38 +106,74 @@ def move_images(
     missing = [name for name in order if name not in spec_names]
     if missing:
         raise ValueError(f"템플릿에 없는 변수: {', '.join(missing)}")
-    value_specs_by_variable: dict[str, list[tuple[str, set[str]]]] = {}
+    value_specs_by_variable: dict[str, ValueSpecIndex] = {}
     for variable_name in order:
         selected_variable_spec = next(
             (item for item in variable_specs if item.get("name") == variable_name),
             None,
         )
-        value_specs_by_variable[variable_name] = build_variable_value_specs(
-            selected_variable_spec or {}
+        value_specs_by_variable[variable_name] = ValueSpecIndex(
+            build_variable_value_specs(selected_variable_spec or {})
         )
+    order_names = set(order)
+    matcher = (match_cache or get_match_cache()).bind(
+        [item for item in variable_specs if item.get("name") in order_names],
+        partial,
+    )
 
     template_text = folder_template.strip() or "/".join(f"[{name}]" for name in order)
 
-    image_paths = iter_image_files(folder)
-    total = len(image_paths)
-    reserved_map: dict[str, set[str]] = {}
-    results: list[dict] = []
+    scan_stats = scan_stats if scan_stats is not None else ScanStats()
+    # 스캔을 끝까지 기다리지 않고 찾는 대로 태그를 읽는다. 전체 개수는 찾은 만큼 늘어난다.
+    scanned = order_for_read(
+        scan_files(folder, workers=scan_workers, stats=scan_stats), read_order, folder
+    )
+    if dry_run:
+        journal = None
+    if journal is not None:
+        # 재개: 이동이 끝난 파일은 대상 폴더에 있으므로 예약 이름은 폴더를 읽을 때 되살아난다.
+        scanned = journal.iter_pending_paths(scanned)
+    image_paths = CountedPaths(scanned)
+    reserved = NameIndex()
+    same_device = dry_run or is_same_device(folder, target_root)
+    manifest: ViewManifest | None = None
+    if link and not dry_run:
+        manifest = ViewManifest(target_root)
+        mover = folder_linker(reserved, manifest, hard=same_device)
+    else:
+        # 같은 드라이브면 rename 만으로 끝나고, 다른 드라이브면 처음부터 복사 경로로 보낸다.
+        if not same_device:
+            _logger.info("move: 다른 드라이브로 복사 후 삭제 (검증=%s)", verify_copy)
+        mover = folder_mover(reserved, cross_device=not same_device, verify=verify_copy)
+    batcher = ResultBatcher(batch_cb)
+    results = batcher.results
+    undo_log = None
+    if not dry_run:
+        undo_log = open_undo_log(
+            "link" if link else "move",
+            {"folder": os.path.abspath(folder), "target_root": os.path.abspath(target_root)},
+        )
+    ops = FileOperations(
+        mover, batcher, journal, buffered=True, workers=io_workers, undo_log=undo_log
+    )
     cache_hits = 0
     cache_misses = 0
     unknown_reason_counter: Counter[str] = Counter()
 
-    for idx, path in enumerate(image_paths, start=1):
+    tag_results = iter_image_tags(image_paths, include_negative, pool, prefetch)
+    for idx, (path, tags, cache_status, stamp) in enumerate(tag_results, start=1):
         if cancel_cb and cancel_cb():
             break
         try:
-            tags, cache_status = get_tags_cached(path, include_negative)
+            if isinstance(tags, Exception):
+                raise tags
             if cache_status is True:
                 cache_hits += 1
             elif cache_status is False:
                 cache_misses += 1
-            matches = match_variable_specs(variable_specs, tags)
+            matches = matcher.match(tags)
         except Exception as exc:
-            results.append(
+            ops.skip(
                 {
                     "status": "ERROR",
                     "source": path,
@@ -86,7 +183,7 @@ def move_images(
                 }
             )
             if progress_cb:
-                progress_cb(idx, total)
+                progress_cb(idx, image_paths.count)
             continue
 
         values_map: dict[str, str] = {}
@@ -117,6 +214,7 @@ def move_images(
                     reason_variable,
                     value_specs_by_variable.get(reason_variable, []),
                     tags,
+                    missing_stats,
                 )
                 message = f"{reason_variable}: {reason}"
                 unknown_reason_counter[message] += 1
@@ -131,7 +229,7 @@ def move_images(
                 else:
                     prefix = f"{failed_variable}: " if failed_variable else ""
                     message = f"{prefix}다중 매치 발생"
-            results.append(
+            ops.skip(
                 {
                     "status": status,
                     "source": path,
@@ -141,7 +239,7 @@ def move_images(
                 }
             )
             if progress_cb:
-                progress_cb(idx, total)
+                progress_cb(idx, image_paths.count)
             continue
 
         partial_message: str | None = None
@@ -161,6 +259,7 @@ def move_images(
                     next_variable,
                     value_specs_by_variable.get(next_variable, []),
                     tags,
+                    missing_stats,
                 )
                 partial_reason = f"{next_variable} 미매치({reason})"
             partial_message = (
@@ -180,7 +279,7 @@ def move_images(
         )
         folder_name = sanitize_folder_template_path(rendered)
         if not folder_name:
-            results.append(
+            ops.skip(
                 {
                     "status": "ERROR",
                     "source": path,
@@ -190,55 +289,41 @@ def move_images(
                 }
             )
             if progress_cb:
-                progress_cb(idx, total)
+                progress_cb(idx, image_paths.count)
             continue
 
         target_folder = str(Path(target_root) / folder_name)
-        if target_folder not in reserved_map:
-            try:
-                names = {p.name.lower() for p in Path(target_folder).glob("*") if p.is_file()}
-            except FileNotFoundError:
-                names = set()
-            reserved_map[target_folder] = names
-
-        reserved = reserved_map[target_folder]
         ext = Path(path).suffix
         base = Path(path).stem
         new_name = ensure_unique_name(target_folder, base, ext, reserved)
         target = str(Path(target_folder) / new_name)
 
-        if not dry_run:
-            Path(target_folder).mkdir(parents=True, exist_ok=True)
-            try:
-                shutil.move(path, target)
-            except Exception as exc:
-                results.append(
-                    {
-                        "status": "ERROR",
-                        "source": path,
-                        "target": None,
-                        "message": str(exc),
-                        "preview": path,
-                    }
-                )
-                if progress_cb:
-                    progress_cb(idx, total)
-                continue
-
-        preview_source = path if dry_run else target
-        results.append(
-            {
-                "status": "OK",
-                "source": path,
-                "target": target,
-                "message": partial_message,
-                "preview": preview_source,
-            }
-        )
+        record = {
+            "status": "OK",
+            "source": path,
+            "target": target,
+            "message": partial_message,
+            "preview": path if dry_run else target,
+        }
+        if stamp is not None:
+            # 계획으로 저장할 때 태그를 뽑은 시점의 원본 크기/수정 시각을 함께 남긴다.
+            record["size"], record["mtime_ns"] = stamp
+        if dry_run:
+            batcher.add(record)
+        else:
+            ops.submit(path, target, record)
         if progress_cb:
-            progress_cb(idx, total)
+            progress_cb(idx, image_paths.count)
 
-    _logger.info("move cache: hit=%d miss=%d total=%d", cache_hits, cache_misses, total)
+    ops.close()
+    if manifest is not None:
+        manifest.close()
+    matcher.flush()
+    _logger.info("move scan: %s", scan_stats.format_summary())
+    _logger.info(
+        "move cache: hit=%d miss=%d total=%d", cache_hits, cache_misses, image_paths.count
+    )
+    _logger.info("move match cache: hit=%d miss=%d", matcher.hits, matcher.misses)
     if unknown_reason_counter:
         _logger.info(
             "move unknown detail (top5): %s",
@@ -246,4 +331,7 @@ def move_images(
                 f"{reason} x{count}" for reason, count in unknown_reason_counter.most_common(5)
             ),
         )
+    if missing_stats is not None and missing_stats.summary():
+        _logger.info("move missing tags (top5): %s", missing_stats.format_summary(5))
+    batcher.flush()
     return results
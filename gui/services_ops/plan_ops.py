@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+from core.runner import OperationJournal
+from core.utils import NameIndex, target_exists
+
+from .common import (
+    DEFAULT_IO_WORKERS,
+    CancelCallback,
+    FileOperations,
+    ProgressCallback,
+    ResultBatchCallback,
+    ResultBatcher,
+    open_undo_log,
+)
+from .move_ops import folder_mover
+
+PLAN_VERSION = 1
+PLAN_KINDS = ("rename", "move")
+
+
+@dataclass
+class PlanEntry:
+    source: str
+    target: str | None
+    status: str
+    message: str | None = None
+    size: int | None = None
+    mtime_ns: int | None = None
+
+
+@dataclass
+class OperationPlan:
+    """드라이런 결과를 그대로 실행할 수 있게 저장한 계획.
+
+    OK 항목은 태그를 뽑은 시점의 원본 크기/수정 시각(결과 레코드의 size/mtime_ns)을 함께
+    가지며, 적용할 때는 태그 추출과 매칭 없이 이 값만 다시 확인한다. params 는 계획을 만든
+    실행 조건(폴더, 대상 루트, 순서 등)이다.
+    """
+
+    kind: str
+    entries: list[PlanEntry]
+    params: dict[str, Any] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_results(
+        cls,
+        kind: str,
+        results: list[dict],
+        params: dict[str, Any] | None = None,
+    ) -> "OperationPlan":
+        if kind not in PLAN_KINDS:
+            raise ValueError(f"unknown plan kind: {kind}")
+        entries: list[PlanEntry] = []
+        for record in results:
+            status = str(record.get("status") or "")
+            entries.append(
+                PlanEntry(
+                    source=str(record.get("source") or ""),
+                    target=record.get("target"),
+                    status=status,
+                    message=record.get("message"),
+                    size=record.get("size") if status == "OK" else None,
+                    mtime_ns=record.get("mtime_ns") if status == "OK" else None,
+                )
+            )
+        return cls(kind=kind, entries=entries, params=dict(params or {}))
+
+    def matches(self, kind: str, params: dict[str, Any]) -> bool:
+        return self.kind == kind and self.params == params
+
+    def counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for entry in self.entries:
+            counts[entry.status] = counts.get(entry.status, 0) + 1
+        return counts
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": PLAN_VERSION,
+            "kind": self.kind,
+            "params": self.params,
+            "created_at": self.created_at,
+            "entries": [asdict(entry) for entry in self.entries],
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "OperationPlan":
+        if payload.get("version") != PLAN_VERSION:
+            raise ValueError(f"unsupported plan version: {payload.get('version')}")
+        kind = str(payload.get("kind") or "")
+        if kind not in PLAN_KINDS:
+            raise ValueError(f"unknown plan kind: {kind}")
+        return cls(
+            kind=kind,
+            entries=[PlanEntry(**entry) for entry in payload.get("entries", [])],
+            params=dict(payload.get("params") or {}),
+            created_at=float(payload.get("created_at") or 0.0),
+        )
+
+    def save(self, path: str | Path) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, ensure_ascii=False)
+            handle.write("\n")
+
+    @classmethod
+    def load(cls, path: str | Path) -> "OperationPlan":
+        with open(path, "r", encoding="utf-8") as handle:
+            return cls.from_dict(json.load(handle))
+
+
+def _check_entry(entry: PlanEntry) -> tuple[str, str] | None:
+    """실행 전에 원본이 계획 때와 같은지, 대상이 비어 있는지 확인한다.
+
+    문제가 있으면 (상태, 사유). 원본이 바뀌었으면 SKIP, 나머지는 ERROR 이다.
+    """
+    try:
+        stat = os.stat(entry.source)
+    except OSError:
+        return "ERROR", "원본 파일이 없습니다."
+    if entry.size != int(stat.st_size) or entry.mtime_ns != int(stat.st_mtime_ns):
+        return "SKIP", "계획 이후 파일이 변경되어 건너뜀"
+    if target_exists(entry.source, entry.target or ""):
+        return "ERROR", "대상 파일이 이미 있습니다."
+    return None
+
+
+def apply_plan(
+    plan: OperationPlan,
+    *,
+    progress_cb: ProgressCallback | None = None,
+    cancel_cb: CancelCallback | None = None,
+    batch_cb: ResultBatchCallback | None = None,
+    journal: OperationJournal | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    verify_copy: bool = False,
+) -> list[dict]:
+    """드라이런 계획의 OK 항목만 실행한다. 태그 추출/매칭은 하지 않는다.
+
+    원본 크기/수정 시각이 계획과 다르면 SKIP, 대상이 이미 있으면 ERROR 로 남기고
+    건너뛴다. UNKNOWN/CONFLICT 등 나머지 항목은 계획의 결과를 그대로 돌려준다.
+    """
+    entries = plan.entries
+    if journal is not None:
+        pending = set(journal.pending_paths(entry.source for entry in entries))
+        entries = [entry for entry in entries if entry.source in pending]
+    total = len(entries)
+    batcher = ResultBatcher(batch_cb)
+    results = batcher.results
+    if plan.kind == "move":
+        # 항목마다 대상 드라이브가 다를 수 있으므로 rename 이 EXDEV 로 실패할 때 복사한다.
+        execute = folder_mover(NameIndex(), verify=verify_copy)
+    else:
+        execute = os.rename
+    # 되돌리기 기록은 rename_images/move_images 와 같은 조건을 남긴다. target_root 가 있어야
+    # 되돌린 뒤 빈 분류 폴더를 정리할 수 있다.
+    undo_params = {
+        key: os.path.abspath(plan.params[key])
+        for key in ("folder", "target_root")
+        if plan.params.get(key)
+    }
+    ops = FileOperations(
+        execute,
+        batcher,
+        journal,
+        buffered=True,
+        workers=io_workers,
+        undo_log=open_undo_log(plan.kind, undo_params),
+    )
+
+    for idx, entry in enumerate(entries, start=1):
+        if cancel_cb and cancel_cb():
+            break
+        if entry.status != "OK" or not entry.target:
+            ops.skip(
+                {
+                    "status": entry.status,
+                    "source": entry.source,
+                    "target": None,
+                    "message": entry.message,
+                    "preview": entry.source,
+                }
+            )
+        else:
+            problem = _check_entry(entry)
+            if problem is not None:
+                status, message = problem
+                batcher.add(
+                    {
+                        "status": status,
+                        "source": entry.source,
+                        "target": None,
+                        "message": message,
+                        "preview": entry.source,
+                    }
+                )
+            else:
+                ops.submit(
+                    entry.source,
+                    entry.target,
+                    {
+                        "status": "OK",
+                        "source": entry.source,
+                        "target": entry.target,
+                        "message": entry.message,
+                        "preview": entry.target,
+                    },
+                )
+        if progress_cb:
+            progress_cb(idx, total)
+
+    ops.close()
+    batcher.flush()
+    return results
@@ -5,16 +5,33 @@ import logging
 import os
 from pathlib import Path
 
+from core.match import PartialMatchPolicy
 from core.preset import Preset
-from core.runner import build_variable_specs, match_variable_specs
-from core.utils import ensure_unique_name, iter_image_files, render_template, sanitize_filename
+from core.runner import MatchCache, OperationJournal, WorkerPool, build_variable_specs
+from core.utils import (
+    NameIndex,
+    ScanStats,
+    ensure_unique_name,
+    order_for_read,
+    render_template,
+    sanitize_filename,
+    scan_files,
+)
 
 from .common import (
+    DEFAULT_IO_WORKERS,
     CancelCallback,
+    FileOperations,
+    MissingTagStats,
     ProgressCallback,
+    ResultBatchCallback,
+    ResultBatcher,
+    ValueSpecIndex,
     build_variable_value_specs,
     explain_unknown_match,
-    get_tags_cached,
+    get_match_cache,
+    iter_image_tags,
+    open_undo_log,
     template_to_variables_payload,
 )
 
@@ -32,6 +49,17 @@ def rename_images(
     include_negative: bool = False,
     progress_cb: ProgressCallback | None = None,
     cancel_cb: CancelCallback | None = None,
+    batch_cb: ResultBatchCallback | None = None,
+    pool: WorkerPool | None = None,
+    match_cache: MatchCache | None = None,
+    partial: PartialMatchPolicy | None = None,
+    missing_stats: MissingTagStats | None = None,
+    journal: OperationJournal | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    scan_workers: int = 1,
+    scan_stats: ScanStats | None = None,
+    read_order: str = "path",
+    prefetch: bool = False,
 ) -> list[dict]:
     if isinstance(order, str):
         order = [item.strip() for item in order.split(",") if item.strip()]
@@ -44,37 +72,60 @@ def rename_images(
     missing = [name for name in order if name not in spec_names]
     if missing:
         raise ValueError(f"템플릿에 없는 변수: {', '.join(missing)}")
-    value_specs_by_variable: dict[str, list[tuple[str, set[str]]]] = {}
+    value_specs_by_variable: dict[str, ValueSpecIndex] = {}
     for variable_name in order:
         selected_variable_spec = next(
             (item for item in variable_specs if item.get("name") == variable_name),
             None,
         )
-        value_specs_by_variable[variable_name] = build_variable_value_specs(
-            selected_variable_spec or {}
+        value_specs_by_variable[variable_name] = ValueSpecIndex(
+            build_variable_value_specs(selected_variable_spec or {})
         )
+    order_names = set(order)
+    matcher = (match_cache or get_match_cache()).bind(
+        [item for item in variable_specs if item.get("name") in order_names],
+        partial,
+    )
 
     template_text = template.strip() or "_".join(f"[{name}]" for name in order)
-    image_paths = iter_image_files(folder)
+    scan_stats = scan_stats if scan_stats is not None else ScanStats()
+    # 이미지 이름은 모든 폴더에서 예약되므로 첫 이름을 정하기 전에 스캔을 끝까지 읽는다.
+    image_paths = list(
+        order_for_read(
+            scan_files(folder, workers=scan_workers, stats=scan_stats), read_order, folder
+        )
+    )
+    _logger.info("rename scan: %s", scan_stats.format_summary())
+    reserved = NameIndex(Path(path).name for path in image_paths)
+    if dry_run:
+        journal = None
+    if journal is not None:
+        # 재개: 이미 끝난 파일(과 그 결과 파일)은 건너뛰고, 쓰인 이름은 예약 상태로 되살린다.
+        reserved.update(Path(target).name for target in journal.done_targets())
+        image_paths = journal.pending_paths(image_paths)
     total = len(image_paths)
-    reserved = {Path(path).name.lower() for path in image_paths}
 
-    results: list[dict] = []
+    batcher = ResultBatcher(batch_cb)
+    results = batcher.results
+    undo_log = None if dry_run else open_undo_log("rename", {"folder": os.path.abspath(folder)})
+    ops = FileOperations(os.rename, batcher, journal, workers=io_workers, undo_log=undo_log)
     cache_hits = 0
     cache_misses = 0
     unknown_reason_counter: Counter[str] = Counter()
-    for idx, path in enumerate(image_paths, start=1):
+    tag_results = iter_image_tags(image_paths, include_negative, pool, prefetch)
+    for idx, (path, tags, cache_status, stamp) in enumerate(tag_results, start=1):
         if cancel_cb and cancel_cb():
             break
         try:
-            tags, cache_status = get_tags_cached(path, include_negative)
+            if isinstance(tags, Exception):
+                raise tags
             if cache_status is True:
                 cache_hits += 1
             elif cache_status is False:
                 cache_misses += 1
-            matches = match_variable_specs(variable_specs, tags)
+            matches = matcher.match(tags)
         except Exception as exc:
-            results.append(
+            ops.skip(
                 {
                     "status": "ERROR",
                     "source": path,
@@ -108,6 +159,7 @@ def rename_images(
                     reason_variable,
                     value_specs_by_variable.get(reason_variable, []),
                     tags,
+                    missing_stats,
                 )
                 message = f"{reason_variable}: {reason}"
                 unknown_reason_counter[message] += 1
@@ -122,7 +174,7 @@ def rename_images(
                 else:
                     prefix = f"{failed_variable}: " if failed_variable else ""
                     message = f"{prefix}다중 매치 발생"
-            results.append(
+            ops.skip(
                 {
                     "status": status,
                     "source": path,
@@ -153,37 +205,27 @@ def rename_images(
             new_name = ensure_unique_name(Path(path).parent, base_name, ext, reserved)
         target = str(Path(path).with_name(new_name))
 
-        if not dry_run and target != path:
-            try:
-                os.rename(path, target)
-            except Exception as exc:
-                results.append(
-                    {
-                        "status": "ERROR",
-                        "source": path,
-                        "target": None,
-                        "message": str(exc),
-                        "preview": path,
-                    }
-                )
-                if progress_cb:
-                    progress_cb(idx, total)
-                continue
-
-        preview_source = path if dry_run else target
-        results.append(
-            {
-                "status": "OK",
-                "source": path,
-                "target": target,
-                "message": None,
-                "preview": preview_source,
-            }
-        )
+        record = {
+            "status": "OK",
+            "source": path,
+            "target": target,
+            "message": None,
+            "preview": path if dry_run else target,
+        }
+        if stamp is not None:
+            # 계획으로 저장할 때 태그를 뽑은 시점의 원본 크기/수정 시각을 함께 남긴다.
+            record["size"], record["mtime_ns"] = stamp
+        if dry_run:
+            batcher.add(record)
+        else:
+            ops.submit(path, target, record)
         if progress_cb:
             progress_cb(idx, total)
 
+    ops.close()
+    matcher.flush()
     _logger.info("rename cache: hit=%d miss=%d total=%d", cache_hits, cache_misses, total)
+    _logger.info("rename match cache: hit=%d miss=%d", matcher.hits, matcher.misses)
     if unknown_reason_counter:
         _logger.info(
             "rename unknown detail (top5): %s",
@@ -191,4 +233,7 @@ def rename_images(
                 f"{reason} x{count}" for reason, count in unknown_reason_counter.most_common(5)
             ),
         )
+    if missing_stats is not None and missing_stats.summary():
+        _logger.info("rename missing tags (top5): %s", missing_stats.format_summary(5))
+    batcher.flush()
     return results
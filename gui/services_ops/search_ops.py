@@ -4,9 +4,17 @@ import logging
 
 from core.match import match_tag_and
 from core.normalize import split_novelai_tags
-from core.utils import iter_image_files
+from core.runner import WorkerPool
+from core.utils import ScanStats, order_for_read, scan_files
 
-from .common import CancelCallback, ProgressCallback, get_tags_cached
+from .common import (
+    CancelCallback,
+    CountedPaths,
+    ProgressCallback,
+    ResultBatchCallback,
+    ResultBatcher,
+    iter_image_tags,
+)
 
 _logger = logging.getLogger(__name__)
 
@@ -18,28 +26,42 @@ def search_images(
     include_negative: bool = False,
     progress_cb: ProgressCallback | None = None,
     cancel_cb: CancelCallback | None = None,
+    batch_cb: ResultBatchCallback | None = None,
+    pool: WorkerPool | None = None,
+    scan_workers: int = 1,
+    scan_stats: ScanStats | None = None,
+    read_order: str = "path",
+    prefetch: bool = False,
 ) -> list[dict]:
     required_tags = split_novelai_tags(tags_input)
     if not required_tags:
         raise ValueError("검색 태그가 비어 있습니다.")
 
-    image_paths = iter_image_files(folder)
-    total = len(image_paths)
-    results: list[dict] = []
+    scan_stats = scan_stats if scan_stats is not None else ScanStats()
+    # 스캔을 끝까지 기다리지 않고 찾는 대로 태그를 읽는다. 전체 개수는 찾은 만큼 늘어난다.
+    image_paths = CountedPaths(
+        order_for_read(
+            scan_files(folder, workers=scan_workers, stats=scan_stats), read_order, folder
+        )
+    )
+    batcher = ResultBatcher(batch_cb)
+    results = batcher.results
     cache_hits = 0
     cache_misses = 0
-    for idx, path in enumerate(image_paths, start=1):
+    tag_results = iter_image_tags(image_paths, include_negative, pool, prefetch)
+    for idx, (path, tags, cache_status, _stamp) in enumerate(tag_results, start=1):
         if cancel_cb and cancel_cb():
             break
         try:
-            tags, cache_status = get_tags_cached(path, include_negative)
+            if isinstance(tags, Exception):
+                raise tags
             if cache_status is True:
                 cache_hits += 1
             elif cache_status is False:
                 cache_misses += 1
 
             if match_tag_and(required_tags, tags):
-                results.append(
+                batcher.add(
                     {
                         "status": "OK",
                         "source": path,
@@ -49,7 +71,7 @@ def search_images(
                     }
                 )
         except Exception as exc:
-            results.append(
+            batcher.add(
                 {
                     "status": "ERROR",
                     "source": path,
@@ -59,6 +81,10 @@ def search_images(
                 }
             )
         if progress_cb:
-            progress_cb(idx, total)
-    _logger.info("search cache: hit=%d miss=%d total=%d", cache_hits, cache_misses, total)
+            progress_cb(idx, image_paths.count)
+    _logger.info("search scan: %s", scan_stats.format_summary())
+    _logger.info(
+        "search cache: hit=%d miss=%d total=%d", cache_hits, cache_misses, image_paths.count
+    )
+    batcher.flush()
     return results
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from core.runner import read_undo_log
+from core.runner.undo import UNDO_SUFFIX, UNDONE_SUFFIX
+from core.utils import NameIndex
+
+from .common import (
+    DEFAULT_IO_WORKERS,
+    CancelCallback,
+    FileOperations,
+    ProgressCallback,
+    ResultBatchCallback,
+    ResultBatcher,
+)
+from .move_ops import folder_mover
+from .view_ops import prune_empty_folders
+
+
+def _remove_link(link: str, _original: str) -> None:
+    os.remove(link)
+
+
+def _is_same_file(left: str, right: str) -> bool:
+    try:
+        return os.path.samefile(left, right)
+    except OSError:
+        return False
+
+
+def undo_operations(
+    log_path: str | Path,
+    *,
+    progress_cb: ProgressCallback | None = None,
+    cancel_cb: CancelCallback | None = None,
+    batch_cb: ResultBatchCallback | None = None,
+    io_workers: int = DEFAULT_IO_WORKERS,
+) -> list[dict]:
+    """되돌리기 기록을 거꾸로 재생해서 파일을 원래 경로로 돌려놓는다.
+
+    바뀐 파일이 없으면 SKIP, 원래 경로에 그 사이 다른 파일이 생겼으면 덮어쓰지 않고 ERROR.
+    link 기록은 링크가 아직 원본을 가리킬 때만 지운다. 모두 되돌리면 기록 파일 이름을
+    .undone 으로 바꾸므로, 같은 기록을 다시 실행하면 이미 되돌린 항목은 SKIP 이 된다.
+    """
+    header, entries = read_undo_log(log_path)
+    kind = str(header.get("kind") or "")
+    params = header.get("params") or {}
+    entries.reverse()
+    total = len(entries)
+    batcher = ResultBatcher(batch_cb)
+    results = batcher.results
+    execute = _remove_link if kind == "link" else folder_mover(NameIndex())
+    ops = FileOperations(execute, batcher, buffered=True, workers=io_workers)
+    cancelled = False
+
+    for idx, (original, changed) in enumerate(entries, start=1):
+        if cancel_cb and cancel_cb():
+            cancelled = True
+            break
+        record = {
+            "status": "OK",
+            "source": changed,
+            "target": original,
+            "message": None,
+            "preview": original,
+        }
+        if not os.path.lexists(changed):
+            record.update(status="SKIP", target=None, message="이미 없습니다.", preview=changed)
+            ops.skip(record)
+        elif kind == "link" and not _is_same_file(changed, original):
+            record.update(
+                status="SKIP",
+                target=None,
+                message="원본을 가리키지 않아 남겨 둠",
+                preview=changed,
+            )
+            ops.skip(record)
+        else:
+            ops.submit(changed, original, record)
+        if progress_cb:
+            progress_cb(idx, total)
+
+    ops.close()
+    root = params.get("target_root")
+    if root:
+        # 분류로 생긴 폴더 중 되돌린 뒤 비게 된 것만 지운다.
+        moved = {os.path.dirname(item["source"]) for item in results if item["status"] == "OK"}
+        prune_empty_folders(moved, Path(root))
+    if not cancelled and not any(item["status"] == "ERROR" for item in results):
+        log_path = Path(log_path)
+        if log_path.name.endswith(UNDO_SUFFIX):
+            log_path.replace(log_path.with_name(log_path.name + UNDONE_SUFFIX))
+    batcher.flush()
+    return results
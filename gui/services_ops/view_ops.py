@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Callable
+
+from core.utils import NameIndex, link_file
+
+from .common import CancelCallback, ProgressCallback, ResultBatchCallback, ResultBatcher
+
+VIEW_MANIFEST_NAME = ".exif_view.jsonl"
+
+
+class ViewManifest:
+    """링크 보기(view)에 만든 링크 목록. 한 줄에 {"source", "target", "kind"}.
+
+    teardown_view 가 이 목록에 있는 링크만 지우므로, 보기 폴더에 사용자가 넣은 파일은 남는다.
+    링크마다 바로 flush 해서 중간에 멈춰도 이미 만든 링크는 목록에 남는다.
+    """
+
+    def __init__(self, target_root: str | Path) -> None:
+        self.path = Path(target_root) / VIEW_MANIFEST_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._handle = open(self.path, "a", encoding="utf-8", newline="\n")
+
+    def add(self, source: str, target: str, kind: str) -> None:
+        line = json.dumps(
+            {"source": os.path.abspath(source), "target": os.path.abspath(target), "kind": kind},
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self._handle.write(line)
+            self._handle.write("\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.close()
+
+
+def folder_linker(
+    names: NameIndex,
+    manifest: ViewManifest,
+    *,
+    hard: bool,
+) -> Callable[[str, str], None]:
+    """folder_mover 와 같은 자리에서 파일 대신 링크를 만드는 실행 함수."""
+    kind = "hardlink" if hard else "symlink"
+
+    def execute(source: str, target: str) -> None:
+        names.ensure_folder(Path(target).parent)
+        link_file(source, target, hard=hard)
+        manifest.add(source, target, kind)
+
+    return execute
+
+
+def _read_manifest(path: Path) -> list[dict]:
+    entries: dict[str, dict] = {}
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # 마지막 줄이 쓰다 만 채로 끊긴 경우다.
+                continue
+            entries[str(entry.get("target") or "")] = entry
+    return [entry for target, entry in entries.items() if target]
+
+
+def _is_view_link(entry: dict) -> bool:
+    source = str(entry.get("source") or "")
+    target = str(entry.get("target") or "")
+    if entry.get("kind") == "symlink":
+        return os.path.islink(target) and os.path.realpath(target) == os.path.realpath(source)
+    # 하드 링크는 원본이 남아 있을 때만 지운다. 원본이 없으면 이 링크가 유일한 사본이다.
+    try:
+        return os.path.samefile(source, target)
+    except OSError:
+        return False
+
+
+def _is_below(path: str, root_key: str) -> bool:
+    key = os.path.normcase(path)
+    try:
+        return key != root_key and os.path.commonpath([key, root_key]) == root_key
+    except ValueError:
+        # 다른 드라이브의 경로
+        return False
+
+
+def prune_empty_folders(folders: set[str], root: Path) -> None:
+    """folders 중 비어 있는 폴더와 그 상위 폴더를 root 바로 아래까지 지운다. root 는 남긴다."""
+    root_key = os.path.normcase(os.path.abspath(root))
+    for folder in sorted(folders, key=len, reverse=True):
+        current = os.path.abspath(folder)
+        while _is_below(current, root_key):
+            try:
+                os.rmdir(current)
+            except OSError:
+                break
+            current = os.path.dirname(current)
+
+
+def teardown_view(
+    target_root: str,
+    *,
+    progress_cb: ProgressCallback | None = None,
+    cancel_cb: CancelCallback | None = None,
+    batch_cb: ResultBatchCallback | None = None,
+) -> list[dict]:
+    """링크 모드 분류로 만든 보기를 지운다. 원본 파일은 건드리지 않는다.
+
+    목록의 링크가 아직 원본을 가리킬 때만 지우고(OK), 바뀌었거나 원본이 사라진 하드 링크는
+    남긴다(SKIP). 비게 된 하위 폴더를 정리하고, 남은 링크가 없으면 목록 파일도 지운다.
+    """
+    root = Path(target_root)
+    manifest_path = root / VIEW_MANIFEST_NAME
+    if not manifest_path.is_file():
+        raise ValueError(f"링크 보기 기록이 없습니다: {manifest_path}")
+    entries = _read_manifest(manifest_path)
+    total = len(entries)
+    batcher = ResultBatcher(batch_cb)
+    results = batcher.results
+    remaining: list[dict] = []
+    folders: set[str] = set()
+
+    for idx, entry in enumerate(entries, start=1):
+        if cancel_cb and cancel_cb():
+            remaining.extend(entries[idx - 1 :])
+            break
+        target = str(entry["target"])
+        record = {"status": "OK", "source": target, "target": None, "message": None, "preview": target}
+        if not os.path.lexists(target):
+            record.update(status="SKIP", message="이미 없습니다.")
+        elif not _is_view_link(entry):
+            record.update(status="SKIP", message="원본을 가리키지 않아 남겨 둠")
+            remaining.append(entry)
+        else:
+            try:
+                os.remove(target)
+                folders.add(os.path.dirname(target))
+            except OSError as exc:
+                record.update(status="ERROR", message=str(exc))
+                remaining.append(entry)
+        batcher.add(record)
+        if progress_cb:
+            progress_cb(idx, total)
+
+    prune_empty_folders(folders, root)
+    if remaining:
+        tmp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as handle:
+            for entry in remaining:
+                handle.write(json.dumps(entry, ensure_ascii=False))
+                handle.write("\n")
+        os.replace(tmp_path, manifest_path)
+    else:
+        # 보기 폴더(target_root)는 사용자가 고른 폴더이므로 비어도 남긴다.
+        manifest_path.unlink()
+    batcher.flush()
+    return results
@@ -9,15 +9,24 @@ from .ops import (
     add_value,
     add_variable,
     delete_value,
+    delete_values,
     delete_variable,
     normalize_tags_input,
     rename_variable,
+    set_value_tags,
     update_value,
 )
-from .validation import validate_value_tag_constraints
+from .working_copy import TemplateWorkingCopy
 
 
 class ActionsMixin:
+    def _working_copy(self) -> TemplateWorkingCopy:
+        # 같은 Preset 객체에 대한 편집이 이어지면 색인을 가진 작업 사본을 재사용한다.
+        preset = self.get_preset()
+        if self.working_copy is None or self.working_copy.preset is not preset:
+            self.working_copy = TemplateWorkingCopy(preset)
+        return self.working_copy
+
     def _next_variable_name(self, preset: Preset) -> str:
         used = {variable.name for variable in preset.variables}
         index = 1
@@ -226,7 +235,7 @@ class ActionsMixin:
         preset = self.get_preset()
         name = self._next_variable_name(preset)
         try:
-            new_preset = add_variable(preset, name)
+            new_preset = add_variable(self._working_copy(), name)
             self._apply_preset(new_preset, f"변수 추가: {name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -238,7 +247,7 @@ class ActionsMixin:
             return
         name = self.variable_name_var.get().strip()
         try:
-            new_preset = rename_variable(self.get_preset(), var_idx, name)
+            new_preset = rename_variable(self._working_copy(), var_idx, name)
             self._apply_preset(new_preset, f"변수 이름 변경: {name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -255,7 +264,7 @@ class ActionsMixin:
         if not messagebox.askyesno("템플릿", f"변수 '{var_name}'를 삭제할까요?"):
             return
         try:
-            new_preset = delete_variable(preset, var_idx)
+            new_preset = delete_variable(self._working_copy(), var_idx)
             self._apply_preset(new_preset, f"변수 삭제: {var_name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -267,7 +276,7 @@ class ActionsMixin:
             return
         value_name = self.value_name_var.get().strip()
         try:
-            new_preset = add_value(self.get_preset(), var_idx, value_name, [])
+            new_preset = add_value(self._working_copy(), var_idx, value_name, [])
             self._apply_preset(new_preset, f"값 추가: {value_name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -287,7 +296,7 @@ class ActionsMixin:
         value_name = self.value_name_var.get().strip()
         tags = list(values[value_idx].tags)
         try:
-            new_preset = update_value(preset, var_idx, value_idx, value_name, tags)
+            new_preset = update_value(self._working_copy(), var_idx, value_idx, value_name, tags)
             self._apply_preset(new_preset, f"값 이름 변경: {value_name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -307,29 +316,24 @@ class ActionsMixin:
         if var_idx >= len(preset.variables):
             return
 
-        payload = preset.model_dump()
-        variables = payload.get("variables", [])
-        if var_idx >= len(variables):
-            return
-        values = variables[var_idx].setdefault("values", [])
-        changed = 0
+        values = preset.variables[var_idx].values
+        tags_by_value: dict[int, list[str]] = {}
         for value_idx in sorted(set(value_indices)):
             if value_idx < 0 or value_idx >= len(values):
                 continue
-            current_tags = [str(tag) for tag in (values[value_idx].get("tags") or [])]
+            current_tags = list(values[value_idx].tags)
             merged = list(current_tags)
             for tag in incoming:
                 if tag not in merged:
                     merged.append(tag)
             if merged != current_tags:
-                values[value_idx]["tags"] = merged
-                changed += 1
+                tags_by_value[value_idx] = merged
+        changed = len(tags_by_value)
         if changed == 0:
             self.set_status("태그 추가: 변경 없음")
             return
         try:
-            validate_value_tag_constraints(values)
-            new_preset = Preset.model_validate(payload)
+            new_preset = set_value_tags(self._working_copy(), var_idx, tags_by_value)
             self._apply_preset(
                 new_preset,
                 f"태그 추가: {changed}개 값 변경 (+{len(incoming)}개 입력)",
@@ -349,27 +353,24 @@ class ActionsMixin:
             return
 
         preset = self.get_preset()
-        payload = preset.model_dump()
-        variables = payload.get("variables", [])
-        if var_idx >= len(variables):
+        if var_idx >= len(preset.variables):
             return
-        values = variables[var_idx].setdefault("values", [])
+        values = preset.variables[var_idx].values
 
-        changed = 0
+        tags_by_value: dict[int, list[str]] = {}
         for value_idx in sorted(set(value_indices)):
             if value_idx < 0 or value_idx >= len(values):
                 continue
-            current_tags = [str(tag) for tag in (values[value_idx].get("tags") or [])]
+            current_tags = list(values[value_idx].tags)
             updated = [tag for tag in current_tags if tag not in tags_to_remove]
             if updated != current_tags:
-                values[value_idx]["tags"] = updated
-                changed += 1
+                tags_by_value[value_idx] = updated
+        changed = len(tags_by_value)
         if changed == 0:
             self.set_status("입력 태그 삭제: 변경 없음")
             return
         try:
-            validate_value_tag_constraints(values)
-            new_preset = Preset.model_validate(payload)
+            new_preset = set_value_tags(self._working_copy(), var_idx, tags_by_value)
             self._apply_preset(
                 new_preset,
                 f"입력 태그 삭제: {changed}개 값 변경 (-{len(tags_to_remove)}개 기준)",
@@ -397,26 +398,23 @@ class ActionsMixin:
             return
 
         preset = self.get_preset()
-        payload = preset.model_dump()
-        variables = payload.get("variables", [])
-        if var_idx >= len(variables):
+        if var_idx >= len(preset.variables):
             return
-        values = variables[var_idx].setdefault("values", [])
-        changed = 0
+        values = preset.variables[var_idx].values
+        tags_by_value: dict[int, list[str]] = {}
         for value_idx in sorted(set(value_indices)):
             if value_idx < 0 or value_idx >= len(values):
                 continue
-            current_tags = [str(tag) for tag in (values[value_idx].get("tags") or [])]
+            current_tags = list(values[value_idx].tags)
             updated_tags = [tag for tag in current_tags if tag not in selected_tag_names]
             if updated_tags != current_tags:
-                values[value_idx]["tags"] = updated_tags
-                changed += 1
+                tags_by_value[value_idx] = updated_tags
+        changed = len(tags_by_value)
         if changed == 0:
             self.set_status("선택 태그 삭제: 변경 없음")
             return
         try:
-            validate_value_tag_constraints(values)
-            new_preset = Preset.model_validate(payload)
+            new_preset = set_value_tags(self._working_copy(), var_idx, tags_by_value)
             self._apply_preset(new_preset, f"선택 태그 삭제: {changed}개 값 변경")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -453,15 +451,11 @@ class ActionsMixin:
             if len(valid_indices) == 1:
                 target_idx = valid_indices[0]
                 value_name = variable.values[target_idx].name
-                new_preset = delete_value(preset, var_idx, target_idx)
+                new_preset = delete_value(self._working_copy(), var_idx, target_idx)
                 self._apply_preset(new_preset, f"값 삭제: {value_name}")
                 return
 
-            payload = preset.model_dump()
-            values = payload.get("variables", [])[var_idx].setdefault("values", [])
-            for idx in valid_indices:
-                values.pop(idx)
-            new_preset = Preset.model_validate(payload)
+            new_preset = delete_values(self._working_copy(), var_idx, valid_indices)
             self._apply_preset(new_preset, f"값 삭제: {len(valid_indices)}개")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
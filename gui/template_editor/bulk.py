@@ -4,10 +4,7 @@ import re
 import tkinter as tk
 from tkinter import messagebox
 
-from core.preset import Preset
-
-from .ops import normalize_tags_input, update_value
-from .validation import validate_value_tag_constraints
+from .ops import normalize_tags_input, replace_variable_values, update_value
 
 
 def apply_value_name_add_mode(value_name: str, text: str, mode: str) -> str:
@@ -24,14 +21,10 @@ class BulkOpsMixin:
         message: str,
     ) -> None:
         preset = self.get_preset()
-        payload = preset.model_dump()
-        variables = payload.get("variables", [])
-        if var_idx < 0 or var_idx >= len(variables):
+        if var_idx < 0 or var_idx >= len(preset.variables):
             return
-        variables[var_idx]["values"] = new_values
         try:
-            validate_value_tag_constraints(variables[var_idx]["values"])
-            new_preset = Preset.model_validate(payload)
+            new_preset = replace_variable_values(self._working_copy(), var_idx, new_values)
             self._apply_preset(new_preset, message)
         except Exception as exc:
             messagebox.showerror("템플릿", f"일괄 작업 실패: {exc}")
@@ -213,7 +206,13 @@ class BulkOpsMixin:
             self.set_status("값 기반 태그 교체: 변경 없음")
             return
         try:
-            new_preset = update_value(preset, var_idx, value_idx, value.name, new_tags)
+            new_preset = update_value(
+                self._working_copy(),
+                var_idx,
+                value_idx,
+                value.name,
+                new_tags,
+            )
             self._apply_preset(
                 new_preset,
                 f"값 기반 태그 교체: {value.name} ({len(new_tags)}개)",
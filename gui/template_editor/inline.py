@@ -3,10 +3,7 @@ from __future__ import annotations
 import tkinter as tk
 from tkinter import messagebox
 
-from core.preset import Preset
-
-from .ops import normalize_tags_input, rename_variable, update_value
-from .validation import validate_value_tag_constraints
+from .ops import normalize_tags_input, rename_variable, set_value_tags, update_value
 
 
 class InlineEditMixin:
@@ -179,7 +176,7 @@ class InlineEditMixin:
         if preset.variables[var_idx].name == variable_name:
             return
         try:
-            new_preset = rename_variable(preset, var_idx, variable_name)
+            new_preset = rename_variable(self._working_copy(), var_idx, variable_name)
             self._apply_preset(new_preset, f"변수 이름 변경: {variable_name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -200,7 +197,13 @@ class InlineEditMixin:
         if value.name == value_name:
             return
         try:
-            new_preset = update_value(preset, var_idx, value_idx, value_name, list(value.tags))
+            new_preset = update_value(
+                self._working_copy(),
+                var_idx,
+                value_idx,
+                value_name,
+                list(value.tags),
+            )
             self._apply_preset(new_preset, f"값 이름 변경: {value_name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -228,7 +231,13 @@ class InlineEditMixin:
         updated_tags = list(value.tags)
         updated_tags[tag_idx] = new_tag
         try:
-            new_preset = update_value(preset, var_idx, value_idx, value.name, updated_tags)
+            new_preset = update_value(
+                self._working_copy(),
+                var_idx,
+                value_idx,
+                value.name,
+                updated_tags,
+            )
             self._apply_preset(new_preset, f"태그 변경: {value.name}")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
@@ -247,26 +256,20 @@ class InlineEditMixin:
         if var_idx >= len(preset.variables):
             return
 
-        payload = preset.model_dump()
-        variables = payload.get("variables", [])
-        if var_idx >= len(variables):
-            return
-        values = variables[var_idx].setdefault("values", [])
-        changed = 0
+        values = preset.variables[var_idx].values
+        tags_by_value: dict[int, list[str]] = {}
         for value_idx in sorted(set(value_indices)):
             if value_idx < 0 or value_idx >= len(values):
                 continue
-            current_tags = [str(tag) for tag in (values[value_idx].get("tags") or [])]
+            current_tags = list(values[value_idx].tags)
             if new_tag in current_tags:
                 continue
-            current_tags.append(new_tag)
-            values[value_idx]["tags"] = current_tags
-            changed += 1
+            tags_by_value[value_idx] = [*current_tags, new_tag]
+        changed = len(tags_by_value)
         if changed <= 0:
             return
         try:
-            validate_value_tag_constraints(values)
-            new_preset = Preset.model_validate(payload)
+            new_preset = set_value_tags(self._working_copy(), var_idx, tags_by_value)
             self._apply_preset(new_preset, f"태그 추가: {changed}개 값 변경")
         except Exception as exc:
             messagebox.showerror("템플릿", str(exc))
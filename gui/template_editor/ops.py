@@ -3,106 +3,79 @@ from __future__ import annotations
 from core.normalize import split_novelai_tags
 from core.preset import Preset
 
-from .validation import validate_value_tag_constraints
+from .working_copy import TemplateWorkingCopy
+
+
+# 아래 연산은 작업 사본의 preset 을 제자리에서 수정한 뒤 그 preset 을 돌려준다.
+# 검증은 편집된 값만 변수 색인에 대해 수행하고, 전체 스키마 검증은 저장/작업 실행 시에 한다.
 
 
 def normalize_tags_input(tags_text: str) -> list[str]:
     return split_novelai_tags(tags_text)
 
 
-def add_variable(preset: Preset, variable_name: str) -> Preset:
-    name = variable_name.strip()
-    if not name:
-        raise ValueError("변수 이름이 비어 있습니다.")
-    payload = preset.model_dump()
-    payload.setdefault("variables", [])
-    if any(item.get("name") == name for item in payload["variables"]):
-        raise ValueError(f"이미 존재하는 변수입니다: {name}")
-    payload["variables"].append({"name": name, "values": []})
-    return Preset.model_validate(payload)
-
+def add_variable(working: TemplateWorkingCopy, variable_name: str) -> Preset:
+    working.add_variable(variable_name)
+    return working.preset
 
-def rename_variable(preset: Preset, var_index: int, new_name: str) -> Preset:
-    name = new_name.strip()
-    if not name:
-        raise ValueError("변수 이름이 비어 있습니다.")
-    payload = preset.model_dump()
-    variables = payload.get("variables", [])
-    if var_index < 0 or var_index >= len(variables):
-        raise ValueError("유효하지 않은 변수 인덱스입니다.")
 
-    for idx, item in enumerate(variables):
-        if idx != var_index and item.get("name") == name:
-            raise ValueError(f"이미 존재하는 변수입니다: {name}")
-    variables[var_index]["name"] = name
-    return Preset.model_validate(payload)
+def rename_variable(working: TemplateWorkingCopy, var_index: int, new_name: str) -> Preset:
+    working.rename_variable(var_index, new_name)
+    return working.preset
 
 
-def delete_variable(preset: Preset, var_index: int) -> Preset:
-    payload = preset.model_dump()
-    variables = payload.get("variables", [])
-    if var_index < 0 or var_index >= len(variables):
-        raise ValueError("유효하지 않은 변수 인덱스입니다.")
-    variables.pop(var_index)
-    return Preset.model_validate(payload)
+def delete_variable(working: TemplateWorkingCopy, var_index: int) -> Preset:
+    working.delete_variable(var_index)
+    return working.preset
 
 
 def add_value(
-    preset: Preset,
+    working: TemplateWorkingCopy,
     var_index: int,
     value_name: str,
     tags: list[str],
 ) -> Preset:
-    name = value_name.strip()
-    if not name:
-        raise ValueError("값 이름이 비어 있습니다.")
-    payload = preset.model_dump()
-    variables = payload.get("variables", [])
-    if var_index < 0 or var_index >= len(variables):
-        raise ValueError("유효하지 않은 변수 인덱스입니다.")
-
-    values = variables[var_index].setdefault("values", [])
-    if any(item.get("name") == name for item in values):
-        raise ValueError(f"이미 존재하는 값입니다: {name}")
-    values.append({"name": name, "tags": tags})
-    validate_value_tag_constraints(values)
-    return Preset.model_validate(payload)
+    working.add_value(var_index, value_name, tags)
+    return working.preset
 
 
 def update_value(
-    preset: Preset,
+    working: TemplateWorkingCopy,
     var_index: int,
     value_index: int,
     value_name: str,
     tags: list[str],
 ) -> Preset:
-    name = value_name.strip()
-    if not name:
-        raise ValueError("값 이름이 비어 있습니다.")
-    payload = preset.model_dump()
-    variables = payload.get("variables", [])
-    if var_index < 0 or var_index >= len(variables):
-        raise ValueError("유효하지 않은 변수 인덱스입니다.")
-
-    values = variables[var_index].setdefault("values", [])
-    if value_index < 0 or value_index >= len(values):
-        raise ValueError("유효하지 않은 값 인덱스입니다.")
-
-    for idx, item in enumerate(values):
-        if idx != value_index and item.get("name") == name:
-            raise ValueError(f"이미 존재하는 값입니다: {name}")
-    values[value_index] = {"name": name, "tags": tags}
-    validate_value_tag_constraints(values)
-    return Preset.model_validate(payload)
-
-
-def delete_value(preset: Preset, var_index: int, value_index: int) -> Preset:
-    payload = preset.model_dump()
-    variables = payload.get("variables", [])
-    if var_index < 0 or var_index >= len(variables):
-        raise ValueError("유효하지 않은 변수 인덱스입니다.")
-    values = variables[var_index].setdefault("values", [])
-    if value_index < 0 or value_index >= len(values):
-        raise ValueError("유효하지 않은 값 인덱스입니다.")
-    values.pop(value_index)
-    return Preset.model_validate(payload)
+    working.update_value(var_index, value_index, value_name, tags)
+    return working.preset
+
+
+def set_value_tags(
+    working: TemplateWorkingCopy,
+    var_index: int,
+    tags_by_value: dict[int, list[str]],
+) -> Preset:
+    working.set_value_tags(var_index, tags_by_value)
+    return working.preset
+
+
+def delete_value(working: TemplateWorkingCopy, var_index: int, value_index: int) -> Preset:
+    return delete_values(working, var_index, [value_index])
+
+
+def delete_values(
+    working: TemplateWorkingCopy,
+    var_index: int,
+    value_indices: list[int],
+) -> Preset:
+    working.delete_values(var_index, value_indices)
+    return working.preset
+
+
+def replace_variable_values(
+    working: TemplateWorkingCopy,
+    var_index: int,
+    new_values: list[dict[str, object]],
+) -> Preset:
+    working.replace_values(var_index, new_values)
+    return working.preset
@@ -11,6 +11,7 @@ from .bulk import BulkOpsMixin
 from .inline import InlineEditMixin
 from .layout_mixin import LayoutMixin
 from .search_mixin import SearchMixin
+from .working_copy import TemplateWorkingCopy
 
 
 GetPresetFn = Callable[[], Preset]
@@ -39,6 +40,7 @@ class TemplateEditorPanel(
         self.set_preset = set_preset
         self.set_status = set_status
         self.on_changed = on_changed
+        self.working_copy: TemplateWorkingCopy | None = None
 
         self.variable_name_var = tk.StringVar(value="")
         self.value_name_var = tk.StringVar(value="")
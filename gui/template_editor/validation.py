@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import re
 
+from core.index import find_duplicate_pairs, iter_subset_pairs
 from core.preset import Preset
 
 
@@ -32,18 +33,16 @@ def validate_value_tag_constraints(values: list[dict[str, object]]) -> None:
         if tag_set:
             entries.append((name, tag_set))
 
-    seen: dict[frozenset[str], str] = {}
-    for name, tag_set in entries:
-        other = seen.get(tag_set)
-        if other is not None:
-            raise ValueError(f"태그 조합이 중복됩니다: '{name}' 와 '{other}'")
-        seen[tag_set] = name
-
-    sorted_entries = sorted(entries, key=lambda item: len(item[1]))
-    for idx, (name_a, set_a) in enumerate(sorted_entries):
-        for name_b, set_b in sorted_entries[idx + 1 :]:
-            if set_a.issubset(set_b):
-                raise ValueError(f"태그 부분집합 충돌: '{name_a}' ⊂ '{name_b}'")
+    tag_sets = [tag_set for _name, tag_set in entries]
+    duplicates = find_duplicate_pairs(tag_sets)
+    if duplicates:
+        idx, other_idx = duplicates[0]
+        raise ValueError(f"태그 조합이 중복됩니다: '{entries[idx][0]}' 와 '{entries[other_idx][0]}'")
+
+    subset = next(iter_subset_pairs(tag_sets), None)
+    if subset is not None:
+        idx, other_idx = subset
+        raise ValueError(f"태그 부분집합 충돌: '{entries[idx][0]}' ⊂ '{entries[other_idx][0]}'")
 
 
 def validate_preset_for_ui(preset: Preset) -> None:
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from core.index import TagIndex
+from core.preset import Preset, Variable, VariableValue
+
+from .validation import validate_value_tag_constraints
+
+
+class TemplateWorkingCopy:
+    """편집기용 작업 사본. Preset 을 제자리에서 수정한다.
+
+    변수마다 값 태그 역색인을 유지해서, 편집된 값만 같은 변수의 나머지 값과
+    중복/부분집합 여부를 검사한다. 전체 pydantic 검증은 validate() (저장/내보내기) 에서만 한다.
+    """
+
+    def __init__(self, preset: Preset) -> None:
+        self.preset = preset
+        # 변수 객체를 함께 들고 있어서 id 가 다른 객체에 재사용되어도 옛 색인을 쓰지 않는다.
+        self._indexes: dict[int, tuple[Variable, TagIndex]] = {}
+
+    def _variable(self, var_index: int) -> Variable:
+        variables = self.preset.variables
+        if var_index < 0 or var_index >= len(variables):
+            raise ValueError("유효하지 않은 변수 인덱스입니다.")
+        return variables[var_index]
+
+    def _index(self, variable: Variable) -> TagIndex:
+        entry = self._indexes.get(id(variable))
+        if entry is not None and entry[0] is variable:
+            return entry[1]
+        index = TagIndex((id(value), value.tag_set()) for value in variable.values)
+        self._indexes[id(variable)] = (variable, index)
+        return index
+
+    @staticmethod
+    def _value_name(variable: Variable, key: object) -> str:
+        return next((value.name for value in variable.values if id(value) == key), "")
+
+    @staticmethod
+    def _check_value_name(variable: Variable, name: str, skip_index: int | None = None) -> None:
+        for idx, item in enumerate(variable.values):
+            if idx != skip_index and item.name == name:
+                raise ValueError(f"이미 존재하는 값입니다: {name}")
+
+    def _check_tag_conflicts(
+        self,
+        variable: Variable,
+        index: TagIndex,
+        value: VariableValue,
+    ) -> None:
+        tag_set = value.tag_set()
+        if not tag_set:
+            return
+        other = index.find_duplicate(tag_set)
+        if other is not None:
+            raise ValueError(
+                f"태그 조합이 중복됩니다: '{value.name}' 와 '{self._value_name(variable, other)}'"
+            )
+        other = index.find_superset(tag_set)
+        if other is not None:
+            raise ValueError(
+                f"태그 부분집합 충돌: '{value.name}' ⊂ '{self._value_name(variable, other)}'"
+            )
+        other = index.find_subset(tag_set)
+        if other is not None:
+            raise ValueError(
+                f"태그 부분집합 충돌: '{self._value_name(variable, other)}' ⊂ '{value.name}'"
+            )
+
+    def _replace_indexed(
+        self,
+        variable: Variable,
+        replacements: dict[int, VariableValue],
+    ) -> None:
+        index = self._index(variable)
+        originals = {idx: variable.values[idx] for idx in replacements}
+        for value in originals.values():
+            index.discard(id(value))
+        added: list[VariableValue] = []
+        try:
+            for idx in sorted(replacements):
+                value = replacements[idx]
+                self._check_tag_conflicts(variable, index, value)
+                index.add(id(value), value.tag_set())
+                added.append(value)
+        except ValueError:
+            for value in added:
+                index.discard(id(value))
+            for value in originals.values():
+                index.add(id(value), value.tag_set())
+            raise
+        for idx, value in replacements.items():
+            variable.values[idx] = value
+
+    def add_variable(self, variable_name: str) -> None:
+        name = variable_name.strip()
+        if not name:
+            raise ValueError("변수 이름이 비어 있습니다.")
+        if any(item.name == name for item in self.preset.variables):
+            raise ValueError(f"이미 존재하는 변수입니다: {name}")
+        self.preset.variables.append(Variable(name=name, values=[]))
+
+    def rename_variable(self, var_index: int, new_name: str) -> None:
+        name = new_name.strip()
+        if not name:
+            raise ValueError("변수 이름이 비어 있습니다.")
+        variable = self._variable(var_index)
+        for idx, item in enumerate(self.preset.variables):
+            if idx != var_index and item.name == name:
+                raise ValueError(f"이미 존재하는 변수입니다: {name}")
+        variable.name = name
+
+    def delete_variable(self, var_index: int) -> None:
+        variable = self._variable(var_index)
+        self._indexes.pop(id(variable), None)
+        self.preset.variables.pop(var_index)
+
+    def add_value(self, var_index: int, value_name: str, tags: list[str]) -> None:
+        name = value_name.strip()
+        if not name:
+            raise ValueError("값 이름이 비어 있습니다.")
+        variable = self._variable(var_index)
+        self._check_value_name(variable, name)
+        value = VariableValue(name=name, tags=tags)
+        index = self._index(variable)
+        self._check_tag_conflicts(variable, index, value)
+        index.add(id(value), value.tag_set())
+        variable.values.append(value)
+
+    def update_value(
+        self,
+        var_index: int,
+        value_index: int,
+        value_name: str,
+        tags: list[str],
+    ) -> None:
+        name = value_name.strip()
+        if not name:
+            raise ValueError("값 이름이 비어 있습니다.")
+        variable = self._variable(var_index)
+        if value_index < 0 or value_index >= len(variable.values):
+            raise ValueError("유효하지 않은 값 인덱스입니다.")
+        self._check_value_name(variable, name, value_index)
+        self._replace_indexed(variable, {value_index: VariableValue(name=name, tags=tags)})
+
+    def set_value_tags(self, var_index: int, tags_by_value: dict[int, list[str]]) -> None:
+        variable = self._variable(var_index)
+        replacements: dict[int, VariableValue] = {}
+        for value_index, tags in tags_by_value.items():
+            if value_index < 0 or value_index >= len(variable.values):
+                raise ValueError("유효하지 않은 값 인덱스입니다.")
+            replacements[value_index] = VariableValue(
+                name=variable.values[value_index].name,
+                tags=tags,
+            )
+        self._replace_indexed(variable, replacements)
+
+    def delete_values(self, var_index: int, value_indices: list[int]) -> None:
+        variable = self._variable(var_index)
+        targets = sorted(set(value_indices), reverse=True)
+        if any(idx < 0 or idx >= len(variable.values) for idx in targets):
+            raise ValueError("유효하지 않은 값 인덱스입니다.")
+        index = self._index(variable)
+        for idx in targets:
+            index.discard(id(variable.values[idx]))
+            variable.values.pop(idx)
+
+    def replace_values(self, var_index: int, new_values: list[dict[str, object]]) -> None:
+        # 일괄 작업은 모든 값이 바뀌므로 변수 단위로 한 번 검사하고 색인은 다시 만든다.
+        variable = self._variable(var_index)
+        validate_value_tag_constraints(new_values)
+        values = [VariableValue.model_validate(item) for item in new_values]
+        self._indexes.pop(id(variable), None)
+        variable.values = values
+
+    def validate(self) -> Preset:
+        return Preset.model_validate(self.preset.model_dump())
@@ -1,7 +1,17 @@
+import io
 import json
 import unittest
 
-from core.extract import unwrap_comment_payload
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from core.extract import extract_tags_from_image, metadata_prefix_length, unwrap_comment_payload
+
+
+def _image_bytes(mode: str, fmt: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, (8, 8)).save(buffer, fmt, **params)
+    return buffer.getvalue()
 
 
 class ExtractTests(unittest.TestCase):
@@ -17,6 +27,24 @@ class ExtractTests(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0].get("prompt"), "1girl")
 
+    def test_metadata_prefix_stops_before_image_data(self) -> None:
+        info = PngInfo()
+        info.add_text("Comment", json.dumps({"prompt": "1girl"}))
+        png = _image_bytes("RGB", "PNG", pnginfo=info)
+        jpeg = _image_bytes("RGB", "JPEG", comment=json.dumps({"prompt": "solo"}))
+        for data, tag in ((png, "1girl"), (jpeg, "solo")):
+            size = metadata_prefix_length(data, len(data))
+            self.assertLess(size, len(data))
+            self.assertEqual(extract_tags_from_image(memoryview(data)[:size], False), [tag])
+
+    def test_metadata_prefix_reads_whole_file_when_needed(self) -> None:
+        for data in (
+            _image_bytes("RGBA", "PNG"),
+            _image_bytes("RGB", "WEBP"),
+            b"not an image",
+        ):
+            self.assertEqual(metadata_prefix_length(data, len(data)), len(data))
+
 
 if __name__ == "__main__":
     unittest.main()
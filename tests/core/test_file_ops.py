@@ -0,0 +1,121 @@
+import errno
+import os
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.utils import (
+    NameIndex,
+    copy_file,
+    ensure_unique_name,
+    is_same_device,
+    move_file,
+    target_exists,
+)
+
+
+class NameIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        (self.base / "alice.png").write_bytes(b"")
+        (self.base / "alice@@@1.png").write_bytes(b"")
+        (self.base / "bob.png").mkdir()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_matches_linear_probe(self) -> None:
+        index = NameIndex(["carol.png"])
+        legacy = {"carol.png"}
+        for base in ["alice", "alice", "bob", "carol", "carol", "dave"]:
+            name = index.unique_name(self.base, base, "png")
+            self.assertEqual(name, ensure_unique_name(self.base, base, ".png", legacy))
+            (self.base / name).write_bytes(b"")
+
+    def test_scans_folder_once(self) -> None:
+        index = NameIndex()
+        with mock.patch("core.utils.file_ops.os.scandir", wraps=os.scandir) as scandir:
+            names = [ensure_unique_name(self.base, "same", ".png", index) for _ in range(1000)]
+        self.assertEqual(scandir.call_count, 1)
+        self.assertEqual(len(set(names)), 1000)
+        self.assertEqual(names[:2], ["same.png", "same@@@1.png"])
+        self.assertEqual(names[-1], "same@@@999.png")
+
+    def test_folders_are_independent_and_missing_folder_is_empty(self) -> None:
+        index = NameIndex()
+        other = self.base / "not-created-yet"
+        self.assertEqual(index.unique_name(self.base, "alice", ".png"), "alice@@@2.png")
+        self.assertEqual(index.unique_name(other, "alice", ".png"), "alice.png")
+        self.assertEqual(index.unique_name(other, "alice", ".png"), "alice@@@1.png")
+
+    def test_target_exists(self) -> None:
+        source = self.base / "alice.png"
+        self.assertFalse(target_exists(source, source))
+        self.assertFalse(target_exists(source, self.base / "new.png"))
+        self.assertTrue(target_exists(source, self.base / "alice@@@1.png"))
+
+
+    def test_ensure_folder_creates_each_folder_once(self) -> None:
+        index = NameIndex()
+        index.unique_name(self.base, "carol", ".png")
+        target = self.base / "out"
+        with mock.patch("core.utils.file_ops.os.makedirs", wraps=os.makedirs) as makedirs:
+            for _ in range(3):
+                index.ensure_folder(target)
+            index.ensure_folder(self.base)
+        self.assertEqual(makedirs.call_count, 1)
+        self.assertTrue(target.is_dir())
+        self.assertEqual(index.unique_name(target, "alice", ".png"), "alice.png")
+
+    def test_move_file_renames_within_drive(self) -> None:
+        target = self.base / "moved.png"
+        move_file(self.base / "alice.png", target)
+        self.assertTrue(target.exists())
+        self.assertFalse((self.base / "alice.png").exists())
+
+
+class CopyFileTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.source = self.base / "src.png"
+        self.payload = os.urandom(3 * 1024 * 1024 + 17)
+        self.source.write_bytes(self.payload)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_cross_device_move_copies_verifies_and_removes_source(self) -> None:
+        target = self.base / "out" / "dst.png"
+        target.parent.mkdir()
+        with mock.patch("core.utils.file_ops.os.rename") as rename:
+            move_file(self.source, target, cross_device=True, verify=True)
+        rename.assert_not_called()
+        self.assertEqual(target.read_bytes(), self.payload)
+        self.assertFalse(self.source.exists())
+        self.assertEqual(os.listdir(target.parent), ["dst.png"])
+
+    def test_falls_back_when_fast_copy_is_unsupported(self) -> None:
+        unsupported = OSError(errno.EXDEV, "cross-device")
+        target = self.base / "dst.png"
+        with mock.patch("core.utils.file_ops.os.copy_file_range", side_effect=unsupported, create=True):
+            with mock.patch("core.utils.file_ops.os.sendfile", side_effect=unsupported, create=True):
+                copy_file(self.source, target)
+        self.assertEqual(target.read_bytes(), self.payload)
+
+    def test_verification_failure_keeps_source_and_cleans_partial(self) -> None:
+        target = self.base / "dst.png"
+        digests = iter(["a", "b"])
+        with mock.patch("core.utils.file_ops.file_digest", side_effect=lambda _path: next(digests)):
+            with self.assertRaises(OSError):
+                move_file(self.source, target, cross_device=True, verify=True)
+        self.assertTrue(self.source.exists())
+        self.assertEqual(sorted(os.listdir(self.base)), ["src.png"])
+
+    def test_same_device_uses_nearest_existing_folder(self) -> None:
+        self.assertTrue(is_same_device(self.base, self.base / "not" / "created"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import os
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.utils import ScanStats, iter_image_files, scan_files
+
+
+class ScanFilesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        for rel in (
+            "b.png",
+            "a.JPG",
+            "notes.txt",
+            "sub/c.webp",
+            "sub/deep/d.jpeg",
+            "sub-x/e.png",
+            "raw/f.png",
+            ".cache/g.png",
+            ".h.png",
+        ):
+            path = self.base / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _rel(self, entries) -> list[str]:
+        return [Path(entry.path).relative_to(self.base).as_posix() for entry in entries]
+
+    def _walk(self, sort: bool) -> list[str]:
+        expected = []
+        for root, dirs, files in os.walk(self.base):
+            if sort:
+                dirs.sort()
+                files.sort()
+            for name in files:
+                if name.lower().endswith((".png", ".webp", ".jpg", ".jpeg")):
+                    expected.append(str(Path(root) / name))
+        return expected
+
+    def test_matches_walk_order(self) -> None:
+        # 폴더의 파일을 하위 폴더보다 먼저 내보내는 os.walk 순서를 그대로 따른다.
+        self.assertEqual(list(iter_image_files(self.base)), self._walk(sort=False))
+        self.assertEqual(list(iter_image_files(self.base, sort=True)), self._walk(sort=True))
+        self.assertEqual(
+            list(iter_image_files(self.base, sort=True, workers=4)), self._walk(sort=True)
+        )
+        self.assertEqual(
+            self._rel(scan_files(self.base, sort=True)),
+            [
+                ".h.png",
+                "a.JPG",
+                "b.png",
+                ".cache/g.png",
+                "raw/f.png",
+                "sub/c.webp",
+                "sub/deep/d.jpeg",
+                "sub-x/e.png",
+            ],
+        )
+
+    def test_iter_image_files_streams(self) -> None:
+        with mock.patch("core.utils.files.os.scandir", wraps=os.scandir) as scandir:
+            first = next(iter_image_files(self.base, sort=True))
+            self.assertEqual(scandir.call_count, 1)
+        self.assertEqual(Path(first).name, ".h.png")
+
+    def test_filters(self) -> None:
+        self.assertEqual(
+            self._rel(scan_files(self.base, exclude=["raw", "sub/deep"], skip_hidden=True, sort=True)),
+            ["a.JPG", "b.png", "sub/c.webp", "sub-x/e.png"],
+        )
+        self.assertEqual(
+            self._rel(scan_files(self.base, include=["sub/*"], sort=True)),
+            ["sub/c.webp", "sub/deep/d.jpeg"],
+        )
+        self.assertEqual(self._rel(scan_files(self.base, extensions=[".TXT"])), ["notes.txt"])
+        self.assertEqual(len(list(scan_files(self.base, extensions=None))), 9)
+
+    def test_max_depth(self) -> None:
+        self.assertEqual(
+            self._rel(scan_files(self.base, max_depth=0, sort=True)),
+            [".h.png", "a.JPG", "b.png"],
+        )
+        self.assertEqual(len(list(scan_files(self.base, max_depth=1))), 7)
+
+    def test_streams_folders_lazily(self) -> None:
+        with mock.patch("core.utils.files.os.scandir", wraps=os.scandir) as scandir:
+            first = next(scan_files(self.base, max_depth=0))
+            self.assertEqual(scandir.call_count, 1)
+        self.assertTrue(first.is_file())
+
+    def test_parallel_keeps_serial_order(self) -> None:
+        for sort in (True, False):
+            serial = [entry.path for entry in scan_files(self.base, extensions=None, sort=sort)]
+            parallel = [
+                entry.path for entry in scan_files(self.base, extensions=None, sort=sort, workers=4)
+            ]
+            self.assertEqual(parallel, serial)
+        self.assertEqual(
+            self._rel(scan_files(self.base, exclude=["raw"], max_depth=1, workers=4, sort=True)),
+            [".h.png", "a.JPG", "b.png", ".cache/g.png", "sub/c.webp", "sub-x/e.png"],
+        )
+
+    def test_parallel_unordered_and_stats(self) -> None:
+        stats = ScanStats()
+        paths = [entry.path for entry in scan_files(self.base, workers=4, ordered=False, stats=stats)]
+        self.assertEqual(sorted(paths), sorted(iter_image_files(self.base)))
+        self.assertEqual(stats.folders, 6)
+        self.assertEqual(stats.files, 8)
+        self.assertGreaterEqual(stats.folders_per_second(), 0.0)
+
+    def test_parallel_stops_when_closed(self) -> None:
+        scanner = scan_files(self.base, workers=2, sort=True)
+        next(scanner)
+        scanner.close()
+        self.assertEqual(list(scanner), [])
+
+    def test_missing_folder_yields_nothing(self) -> None:
+        self.assertEqual(list(scan_files(self.base / "missing")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
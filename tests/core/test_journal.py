@@ -0,0 +1,68 @@
+import json
+import tempfile
+from pathlib import Path
+import unittest
+
+from core.runner import OperationJournal
+
+
+class OperationJournalTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.path = self.base / "run.journal"
+        self.params = {"folder": str(self.base), "order": "chara"}
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _open(self) -> OperationJournal:
+        return OperationJournal(self.path, "rename", self.params, sync_every=2)
+
+    def test_reopen_restores_completed_paths(self) -> None:
+        with self._open() as journal:
+            journal.plan_many([("a.png", "alice.png")])
+            journal.mark_done("a.png", "alice.png")
+            journal.mark_skipped("b.png", "UNKNOWN", "chara: no match")
+            journal.mark_failed("c.png", "boom")
+        with self._open() as journal:
+            self.assertEqual(journal.done, {"a.png": "alice.png"})
+            self.assertEqual(
+                journal.pending_paths(["a.png", "alice.png", "b.png", "c.png"]),
+                ["c.png"],
+            )
+
+    def test_plan_without_done_is_recovered_from_filesystem(self) -> None:
+        moved_source = self.base / "a.png"
+        moved_target = self.base / "alice.png"
+        moved_target.write_bytes(b"")
+        untouched = self.base / "b.png"
+        untouched.write_bytes(b"")
+        with self._open() as journal:
+            journal.plan_many(
+                [
+                    (str(moved_source), str(moved_target)),
+                    (str(untouched), str(self.base / "bob.png")),
+                ]
+            )
+        # 마지막 줄이 쓰다 만 채로 끊긴 경우
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write('{"op": "done", "sou')
+
+        with self._open() as journal:
+            self.assertEqual(journal.recovered, 1)
+            self.assertEqual(journal.done, {str(moved_source): str(moved_target)})
+            journal.mark_done(str(untouched), str(self.base / "bob.png"))
+        lines = self.path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(json.loads(lines[-1])["source"], str(untouched))
+
+    def test_params_mismatch_is_rejected(self) -> None:
+        self._open().close()
+        with self.assertRaises(ValueError):
+            OperationJournal(self.path, "rename", {"folder": "other"})
+        with self.assertRaises(ValueError):
+            OperationJournal(self.path, "move", self.params)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.match import PartialMatchPolicy
+from core.runner import MatchCache, build_variable_specs, match_variable_specs
+
+
+def _specs(emotion_tags: list[str]) -> list[dict]:
+    return build_variable_specs(
+        [
+            {"name": "chara", "values": [{"name": "alice", "tags": ["alice"]}]},
+            {"name": "emotion", "values": [{"name": "happy", "tags": emotion_tags}]},
+        ]
+    )
+
+
+class MatchCacheTests(unittest.TestCase):
+    def test_cached_match_equals_direct_match(self) -> None:
+        specs = _specs(["smile"])
+        matcher = MatchCache().bind(specs)
+        tags = ["alice", "smile", "1girl"]
+        self.assertEqual(matcher.match(tags), match_variable_specs(specs, tags))
+        self.assertEqual(matcher.match(tags), match_variable_specs(specs, tags))
+        self.assertEqual(matcher.misses, 2)
+        self.assertEqual(matcher.hits, 2)
+
+    def test_edit_invalidates_only_touched_variable(self) -> None:
+        cache = MatchCache()
+        tags = ["alice", "smile", "blush"]
+        cache.bind(_specs(["smile"])).match(tags)
+
+        matcher = cache.bind(_specs(["smile", "blush"]))
+        result = matcher.match(tags)
+        self.assertEqual(result["emotion"]["status"], "OK")
+        self.assertEqual(matcher.hits, 1)
+        self.assertEqual(matcher.misses, 1)
+
+    def test_persisted_across_instances(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "cache.sqlite3"
+            specs = _specs(["smile"])
+            first = MatchCache(path)
+            first.bind(specs).match(["alice"])
+            first.close()
+
+            second = MatchCache(path)
+            matcher = second.bind(specs)
+            result = matcher.match(["alice"])
+            second.close()
+            self.assertEqual(result["chara"], {"status": "OK", "values": ["alice"]})
+            self.assertEqual(result["emotion"]["status"], "UNKNOWN")
+            self.assertEqual(matcher.misses, 0)
+
+    def test_other_template_and_mode_keep_persisted_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "cache.sqlite3"
+            tags = [["alice", f"tag{index}"] for index in range(20)]
+            first = MatchCache(path)
+            matcher = first.bind(_specs(["smile"]))
+            for item in tags:
+                matcher.match(item)
+            other = build_variable_specs(
+                [{"name": "chara", "values": [{"name": "bob", "tags": ["bob"]}]}]
+            )
+            first.bind(other).match(["bob"])
+            first.bind(_specs(["smile"]), PartialMatchPolicy(min_tags=1)).match(["alice"])
+            first.close()
+
+            second = MatchCache(path)
+            matcher = second.bind(_specs(["smile"]))
+            for item in tags:
+                matcher.match(item)
+            second.close()
+            self.assertEqual(matcher.misses, 0)
+            self.assertEqual(matcher.hits, 40)
+
+    def test_unused_rows_expire_by_age(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "cache.sqlite3"
+            first = MatchCache(path)
+            first.bind(_specs(["smile"])).match(["alice"])
+            first.close()
+
+            with mock.patch("core.runner.match_cache.time.time", return_value=10**10):
+                second = MatchCache(path, max_age=60)
+                matcher = second.bind(_specs(["smile"]))
+                matcher.match(["alice"])
+                second.close()
+            self.assertEqual(matcher.hits, 0)
+
+    def test_migrates_cache_without_used_at(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "cache.sqlite3"
+            first = MatchCache(path)
+            first.bind(_specs(["smile"])).match(["alice"])
+            first.close()
+            with sqlite3.connect(path) as conn:
+                conn.execute("DROP INDEX match_results_used_at")
+                conn.execute("ALTER TABLE match_results DROP COLUMN used_at")
+
+            second = MatchCache(path)
+            matcher = second.bind(_specs(["smile"]))
+            matcher.match(["alice"])
+            second.close()
+            self.assertEqual(matcher.hits, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+
+from core.match import PartialMatchPolicy, PartialVariableMatcher, classify_tags
+from core.preset import Variable
+from core.runner import MatchCache, build_variable_specs
+
+
+def _variable() -> Variable:
+    return Variable.model_validate(
+        {
+            "name": "outfit",
+            "values": [
+                {"name": "maid", "tags": ["maid", "apron", "headdress"]},
+                {"name": "nurse", "tags": ["nurse", "nurse cap", "white dress", "apron"]},
+            ],
+        }
+    )
+
+
+class PartialMatchTests(unittest.TestCase):
+    def test_default_is_strict(self) -> None:
+        result = classify_tags([_variable()], ["maid", "apron"])
+        self.assertEqual(result.variables[0].status, "UNKNOWN")
+
+    def test_min_tags_threshold(self) -> None:
+        policy = PartialMatchPolicy(min_tags=2)
+        result = classify_tags([_variable()], ["maid", "apron"], partial=policy)
+        self.assertEqual(result.variables[0].status, "OK")
+        self.assertEqual(result.variables[0].matched_values, ["maid"])
+
+    def test_higher_score_wins(self) -> None:
+        policy = PartialMatchPolicy(min_ratio=0.5)
+        tags = ["maid", "apron", "nurse", "nurse cap"]
+        result = classify_tags([_variable()], tags, partial=policy)
+        # maid 2/3, nurse 3/4 → nurse 가 이긴다.
+        self.assertEqual(result.variables[0].matched_values, ["nurse"])
+
+    def test_tied_score_is_conflict(self) -> None:
+        variable = Variable.model_validate(
+            {
+                "name": "pose",
+                "values": [
+                    {"name": "sit", "tags": ["sitting", "chair"]},
+                    {"name": "kneel", "tags": ["kneeling", "floor"]},
+                ],
+            }
+        )
+        policy = PartialMatchPolicy(min_tags=1)
+        result = classify_tags([variable], ["sitting", "kneeling"], partial=policy)
+        self.assertEqual(result.variables[0].status, "CONFLICT")
+        self.assertEqual(result.variables[0].matched_values, ["sit", "kneel"])
+
+    def test_matchers_compiled_once_per_variable_list(self) -> None:
+        policy = PartialMatchPolicy(min_tags=1, min_ratio=0.25)
+        variable = _variable()
+        with mock.patch(
+            "core.match.classify.PartialVariableMatcher", wraps=PartialVariableMatcher
+        ) as compiled:
+            for _ in range(3):
+                classify_tags([variable], ["maid", "apron"], partial=policy)
+            self.assertEqual(compiled.call_count, 1)
+            # 값 태그가 바뀌면 다시 만든다.
+            variable.values[0].tags.append("ribbon")
+            result = classify_tags([variable], ["maid", "apron"], partial=policy)
+            self.assertEqual(compiled.call_count, 2)
+        self.assertEqual(result.variables[0].matched_values, ["maid"])
+
+    def test_invalid_policy(self) -> None:
+        with self.assertRaises(ValueError):
+            PartialMatchPolicy()
+        with self.assertRaises(ValueError):
+            PartialMatchPolicy(min_ratio=1.5)
+
+    def test_cached_matcher_keys_on_policy(self) -> None:
+        specs = build_variable_specs([_variable().model_dump()])
+        cache = MatchCache()
+        tags = ["maid", "apron"]
+        self.assertEqual(cache.bind(specs).match(tags)["outfit"]["status"], "UNKNOWN")
+        partial = cache.bind(specs, PartialMatchPolicy(min_tags=2)).match(tags)
+        self.assertEqual(partial["outfit"], {"status": "OK", "values": ["maid"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
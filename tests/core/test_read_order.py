@@ -0,0 +1,61 @@
+import os
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.utils import advise_sequential, disk_order, is_rotational, order_for_read, scan_files
+
+
+class ReadOrderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.paths = []
+        for name in ("c.png", "a.png", "b.png", "d.png"):
+            path = self.base / name
+            path.write_bytes(name.encode())
+            self.paths.append(str(path))
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_disk_order_sorts_by_inode(self) -> None:
+        lexical = sorted(self.paths)
+        expected = sorted(lexical, key=lambda path: os.stat(path).st_ino)
+        missing = str(self.base / "missing.png")
+        self.assertEqual(disk_order([missing, *lexical]), [*expected, missing])
+
+    def test_disk_order_uses_scan_entries_without_stat(self) -> None:
+        entries = list(scan_files(self.base))
+        expected = disk_order([entry.path for entry in entries])
+        with mock.patch("core.utils.read_order.os.stat", wraps=os.stat) as stat:
+            self.assertEqual(disk_order(entries), expected)
+        # 장치 번호를 위해 폴더만 한 번 stat 한다.
+        self.assertEqual(stat.call_count, 1)
+        self.assertEqual(
+            list(order_for_read(iter(entries), "path", self.base)),
+            [entry.path for entry in entries],
+        )
+
+    def test_order_for_read_modes(self) -> None:
+        lexical = sorted(self.paths)
+        self.assertEqual(list(order_for_read(lexical, "path", self.base)), lexical)
+        self.assertEqual(order_for_read(lexical, "disk", self.base), disk_order(lexical))
+        with mock.patch("core.utils.read_order.is_rotational", return_value=False):
+            self.assertEqual(list(order_for_read(lexical, "auto", self.base)), lexical)
+        with mock.patch("core.utils.read_order.is_rotational", return_value=True):
+            self.assertEqual(order_for_read(lexical, "auto", self.base), disk_order(lexical))
+        with self.assertRaises(ValueError):
+            order_for_read(lexical, "random", self.base)
+
+    def test_probes_do_not_fail(self) -> None:
+        self.assertIsInstance(is_rotational(self.base), bool)
+        self.assertFalse(is_rotational(self.base / "missing"))
+        with open(self.paths[0], "rb") as handle:
+            advise_sequential(handle.fileno())
+            self.assertEqual(handle.read(), b"c.png")
+
+
+if __name__ == "__main__":
+    unittest.main()
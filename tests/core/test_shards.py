@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import queue
+import tempfile
+import time
+from pathlib import Path
+import unittest
+
+from core.runner import (
+    JobIncompleteError,
+    build_variable_specs,
+    claim_shard,
+    create_job,
+    job_status,
+    merge_job_task,
+    process_shard,
+    load_job,
+    reclaim_stale_leases,
+    run_shard_worker,
+)
+from tests.helpers import write_png
+
+
+def _specs() -> list[dict]:
+    return build_variable_specs(
+        [
+            {
+                "name": "chara",
+                "values": [
+                    {"name": "alice", "tags": ["alice"]},
+                    {"name": "bob", "tags": ["bob"]},
+                ],
+            }
+        ]
+    )
+
+
+def _drain(out_queue: queue.Queue) -> list[tuple[str, dict]]:
+    results = []
+    while True:
+        item = out_queue.get_nowait()
+        if item[0] == "done":
+            return results
+        if item[0] == "result":
+            results.append((item[1], item[2]))
+
+
+class ShardJobTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.images = self.base / "images"
+        self.images.mkdir()
+        self.paths = []
+        for idx in range(12):
+            path = self.images / f"{idx:02d}.png"
+            write_png(path, "alice" if idx % 3 else "bob")
+            self.paths.append(str(path))
+        self.job_dir = self.base / "job"
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _create(self, **options) -> int:
+        return create_job(
+            self.job_dir,
+            self.images,
+            self.paths,
+            _specs(),
+            kind="rename",
+            options={"order": ["chara"], "template": "[chara]", **options},
+            shard_size=3,
+        )
+
+    def _merge(self, dry_run: bool = True) -> list[tuple[str, dict]]:
+        out_queue: queue.Queue = queue.Queue()
+        merge_job_task(out_queue, self.job_dir, dry_run)
+        return _drain(out_queue)
+
+    def test_workers_in_separate_processes_share_shards(self) -> None:
+        self.assertEqual(self._create(), 4)
+        workers = [
+            multiprocessing.Process(target=run_shard_worker, args=(str(self.job_dir), f"w{idx}"))
+            for idx in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=30)
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(job_status(self.job_dir), {"total": 4, "pending": 0, "leased": 0, "done": 4})
+
+        results = self._merge()
+        targets = [Path(payload["target"]).name for _status, payload in results]
+        # 이름 충돌은 목록 순서대로 풀리므로 어떤 워커가 먼저 끝났든 같은 결과다.
+        self.assertEqual(targets[:4], ["bob.png", "alice.png", "alice@@@1.png", "bob@@@1.png"])
+        self.assertEqual(len(set(targets)), 12)
+
+    def test_merge_applies_rename(self) -> None:
+        self._create()
+        run_shard_worker(self.job_dir, "solo")
+        results = self._merge(dry_run=False)
+        self.assertEqual({status for status, _payload in results}, {"OK"})
+        names = sorted(path.name for path in self.images.iterdir())
+        self.assertIn("alice.png", names)
+        self.assertIn("bob.png", names)
+        self.assertEqual(len(names), 12)
+
+    def test_claim_is_exclusive_and_stale_lease_is_reclaimed(self) -> None:
+        self._create()
+        first = claim_shard(self.job_dir, "a")
+        second = claim_shard(self.job_dir, "b")
+        self.assertNotEqual(first.shard_id, second.shard_id)
+
+        # a 가 heartbeat 없이 멈춘 상황: 오래된 lease 는 pending 으로 돌아간다.
+        stale = time.time() - 3600
+        os.utime(first.path, (stale, stale))
+        self.assertEqual(reclaim_stale_leases(self.job_dir, lease_timeout=60), 1)
+        self.assertFalse(first.heartbeat(force=True))
+        self.assertEqual(job_status(self.job_dir)["pending"], 3)
+
+        process_shard(second, load_job(self.job_dir))
+        self.assertEqual(run_shard_worker(self.job_dir, "c"), 3)
+        self.assertEqual(job_status(self.job_dir)["done"], 4)
+
+    def test_merge_requires_all_shards(self) -> None:
+        self._create()
+        lease = claim_shard(self.job_dir, "a")
+        process_shard(lease, load_job(self.job_dir))
+        with self.assertRaises(JobIncompleteError):
+            self._merge()
+
+    def test_worker_root_override_for_other_mount_point(self) -> None:
+        self._create()
+        mounted = self.base / "mnt"
+        self.images.rename(mounted)
+        run_shard_worker(self.job_dir, "remote", root=mounted)
+        out_queue: queue.Queue = queue.Queue()
+        merge_job_task(out_queue, self.job_dir, True, root=mounted)
+        results = _drain(out_queue)
+        self.assertEqual({status for status, _payload in results}, {"OK"})
+        self.assertTrue(all(payload["source"].startswith(str(mounted)) for _s, payload in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import random
+import unittest
+
+from core.index import find_duplicate_pairs, iter_subset_pairs
+
+
+def _brute_force_subset_pairs(tag_sets: list[frozenset[str]]) -> list[tuple[int, int]]:
+    seen: set[frozenset[str]] = set()
+    entries: list[tuple[int, frozenset[str]]] = []
+    for idx, tag_set in enumerate(tag_sets):
+        if tag_set and tag_set not in seen:
+            seen.add(tag_set)
+            entries.append((idx, tag_set))
+    entries.sort(key=lambda item: len(item[1]))
+    pairs: list[tuple[int, int]] = []
+    for pos, (idx, set_a) in enumerate(entries):
+        for other_idx, set_b in entries[pos + 1 :]:
+            if set_a.issubset(set_b):
+                pairs.append((idx, other_idx))
+                break
+    return pairs
+
+
+class SubsetIndexTests(unittest.TestCase):
+    def test_duplicate_pairs_skip_empty(self) -> None:
+        tag_sets = [frozenset({"a"}), frozenset(), frozenset({"a"}), frozenset()]
+        self.assertEqual(find_duplicate_pairs(tag_sets), [(2, 0)])
+
+    def test_subset_pairs_pick_smallest_superset(self) -> None:
+        tag_sets = [
+            frozenset({"a", "b", "c"}),
+            frozenset({"a"}),
+            frozenset({"a", "b"}),
+            frozenset({"x"}),
+        ]
+        self.assertEqual(list(iter_subset_pairs(tag_sets)), [(1, 2), (2, 0)])
+
+    def test_matches_pairwise_scan(self) -> None:
+        rng = random.Random(7)
+        vocab = [f"t{idx}" for idx in range(12)]
+        for _ in range(50):
+            tag_sets = [
+                frozenset(rng.sample(vocab, rng.randint(0, 4))) for _ in range(40)
+            ]
+            self.assertEqual(
+                list(iter_subset_pairs(tag_sets)),
+                _brute_force_subset_pairs(tag_sets),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import tempfile
+from pathlib import Path
+import unittest
+
+from core.runner import UndoLog, iter_undo_logs, read_undo_log
+
+
+class UndoLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_records_round_trip_and_newest_first(self) -> None:
+        with UndoLog.create(self.base, "rename", {"folder": "x"}) as first:
+            first.record("a.png", "alice.png")
+        with UndoLog.create(self.base, "move") as second:
+            second.record("b.png", "out/b.png")
+            second.record("c.png", "out/c.png")
+        with open(second.path, "a", encoding="utf-8") as handle:
+            handle.write('{"s": "torn')
+
+        self.assertEqual(list(iter_undo_logs(self.base)), [second.path, first.path])
+        header, entries = read_undo_log(first.path)
+        self.assertEqual((header["kind"], header["params"]), ("rename", {"folder": "x"}))
+        self.assertEqual(entries, [("a.png", "alice.png")])
+        self.assertEqual(len(read_undo_log(second.path)[1]), 2)
+
+    def test_empty_log_is_removed(self) -> None:
+        log = UndoLog.create(self.base, "rename")
+        log.close()
+        self.assertFalse(log.path.exists())
+        self.assertEqual(list(iter_undo_logs(self.base / "missing")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,285 @@
+import pickle
+import queue
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.runner import (
+    ByteBudget,
+    CompactBatch,
+    CompiledTemplate,
+    PoolAutotuner,
+    WorkerPool,
+    build_variable_specs,
+    iter_prefetched_results,
+    iter_prefetched_tags,
+    iter_tuned_results,
+    rename_task,
+)
+from tests.helpers import write_png
+
+
+def _specs(tag: str) -> list[dict]:
+    return build_variable_specs(
+        [{"name": "chara", "values": [{"name": "alice", "tags": [tag]}]}]
+    )
+
+
+class WorkerPoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.paths = []
+        for idx in range(4):
+            path = self.base / f"{idx}.png"
+            write_png(path, "alice, smile")
+            self.paths.append(str(path))
+        self.pool = WorkerPool(processes=2)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.temp_dir.cleanup()
+
+    def _statuses(self, specs: list[dict]) -> list[str]:
+        return [
+            result["matches"]["chara"]["status"]
+            for result in self.pool.imap_unordered(specs, False, self.paths)
+        ]
+
+    def test_pool_reused_and_template_switched_by_hash(self) -> None:
+        self.assertEqual(self._statuses(_specs("alice")), ["OK"] * 4)
+        first_pool = self.pool._pool
+        self.assertEqual(self._statuses(_specs("bob")), ["UNKNOWN"] * 4)
+        self.assertEqual(self._statuses(_specs("alice")), ["OK"] * 4)
+        self.assertIs(self.pool._pool, first_pool)
+        self.assertEqual(len(self.pool._stored), 2)
+
+    def test_resize_restarts_workers(self) -> None:
+        self._statuses(_specs("alice"))
+        self.pool.resize(1)
+        self.assertEqual(self.pool.processes, 1)
+        self.assertFalse(self.pool.started)
+        self.assertEqual(self._statuses(_specs("alice")), ["OK"] * 4)
+
+    def test_rename_task_uses_given_pool(self) -> None:
+        out_queue: queue.Queue = queue.Queue()
+        rename_task(
+            out_queue,
+            self.paths,
+            _specs("alice"),
+            ["chara"],
+            "[chara]",
+            False,
+            True,
+            False,
+            pool=self.pool,
+        )
+        items = []
+        while not out_queue.empty():
+            items.append(out_queue.get())
+        self.assertEqual(items[-1], ("done", None))
+        self.assertEqual([item[1] for item in items if item[0] == "result"], ["OK"] * 4)
+        progress = [item for item in items if item[0] == "progress"]
+        self.assertEqual(progress[-1][1:5], (4, 4, 4, 0))
+
+    def test_cancelled_task_stops_and_pool_stays_usable(self) -> None:
+        out_queue: queue.Queue = queue.Queue()
+        cancel_event = threading.Event()
+        cancel_event.set()
+        rename_task(
+            out_queue,
+            self.paths,
+            _specs("alice"),
+            ["chara"],
+            "[chara]",
+            False,
+            True,
+            False,
+            pool=self.pool,
+            cancel_event=cancel_event,
+        )
+        items = []
+        while not out_queue.empty():
+            items.append(out_queue.get())
+        self.assertFalse([item for item in items if item[0] == "result"])
+        self.assertEqual(items[-2], ("cancelled", 0, 4))
+        self.assertEqual(self._statuses(_specs("alice")), ["OK"] * 4)
+
+    def test_abandoned_tag_iterator_leaves_shared_pool_running(self) -> None:
+        first = self.pool.imap_tags(self.paths, False, chunksize=1, window=1)
+        self.assertIsNone(next(first)[1])
+        first_pool = self.pool._pool
+        first.close()
+        second = list(self.pool.imap_tags(self.paths, False))
+        self.assertEqual([error for _tags, error in second], [None] * 4)
+        self.assertIs(self.pool._pool, first_pool)
+
+    def test_terminate_fails_unfinished_jobs(self) -> None:
+        errors: queue.Queue = queue.Queue()
+        with mock.patch("multiprocessing.pool.Pool.apply_async"):
+            self.pool.submit_tags(self.paths[0], False, errors.put, errors.put)
+            self.pool.terminate()
+        self.assertIsInstance(errors.get(timeout=1), RuntimeError)
+        self.assertFalse(self.pool._pending)
+
+
+class CompactBatchTests(unittest.TestCase):
+    def test_rows_decode_to_process_image_shape(self) -> None:
+        specs = build_variable_specs(
+            [
+                {"name": "chara", "values": [{"name": "alice", "tags": ["a"]}, {"name": "bob", "tags": ["b"]}]},
+                {"name": "pose", "values": [{"name": "sit", "tags": ["s"]}]},
+            ]
+        )
+        batch = CompactBatch.encode(2, [[[1], []], [[0, 1], [0]], "broken"], len(specs))
+        batch = pickle.loads(pickle.dumps(batch))
+        paths = ["x0", "x1", "p2", "p3", "p4"]
+        rows = [row.to_dict() for row in batch.rows(paths, CompiledTemplate(specs))]
+        self.assertEqual(
+            rows[0],
+            {
+                "path": "p2",
+                "matches": {
+                    "chara": {"status": "OK", "values": ["bob"]},
+                    "pose": {"status": "UNKNOWN", "values": []},
+                },
+                "error": None,
+            },
+        )
+        self.assertEqual(rows[1]["matches"]["chara"], {"status": "CONFLICT", "values": ["alice", "bob"]})
+        self.assertEqual(rows[2], {"path": "p4", "matches": {}, "error": "broken"})
+
+
+class AutotuneTests(unittest.TestCase):
+    def test_io_bound_sample_adds_workers(self) -> None:
+        tuner = PoolAutotuner(sample_files=8, max_processes=64)
+        for _ in range(2):
+            tuner.record(4, wall=0.4, cpu=0.04, queue_wait=0.001, return_cost=0.001)
+        decision = tuner.decide()
+        self.assertTrue(tuner.ready)
+        self.assertGreater(decision.processes, tuner._cpu_count)
+        self.assertAlmostEqual(decision.io_ratio, 0.9)
+
+    def test_cheap_files_get_larger_batches(self) -> None:
+        tuner = PoolAutotuner(sample_files=8)
+        for _ in range(2):
+            tuner.record(4, wall=0.0004, cpu=0.0004, queue_wait=0.002, return_cost=0.001)
+        decision = tuner.decide()
+        self.assertEqual(decision.processes, tuner._cpu_count)
+        self.assertGreater(decision.chunksize, 4)
+
+    def test_tuned_results_cover_all_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for idx in range(12):
+                path = Path(temp_dir) / f"{idx}.png"
+                write_png(path, "alice")
+                paths.append(str(path))
+            pool = WorkerPool(processes=2)
+            try:
+                tuner = PoolAutotuner(sample_files=4, initial_chunksize=2, max_processes=3)
+                results = list(iter_tuned_results(pool, _specs("alice"), False, paths, tuner=tuner))
+            finally:
+                pool.close()
+        self.assertEqual(sorted(item["path"] for item in results), sorted(paths))
+        self.assertTrue(all(item["matches"]["chara"]["status"] == "OK" for item in results))
+
+
+    def test_tuning_keeps_shared_pool_size_and_repeats(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for idx in range(12):
+                path = Path(temp_dir) / f"{idx}.png"
+                write_png(path, "alice")
+                paths.append(str(path))
+            pool = WorkerPool(processes=2)
+            tuner = PoolAutotuner(sample_files=2, initial_chunksize=1, max_processes=1)
+            try:
+                resize = mock.patch.object(pool, "resize", side_effect=AssertionError)
+                with resize, mock.patch.object(tuner, "decide", wraps=tuner.decide) as decide:
+                    results = list(
+                        iter_tuned_results(pool, _specs("alice"), False, paths, tuner=tuner)
+                    )
+            finally:
+                pool.close()
+        self.assertEqual(len(results), 12)
+        self.assertEqual(pool.processes, 2)
+        self.assertGreater(decide.call_count, 1)
+        self.assertFalse(tuner.ready)
+
+class PrefetchPipelineTests(unittest.TestCase):
+    def test_prefetched_results_match_direct_parse(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for idx in range(6):
+                path = Path(temp_dir) / f"{idx}.png"
+                write_png(path, "alice" if idx % 2 else "bob")
+                paths.append(str(path))
+            missing = str(Path(temp_dir) / "missing.png")
+            pool = WorkerPool(processes=2)
+            try:
+                results = list(
+                    iter_prefetched_results(
+                        pool,
+                        _specs("alice"),
+                        False,
+                        iter(paths + [missing]),
+                        readers=2,
+                        max_inflight_bytes=64,
+                    )
+                )
+            finally:
+                pool.close()
+        by_path = {item["path"]: item for item in results}
+        self.assertEqual(len(by_path), 7)
+        self.assertTrue(by_path[missing]["error"])
+        for idx, path in enumerate(paths):
+            expected = "OK" if idx % 2 else "UNKNOWN"
+            self.assertEqual(by_path[path]["matches"]["chara"]["status"], expected)
+
+    def test_prefetched_tags_stream_in_path_order(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = []
+            for idx in range(10):
+                path = Path(temp_dir) / f"{idx}.png"
+                write_png(path, f"tag{idx}")
+                paths.append(str(path))
+            # 텍스트 청크가 이미지 데이터 뒤에 있으면 워커가 파일 전체를 다시 연다.
+            data = Path(paths[3]).read_bytes()
+            start = data.index(b"tEXt") - 4
+            end = start + 12 + int.from_bytes(data[start : start + 4], "big")
+            rest = data[:start] + data[end:]
+            tail = rest.index(b"IEND") - 4
+            Path(paths[3]).write_bytes(rest[:tail] + data[start:end] + rest[tail:])
+            pulled = []
+
+            def source():
+                for path in paths:
+                    pulled.append(path)
+                    yield path
+
+            pool = WorkerPool(processes=1)
+            try:
+                results = iter_prefetched_tags(pool, source(), False, readers=1)
+                first = next(results)
+                self.assertLessEqual(len(pulled), 3)
+                rest_results = list(results)
+            finally:
+                pool.close()
+        self.assertEqual(
+            [first, *rest_results], [([f"tag{idx}"], None) for idx in range(10)]
+        )
+
+    def test_byte_budget_lets_oversized_item_through_alone(self) -> None:
+        budget = ByteBudget(10)
+        self.assertTrue(budget.acquire(50))
+        budget.release(50)
+        self.assertTrue(budget.acquire(6))
+        budget.cancel()
+        self.assertFalse(budget.acquire(6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.preset import Preset, Variable, VariableValue
+from core.runner import MatchCache, WorkerPool
+from gui.services import match_folder, scan_folder
+from tests.helpers import write_png
+
+
+class _SlowPool:
+    """submit_tags 를 별도 스레드에서 늦게 완료하며 동시에 진행 중인 작업 수를 기록한다."""
+
+    processes = 1
+
+    def __init__(self, delay: float = 0.02) -> None:
+        self.delay = delay
+        self.submitted = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def submit_tags(self, path, include_negative, callback, error_callback) -> None:
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        def finish() -> None:
+            with self._lock:
+                self.in_flight -= 1
+            callback((["tag"], None))
+
+        threading.Timer(self.delay, finish).start()
+
+
+class _SilentPool:
+    """submit_tags 를 받기만 하고 끝내지 않는 풀(응답 없는 저장소 흉내)."""
+
+    processes = 1
+
+    def submit_tags(self, path, include_negative, callback, error_callback) -> None:
+        pass
+
+
+class AsyncServicesTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        for idx in range(6):
+            write_png(self.base / f"{idx}.png", "alice, smile" if idx % 2 else "bob")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def test_scan_then_match_with_process_pool(self) -> None:
+        pool = WorkerPool(processes=2)
+        self.addCleanup(pool.close)
+        scanned = [item async for item in scan_folder(str(self.base), pool=pool)]
+        self.assertEqual(len(scanned), 6)
+        self.assertTrue(all(item["error"] is None and not item["cached"] for item in scanned))
+
+        preset = Preset(
+            name="test",
+            variables=[Variable(name="chara", values=[VariableValue(name="alice", tags=["alice"])])],
+        )
+        matched = [
+            item
+            async for item in match_folder(
+                preset, str(self.base), "chara", pool=pool, match_cache=MatchCache()
+            )
+        ]
+        statuses = {Path(item["path"]).name: item["matches"]["chara"]["status"] for item in matched}
+        self.assertEqual(statuses["1.png"], "OK")
+        self.assertEqual(statuses["0.png"], "UNKNOWN")
+
+        rescanned = [item async for item in scan_folder(str(self.base), pool=pool)]
+        self.assertTrue(all(item["cached"] for item in rescanned))
+
+    async def test_bounded_concurrency_and_backpressure(self) -> None:
+        pool = _SlowPool()
+        results = scan_folder(str(self.base), pool=pool, concurrency=2)
+        first = await results.__anext__()
+        self.assertEqual(first["tags"], ["tag"])
+        await asyncio.sleep(0.1)
+        # 소비자가 멈춰 있으면 새 작업을 시작하지 않는다.
+        self.assertLessEqual(pool.submitted, 3)
+        rest = [item async for item in results]
+        self.assertEqual(len(rest), 5)
+        self.assertLessEqual(pool.max_in_flight, 2)
+
+    async def test_task_cancellation_stops_submitting(self) -> None:
+        pool = _SlowPool(delay=0.2)
+
+        async def consume() -> None:
+            async for _item in scan_folder(str(self.base), pool=pool, concurrency=2):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        submitted = pool.submitted
+        await asyncio.sleep(0.3)
+        self.assertEqual(pool.submitted, submitted)
+        self.assertLessEqual(submitted, 2)
+
+    async def test_timeout_turns_stuck_files_into_errors(self) -> None:
+        scanned = [
+            item
+            async for item in scan_folder(str(self.base), pool=_SilentPool(), timeout=0.05)
+        ]
+        self.assertEqual([item["error"] for item in scanned], ["timed out"] * 6)
+
+    async def test_pool_terminate_resolves_pending_scans(self) -> None:
+        pool = WorkerPool(processes=1)
+        self.addCleanup(pool.close)
+        with mock.patch("multiprocessing.pool.Pool.apply_async"):
+            results = scan_folder(str(self.base), pool=pool, concurrency=2)
+            pending = asyncio.ensure_future(results.__anext__())
+            await asyncio.sleep(0.05)
+            pool.terminate()
+            first = await asyncio.wait_for(pending, 1)
+            await results.aclose()
+        self.assertEqual(first["error"], "worker pool terminated")
+
+    async def test_match_cache_work_runs_off_event_loop(self) -> None:
+        threads: list[int] = []
+        cache = MatchCache()
+        bind = cache.bind
+
+        def recording_bind(*args):
+            threads.append(threading.get_ident())
+            matcher = bind(*args)
+            match = matcher.match
+
+            def recording_match(tags):
+                threads.append(threading.get_ident())
+                return match(tags)
+
+            matcher.match = recording_match
+            return matcher
+
+        cache.bind = recording_bind
+        preset = Preset(
+            name="test",
+            variables=[Variable(name="chara", values=[VariableValue(name="alice", tags=["tag"])])],
+        )
+        matched = [
+            item
+            async for item in match_folder(
+                preset, str(self.base), pool=_SlowPool(0), match_cache=cache
+            )
+        ]
+        self.assertEqual({item["matches"]["chara"]["status"] for item in matched}, {"OK"})
+        self.assertEqual(len(threads), 7)
+        self.assertNotIn(threading.get_ident(), threads)
+
+
+if __name__ == "__main__":
+    unittest.main()
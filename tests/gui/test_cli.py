@@ -0,0 +1,223 @@
+import io
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+from core.preset import Preset, Variable, VariableValue, load_preset, save_preset
+from gui import cli
+from tests.helpers import write_png
+
+
+class CliTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.images = self.base / "images"
+        self.images.mkdir()
+        write_png(self.images / "a.png", "alice, smile")
+        write_png(self.images / "b.png", "bob, smile")
+        (self.images / "broken.png").write_bytes(b"not an image")
+        self.preset_path = self.base / "preset.json"
+        save_preset(
+            self.preset_path,
+            Preset(
+                name="test",
+                variables=[
+                    Variable(
+                        name="chara",
+                        values=[VariableValue(name="alice", tags=["alice"])],
+                    )
+                ],
+            ),
+        )
+
+        undo_dir = mock.patch.object(cli, "DEFAULT_UNDO_DIR", self.base / "undo")
+        undo_dir.start()
+        self.addCleanup(undo_dir.stop)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _run(self, *argv: str) -> tuple[int, list[dict]]:
+        stdout = io.StringIO()
+        with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", io.StringIO()):
+            code = cli.main([*argv, "--workers", "2"])
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        return code, lines
+
+    def test_rename_streams_json_lines(self) -> None:
+        code, records = self._run(
+            "rename",
+            str(self.images),
+            "--preset",
+            str(self.preset_path),
+            "--order",
+            "chara",
+            "--cache",
+            str(self.base / "match_cache.sqlite3"),
+        )
+        statuses = {Path(item["source"]).name: item["status"] for item in records}
+        self.assertEqual(statuses, {"a.png": "OK", "b.png": "UNKNOWN", "broken.png": "UNKNOWN"})
+        self.assertEqual(code, 0)
+        self.assertTrue((self.base / "match_cache.sqlite3").is_file())
+        self.assertTrue((self.images / "a.png").exists())
+
+    def test_search_writes_output_file(self) -> None:
+        output = self.base / "out.jsonl"
+        code, _records = self._run(
+            "search",
+            str(self.images),
+            "smile",
+            "--output",
+            str(output),
+            "--scan-workers",
+            "4",
+            "--read-order",
+            "disk",
+            "--prefetch",
+        )
+        lines = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+        ok = sorted(Path(item["source"]).name for item in lines if item["status"] == "OK")
+        self.assertEqual(ok, ["a.png", "b.png"])
+        self.assertEqual(code, 0)
+
+    def test_exit_code_counts_error_records(self) -> None:
+        def fake_search(folder, tags_input, *, batch_cb=None, **_kwargs):
+            batch_cb([{"status": "ERROR", "source": "x.png", "message": "boom"}] * 3)
+            batch_cb([{"status": "OK", "source": "y.png", "message": None}])
+            return []
+
+        with mock.patch.object(cli, "search_images", side_effect=fake_search):
+            code, records = self._run("search", str(self.images), "smile")
+        self.assertEqual(code, 3)
+        self.assertEqual(len(records), 4)
+
+    def test_build_variable_saves_into_preset(self) -> None:
+        (self.images / "broken.png").unlink()
+        code, records = self._run(
+            "build-variable",
+            str(self.images),
+            "--name",
+            "scene",
+            "--save-to",
+            str(self.preset_path),
+        )
+        self.assertEqual(code, 0)
+        self.assertEqual(records[0]["variable"]["name"], "scene")
+        names = [variable.name for variable in load_preset(self.preset_path).variables]
+        self.assertEqual(names, ["chara", "scene"])
+
+    def test_usage_error_and_missing_preset(self) -> None:
+        code, _records = self._run("rename", str(self.images))
+        self.assertEqual(code, cli.EXIT_USAGE)
+        code, _records = self._run(
+            "rename",
+            str(self.images),
+            "--preset",
+            str(self.base / "missing.json"),
+            "--order",
+            "chara",
+            "--cache",
+            "",
+        )
+        self.assertEqual(code, cli.EXIT_FAILED)
+
+    def test_job_create_work_merge(self) -> None:
+        job_dir = self.base / "job"
+        code, records = self._run(
+            "job-create",
+            str(job_dir),
+            str(self.images),
+            "--preset",
+            str(self.preset_path),
+            "--order",
+            "chara",
+            "--shard-size",
+            "2",
+        )
+        self.assertEqual((code, records[0]["shards"]), (0, 2))
+        code, records = self._run("job-work", str(job_dir), "--worker-id", "host-a")
+        self.assertEqual((code, records[0]["shards"]), (0, 2))
+        code, records = self._run("job-merge", str(job_dir), "--wait", "5")
+        statuses = {Path(item["source"]).name: item["status"] for item in records}
+        self.assertEqual(statuses, {"a.png": "OK", "b.png": "UNKNOWN", "broken.png": "UNKNOWN"})
+        self.assertEqual(code, 0)
+
+    def test_journal_resume_skips_completed_files(self) -> None:
+        journal = self.base / "rename.journal"
+        argv = [
+            "rename",
+            str(self.images),
+            "--preset",
+            str(self.preset_path),
+            "--order",
+            "chara",
+            "--cache",
+            "",
+            "--journal",
+            str(journal),
+        ]
+        code, _records = self._run(*argv)
+        self.assertEqual(code, cli.EXIT_FAILED)
+        code, records = self._run(*argv, "--apply")
+        self.assertEqual((code, len(records)), (0, 3))
+        self.assertTrue((self.images / "alice.png").exists())
+        code, records = self._run("resume", str(journal), "--cache", "")
+        self.assertEqual((code, records), (0, []))
+
+    def test_save_plan_then_apply_plan(self) -> None:
+        plan = self.base / "rename.plan.json"
+        code, _records = self._run(
+            "rename",
+            str(self.images),
+            "--preset",
+            str(self.preset_path),
+            "--order",
+            "chara",
+            "--cache",
+            "",
+            "--save-plan",
+            str(plan),
+        )
+        self.assertEqual(code, 0)
+        self.assertTrue((self.images / "a.png").exists())
+
+        with mock.patch.object(cli.WorkerPool, "imap_tags") as mock_extract:
+            code, records = self._run("apply-plan", str(plan))
+        mock_extract.assert_not_called()
+        statuses = {Path(item["source"]).name: item["status"] for item in records}
+        self.assertEqual(statuses, {"a.png": "OK", "b.png": "UNKNOWN", "broken.png": "UNKNOWN"})
+        self.assertEqual(code, 0)
+        self.assertTrue((self.images / "alice.png").exists())
+
+    def test_undo_restores_latest_apply(self) -> None:
+        argv = ["rename", str(self.images), "--preset", str(self.preset_path)]
+        code, _records = self._run(*argv, "--order", "chara", "--cache", "", "--apply")
+        self.assertEqual(code, 0)
+        self.assertTrue((self.images / "alice.png").exists())
+
+        code, records = self._run("undo")
+
+        self.assertEqual((code, [item["status"] for item in records]), (0, ["OK"]))
+        self.assertEqual(sorted(p.name for p in self.images.iterdir()), ["a.png", "b.png", "broken.png"])
+        code, _records = self._run("undo")
+        self.assertEqual(code, cli.EXIT_FAILED)
+
+    def test_does_not_import_tkinter(self) -> None:
+        script = "import sys, gui.cli; print('tkinter' in sys.modules)"
+        completed = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=Path(__file__).resolve().parents[2],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(completed.stdout.strip(), "False")
+
+
+if __name__ == "__main__":
+    unittest.main()
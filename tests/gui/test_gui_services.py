@@ -1,10 +1,29 @@
+import os
 import tempfile
+import threading
 from pathlib import Path
 import unittest
 from unittest.mock import patch
 
 from core.preset import Preset, Variable, VariableValue
-from gui.services import move_images, rename_images, search_images
+from core.runner import OperationJournal
+from gui.services import (
+    MissingTagStats,
+    ResultSummary,
+    move_images,
+    rename_images,
+    search_images,
+)
+from gui.services_ops.common import (
+    FileOperations,
+    ResultBatcher,
+    ValueSpecIndex,
+    explain_unknown_match,
+    iter_image_tags,
+    operation_chains,
+    store_tag_cache,
+    tag_cache_key,
+)
 
 
 class GuiServicesTests(unittest.TestCase):
@@ -72,6 +91,24 @@ class GuiServicesTests(unittest.TestCase):
         self.assertTrue(all("alice" in item["target"] for item in ok))
         self.assertFalse(target.exists())
 
+    @patch("gui.services.extract_tags_from_image", return_value=["tag1"])
+    def test_move_to_other_drive_copies_then_removes(self, _mock_extract) -> None:
+        target = self.base / "out"
+        with patch("gui.services_ops.move_ops.is_same_device", return_value=False):
+            with patch("core.utils.file_ops.os.rename") as rename:
+                results = move_images(
+                    self.preset,
+                    str(self.base),
+                    str(target),
+                    "character",
+                    dry_run=False,
+                    verify_copy=True,
+                )
+        rename.assert_not_called()
+        self.assertEqual([item["status"] for item in results], ["OK", "OK"])
+        self.assertEqual(len(list((target / "alice").iterdir())), 2)
+        self.assertFalse((self.base / "a.png").exists())
+
     @patch("gui.services.extract_tags_from_image", return_value=["tag1", "tag2"])
     def test_move_dry_run_nested_template(self, _mock_extract) -> None:
         target = self.base / "out"
@@ -167,6 +204,207 @@ class GuiServicesTests(unittest.TestCase):
         self.assertEqual(len(ok), 1)
         self.assertTrue(ok[0]["source"].endswith("a.png"))
 
+    @patch(
+        "gui.services.extract_tags_from_image",
+        side_effect=lambda path, include_negative: ["tag1"] if path.endswith("a.png") else ["tag2"],
+    )
+    def test_search_progress_total_follows_scan(self, _mock_extract) -> None:
+        progress: list[tuple[int, int]] = []
+        search_images(
+            str(self.base), "tag1", progress_cb=lambda idx, total: progress.append((idx, total))
+        )
+        self.assertEqual(progress[-1], (2, 2))
+        self.assertTrue(all(total >= idx for idx, total in progress))
+
+    def test_iter_image_tags_reads_paths_as_needed(self) -> None:
+        (self.base / "c.png").write_bytes(b"")
+        paths = [str(self.base / name) for name in ("a.png", "b.png", "c.png")]
+        store_tag_cache(tag_cache_key(paths[1], False), ["cached"])
+        pulled: list[str] = []
+
+        def scanned():
+            for path in paths:
+                pulled.append(path)
+                yield path
+
+        class _OneByOnePool:
+            def imap_tags(self, image_paths, include_negative):
+                for path in image_paths:
+                    yield [Path(path).stem], None
+
+        results = iter_image_tags(scanned(), False, _OneByOnePool())
+        stat = Path(paths[0]).stat()
+        self.assertEqual(
+            next(results), (paths[0], ["a"], False, (stat.st_size, stat.st_mtime_ns))
+        )
+        self.assertEqual(pulled, paths[:1])
+        self.assertEqual(
+            [item[:3] for item in results],
+            [(paths[1], ["cached"], True), (paths[2], ["c"], False)],
+        )
+
+    def test_explain_unknown_uses_nearest_value(self) -> None:
+        index = ValueSpecIndex(
+            [
+                ("happy", {"smile", "open mouth", "blush"}),
+                ("angry", {"anger vein", "frown"}),
+                ("grin", {"smile", "teeth"}),
+            ]
+        )
+        stats = MissingTagStats()
+        message = explain_unknown_match("emotion", index, ["smile", "open mouth"], stats)
+        self.assertIn("'happy' 매치 2/3", message)
+        self.assertIn("blush", message)
+        explain_unknown_match("emotion", index, ["smile"], stats)
+        self.assertEqual(stats.most_common("emotion", 1), [("blush", 2)])
+        self.assertEqual(
+            explain_unknown_match("emotion", index, ["unrelated"]),
+            "템플릿 태그와 일치하는 항목이 없습니다.",
+        )
+
+    @patch("gui.services.extract_tags_from_image", return_value=["tag1"])
+    def test_rename_collects_missing_tags(self, _mock_extract) -> None:
+        preset = Preset(
+            name="test-missing",
+            variables=[
+                Variable(
+                    name="character",
+                    values=[VariableValue(name="alice", tags=["tag1", "tag3"])],
+                )
+            ],
+        )
+        stats = MissingTagStats()
+        results = rename_images(
+            preset,
+            str(self.base),
+            ["character"],
+            dry_run=True,
+            missing_stats=stats,
+        )
+        self.assertTrue(all(item.get("status") == "UNKNOWN" for item in results))
+        self.assertEqual(stats.most_common("character"), [("tag3", 2)])
+
+    @patch(
+        "gui.services.extract_tags_from_image",
+        side_effect=lambda path, include_negative: ["tag1"] if path.endswith("a.png") else ["tag2"],
+    )
+    def test_rename_streams_result_batches(self, _mock_extract) -> None:
+        batches: list[list[dict]] = []
+        results = rename_images(
+            self.preset,
+            str(self.base),
+            ["character"],
+            dry_run=True,
+            batch_cb=batches.append,
+        )
+        streamed = [record for batch in batches for record in batch]
+        self.assertEqual(streamed, results)
+        self.assertTrue(all(a is b for a, b in zip(streamed, results)))
+
+        summary = ResultSummary()
+        for batch in batches:
+            summary.add(batch)
+        self.assertEqual(summary.status_counts()["OK"], 1)
+        self.assertEqual(summary.status_counts()["UNKNOWN"], 1)
+        self.assertIn("character:", summary.format_unknown())
+
+    def test_result_batcher_flushes_by_size(self) -> None:
+        batches: list[list[dict]] = []
+        batcher = ResultBatcher(batches.append, batch_size=2, interval=60)
+        for idx in range(5):
+            batcher.add({"status": "OK", "source": str(idx)})
+        self.assertEqual([len(batch) for batch in batches], [2, 2])
+        batcher.flush()
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(len(batcher.results), 5)
+
+    def test_operation_chains_keep_name_order(self) -> None:
+        a, b, c = (str(self.base / name) for name in ("a.png", "b.png", "c.png"))
+        x, y = str(self.base / "x.png"), str(self.base / "y.png")
+        chains = operation_chains([(a, b, {}), (x, y, {}), (b, c, {})])
+        self.assertEqual(
+            [[(source, target) for source, target, _record in chain] for chain in chains],
+            [[(b, c), (a, b)], [(x, y)]],
+        )
+
+    def test_file_operations_run_concurrently_and_follow_chains(self) -> None:
+        (self.base / "a.png").write_bytes(b"a")
+        (self.base / "b.png").write_bytes(b"b")
+        for name in ("x.png", "y.png"):
+            (self.base / name).write_bytes(name.encode("ascii"))
+        barrier = threading.Barrier(2, timeout=5)
+
+        def execute(source: str, target: str) -> None:
+            # 독립된 x/y 작업은 서로를 기다리므로 동시에 실행돼야만 통과한다.
+            if Path(source).name in ("x.png", "y.png"):
+                barrier.wait()
+            os.rename(source, target)
+
+        batcher = ResultBatcher()
+        ops = FileOperations(execute, batcher, workers=4)
+        for source, target in [
+            ("a.png", "b.png"),
+            ("b.png", "c.png"),
+            ("x.png", "x2.png"),
+            ("y.png", "y2.png"),
+        ]:
+            record = {"status": "OK", "source": source, "target": target}
+            ops.submit(str(self.base / source), str(self.base / target), record)
+        ops.flush()
+
+        self.assertEqual([item["status"] for item in batcher.results], ["OK"] * 4)
+        self.assertEqual((self.base / "c.png").read_bytes(), b"b")
+        self.assertEqual((self.base / "b.png").read_bytes(), b"a")
+        self.assertTrue((self.base / "x2.png").exists())
+        self.assertTrue((self.base / "y2.png").exists())
+
+    def test_rename_resumes_from_journal_after_crash(self) -> None:
+        for name in ("c.png", "d.png", "e.png", "f.png"):
+            (self.base / name).write_bytes(b"")
+        journal_path = self.base.parent / f"{self.base.name}.journal"
+        self.addCleanup(lambda: journal_path.unlink(missing_ok=True))
+
+        class _Crash(BaseException):
+            pass
+
+        real_rename = os.rename
+        calls = []
+
+        def crashing_rename(source, target):
+            if len(calls) == 3:
+                raise _Crash()
+            calls.append(source)
+            real_rename(source, target)
+
+        journal = OperationJournal(journal_path, "rename", {"folder": str(self.base)})
+        with patch("gui.services.extract_tags_from_image", return_value=["tag1"]):
+            with patch("os.rename", side_effect=crashing_rename):
+                with self.assertRaises(_Crash):
+                    rename_images(
+                        self.preset,
+                        str(self.base),
+                        ["character"],
+                        dry_run=False,
+                        journal=journal,
+                    )
+        journal.close()
+        self.assertEqual(len(calls), 3)
+        remaining = sorted(path.name for path in self.base.iterdir() if not path.name.startswith("alice"))
+        self.assertEqual(len(remaining), 3)
+
+        journal = OperationJournal(journal_path, "rename", {"folder": str(self.base)})
+        with patch("gui.services.extract_tags_from_image", return_value=["tag1"]):
+            results = rename_images(
+                self.preset,
+                str(self.base),
+                ["character"],
+                dry_run=False,
+                journal=journal,
+            )
+        journal.close()
+        self.assertEqual(sorted(Path(item["source"]).name for item in results), remaining)
+        names = sorted(path.name for path in self.base.iterdir())
+        self.assertEqual(names, ["alice.png"] + [f"alice@@@{idx}.png" for idx in range(1, 6)])
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from core.preset import Preset, Variable, VariableValue
+from gui.services import OperationPlan, apply_plan, move_images, rename_images
+
+
+class PlanOpsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        for name in ("a.png", "b.png", "c.png"):
+            (self.base / name).write_bytes(name.encode("ascii"))
+        self.preset = Preset(
+            name="test",
+            variables=[
+                Variable(
+                    name="character",
+                    values=[VariableValue(name="alice", tags=["tag1"])],
+                )
+            ],
+        )
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _rename_results(self) -> list[dict]:
+        with patch(
+            "gui.services.extract_tags_from_image",
+            side_effect=lambda path, include_negative: [] if path.endswith("c.png") else ["tag1"],
+        ):
+            return rename_images(
+                self.preset,
+                str(self.base),
+                ["character"],
+                template="[character]",
+                dry_run=True,
+            )
+
+    def _rename_plan(self) -> OperationPlan:
+        results = self._rename_results()
+        return OperationPlan.from_results("rename", results, {"folder": str(self.base)})
+
+    def test_apply_plan_renames_without_extracting(self) -> None:
+        plan = self._rename_plan()
+        self.assertEqual(plan.counts(), {"OK": 2, "UNKNOWN": 1})
+
+        with patch("gui.services.extract_tags_from_image") as mock_extract:
+            results = apply_plan(plan)
+        mock_extract.assert_not_called()
+
+        statuses = sorted(item["status"] for item in results)
+        self.assertEqual(statuses, ["OK", "OK", "UNKNOWN"])
+        names = sorted(path.name for path in self.base.iterdir())
+        self.assertEqual(names, ["alice.png", "alice@@@1.png", "c.png"])
+
+    def test_apply_plan_skips_changed_and_missing_sources(self) -> None:
+        plan = self._rename_plan()
+        (self.base / "a.png").write_bytes(b"edited after dry run")
+        os.utime(self.base / "a.png", ns=(1, 1))
+        (self.base / "b.png").unlink()
+
+        results = apply_plan(plan)
+
+        by_source = {Path(item["source"]).name: item for item in results}
+        self.assertEqual(by_source["a.png"]["status"], "SKIP")
+        self.assertEqual(by_source["b.png"]["status"], "ERROR")
+        self.assertTrue((self.base / "a.png").exists())
+
+    def test_plan_keeps_stamp_taken_when_tags_were_read(self) -> None:
+        results = self._rename_results()
+        # 드라이런이 끝난 뒤 계획을 만들기 전에 바뀐 파일도 적용할 때 건너뛴다.
+        (self.base / "a.png").write_bytes(b"edited before the plan was built")
+        plan = OperationPlan.from_results("rename", results, {"folder": str(self.base)})
+
+        by_source = {Path(item["source"]).name: item for item in apply_plan(plan)}
+
+        self.assertEqual(by_source["a.png"]["status"], "SKIP")
+        self.assertEqual(by_source["b.png"]["status"], "OK")
+
+    def test_apply_plan_does_not_overwrite_new_target(self) -> None:
+        plan = self._rename_plan()
+        target = next(entry.target for entry in plan.entries if entry.status == "OK")
+        Path(target).write_bytes(b"appeared later")
+
+        results = apply_plan(plan)
+
+        self.assertEqual(Path(target).read_bytes(), b"appeared later")
+        errors = [item for item in results if item["status"] == "ERROR"]
+        self.assertEqual(len(errors), 1)
+
+    @patch("gui.services.extract_tags_from_image", return_value=["tag1"])
+    def test_move_plan_round_trips_through_file(self, _mock_extract) -> None:
+        target_root = self.base / "out"
+        results = move_images(
+            self.preset,
+            str(self.base),
+            str(target_root),
+            "character",
+            dry_run=True,
+        )
+        plan_path = self.base / "plan.json"
+        OperationPlan.from_results("move", results, {"folder": str(self.base)}).save(plan_path)
+
+        loaded = OperationPlan.load(plan_path)
+        self.assertTrue(loaded.matches("move", {"folder": str(self.base)}))
+        self.assertFalse(loaded.matches("rename", {"folder": str(self.base)}))
+        applied = apply_plan(loaded)
+
+        self.assertEqual([item["status"] for item in applied], ["OK", "OK", "OK"])
+        self.assertEqual(len(list((target_root / "alice").iterdir())), 3)
+
+    def test_rejects_unknown_plan_kind(self) -> None:
+        with self.assertRaises(ValueError):
+            OperationPlan.from_dict({"version": 1, "kind": "delete", "entries": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
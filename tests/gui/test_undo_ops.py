@@ -0,0 +1,109 @@
+import os
+import tempfile
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from core.preset import Preset, Variable, VariableValue
+from core.runner import iter_undo_logs
+from gui.services import (
+    OperationPlan,
+    apply_plan,
+    configure_undo_dir,
+    move_images,
+    rename_images,
+    undo_operations,
+)
+
+
+@patch("gui.services.extract_tags_from_image", return_value=["tag1"])
+class UndoOpsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.images = self.base / "images"
+        self.images.mkdir()
+        for name in ("a.png", "b.png", "c.png"):
+            (self.images / name).write_bytes(name.encode("ascii"))
+        self.undo_dir = self.base / "undo"
+        configure_undo_dir(self.undo_dir)
+        self.addCleanup(configure_undo_dir, None)
+        self.preset = Preset(
+            name="test",
+            variables=[
+                Variable(
+                    name="character",
+                    values=[VariableValue(name="alice", tags=["tag1"])],
+                )
+            ],
+        )
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _latest_log(self) -> Path:
+        return next(iter_undo_logs(self.undo_dir))
+
+    def test_undo_move_restores_files_and_prunes_folders(self, _mock_extract) -> None:
+        target_root = self.base / "sorted"
+        move_images(self.preset, str(self.images), str(target_root), "character", dry_run=False)
+        self.assertEqual(os.listdir(self.images), [])
+
+        results = undo_operations(self._latest_log())
+
+        self.assertEqual([item["status"] for item in results], ["OK", "OK", "OK"])
+        self.assertEqual(sorted(os.listdir(self.images)), ["a.png", "b.png", "c.png"])
+        self.assertEqual(os.listdir(target_root), [])
+        self.assertEqual(list(iter_undo_logs(self.undo_dir)), [])
+
+    def test_undo_applied_move_plan_prunes_folders(self, _mock_extract) -> None:
+        target_root = self.base / "sorted"
+        results = move_images(
+            self.preset, str(self.images), str(target_root), "character", dry_run=True
+        )
+        params = {"folder": str(self.images), "target_root": str(target_root)}
+        apply_plan(OperationPlan.from_results("move", results, params))
+        self.assertEqual(os.listdir(self.images), [])
+
+        results = undo_operations(self._latest_log())
+
+        self.assertEqual([item["status"] for item in results], ["OK", "OK", "OK"])
+        self.assertEqual(sorted(os.listdir(self.images)), ["a.png", "b.png", "c.png"])
+        self.assertEqual(os.listdir(target_root), [])
+
+    def test_undo_rename_keeps_files_created_since(self, _mock_extract) -> None:
+        rename_images(
+            self.preset,
+            str(self.images),
+            ["character"],
+            template="[character]",
+            dry_run=False,
+        )
+        log = self._latest_log()
+        (self.images / "b.png").write_bytes(b"new file")
+
+        results = undo_operations(log)
+
+        statuses = sorted(item["status"] for item in results)
+        self.assertEqual(statuses, ["ERROR", "OK", "OK"])
+        self.assertEqual((self.images / "b.png").read_bytes(), b"new file")
+        self.assertTrue(log.exists())
+        # 충돌을 정리하고 다시 실행하면 이미 되돌린 항목은 SKIP 이 된다.
+        (self.images / "b.png").unlink()
+        again = undo_operations(log)
+        self.assertEqual(sorted(item["status"] for item in again), ["OK", "SKIP", "SKIP"])
+        self.assertEqual((self.images / "b.png").read_bytes(), b"b.png")
+
+    def test_undo_link_view_removes_links_only(self, _mock_extract) -> None:
+        view = self.base / "view"
+        move_images(self.preset, str(self.images), str(view), "character", dry_run=False, link=True)
+
+        results = undo_operations(self._latest_log())
+
+        self.assertEqual([item["status"] for item in results], ["OK", "OK", "OK"])
+        self.assertEqual(sorted(os.listdir(self.images)), ["a.png", "b.png", "c.png"])
+        self.assertFalse((view / "alice").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
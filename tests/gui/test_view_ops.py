@@ -0,0 +1,110 @@
+import os
+import tempfile
+from pathlib import Path
+import unittest
+from unittest.mock import patch
+
+from core.preset import Preset, Variable, VariableValue
+from gui.services import move_images, teardown_view
+from gui.services_ops.view_ops import VIEW_MANIFEST_NAME, prune_empty_folders
+
+
+@patch("gui.services.extract_tags_from_image", return_value=["tag1"])
+class LinkViewTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base = Path(self.temp_dir.name)
+        self.images = self.base / "images"
+        self.images.mkdir()
+        for name in ("a.png", "b.png"):
+            (self.images / name).write_bytes(name.encode("ascii"))
+        self.view = self.base / "view"
+        self.preset = Preset(
+            name="test",
+            variables=[
+                Variable(
+                    name="character",
+                    values=[VariableValue(name="alice", tags=["tag1"])],
+                )
+            ],
+        )
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def _link(self) -> list[dict]:
+        return move_images(
+            self.preset,
+            str(self.images),
+            str(self.view),
+            "character",
+            dry_run=False,
+            link=True,
+        )
+
+    def test_hardlink_view_and_teardown(self, _mock_extract) -> None:
+        results = self._link()
+
+        self.assertEqual([item["status"] for item in results], ["OK", "OK"])
+        for item in results:
+            self.assertTrue(os.path.samefile(item["source"], item["target"]))
+            self.assertFalse(os.path.islink(item["target"]))
+        self.assertTrue((self.view / VIEW_MANIFEST_NAME).is_file())
+
+        removed = teardown_view(str(self.view))
+
+        self.assertEqual([item["status"] for item in removed], ["OK", "OK"])
+        self.assertEqual(os.listdir(self.view), [])
+        self.assertEqual(sorted(os.listdir(self.images)), ["a.png", "b.png"])
+
+    def test_symlink_view_on_other_drive(self, _mock_extract) -> None:
+        with patch("gui.services_ops.move_ops.is_same_device", return_value=False):
+            results = self._link()
+
+        target = Path(results[0]["target"])
+        self.assertTrue(target.is_symlink())
+        self.assertFalse(os.path.isabs(os.readlink(target)))
+        self.assertEqual(target.read_bytes(), Path(results[0]["source"]).read_bytes())
+
+        teardown_view(str(self.view))
+        self.assertEqual(os.listdir(self.view), [])
+        self.assertTrue((self.images / "a.png").exists())
+
+    def test_teardown_keeps_replaced_files(self, _mock_extract) -> None:
+        results = self._link()
+        replaced = Path(results[0]["target"])
+        replaced.unlink()
+        replaced.write_bytes(b"user file")
+
+        removed = teardown_view(str(self.view))
+
+        statuses = {item["source"]: item["status"] for item in removed}
+        self.assertEqual(statuses[str(replaced)], "SKIP")
+        self.assertEqual(replaced.read_bytes(), b"user file")
+        self.assertTrue((self.view / VIEW_MANIFEST_NAME).is_file())
+
+    def test_prune_stops_at_root_and_skips_siblings(self, _mock_extract) -> None:
+        inside = self.view / "alice" / "smile"
+        sibling = self.base / f"{self.view.name}2" / "alice"
+        inside.mkdir(parents=True)
+        sibling.mkdir(parents=True)
+
+        prune_empty_folders({str(inside), str(sibling)}, self.view)
+
+        self.assertEqual(os.listdir(self.view), [])
+        self.assertTrue(sibling.is_dir())
+
+    def test_link_mode_needs_separate_target(self, _mock_extract) -> None:
+        with self.assertRaises(ValueError):
+            move_images(
+                self.preset,
+                str(self.images),
+                str(self.images),
+                "character",
+                dry_run=False,
+                link=True,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
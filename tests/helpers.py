@@ -0,0 +1,16 @@
+"""Shared helpers for unittest-style tests."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+
+def write_png(path: Path, prompt: str) -> None:
+    """Write a tiny PNG whose Comment chunk carries a NovelAI-style prompt."""
+    info = PngInfo()
+    info.add_text("Comment", json.dumps({"prompt": prompt}))
+    Image.new("RGB", (4, 4)).save(path, pnginfo=info)
@@ -0,0 +1 @@
+# Template editor tests package.
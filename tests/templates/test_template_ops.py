@@ -0,0 +1,86 @@
+import unittest
+
+from pydantic import ValidationError
+
+from core.preset import Preset, Variable, VariableValue
+from gui.template_editor.ops import (
+    add_value,
+    add_variable,
+    delete_values,
+    set_value_tags,
+    update_value,
+)
+from gui.template_editor.working_copy import TemplateWorkingCopy
+
+
+class TemplateOpsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.preset = Preset(
+            name="test",
+            variables=[
+                Variable(
+                    name="emotion",
+                    values=[
+                        VariableValue(name="happy", tags=["smile", "open mouth"]),
+                        VariableValue(name="angry", tags=["anger vein"]),
+                    ],
+                )
+            ],
+        )
+        self.working = TemplateWorkingCopy(self.preset)
+
+    def test_add_and_update_value_in_place(self) -> None:
+        result = add_value(self.working, 0, "sad", ["tears"])
+        self.assertIs(result, self.preset)
+        update_value(self.working, 0, 2, "crying", ["tears", "crying"])
+        values = self.preset.variables[0].values
+        self.assertEqual([value.name for value in values], ["happy", "angry", "crying"])
+        self.assertEqual(values[2].tags, ["tears", "crying"])
+
+    def test_subset_conflicts_rejected_without_change(self) -> None:
+        with self.assertRaisesRegex(ValueError, "부분집합"):
+            add_value(self.working, 0, "grin", ["smile"])
+        with self.assertRaisesRegex(ValueError, "부분집합"):
+            add_value(self.working, 0, "big_smile", ["smile", "open mouth", "blush"])
+        with self.assertRaisesRegex(ValueError, "중복"):
+            update_value(self.working, 0, 1, "angry", ["open mouth", "smile"])
+        self.assertEqual(len(self.preset.variables[0].values), 2)
+        self.assertEqual(self.preset.variables[0].values[1].tags, ["anger vein"])
+
+    def test_multi_value_tag_edit_checks_touched_values_together(self) -> None:
+        with self.assertRaisesRegex(ValueError, "중복"):
+            set_value_tags(self.working, 0, {0: ["x"], 1: ["x"]})
+        self.assertEqual(self.preset.variables[0].values[0].tags, ["smile", "open mouth"])
+        set_value_tags(self.working, 0, {0: ["smile"], 1: ["anger vein", "frown"]})
+        add_value(self.working, 0, "neutral", ["closed mouth"])
+
+    def test_delete_then_reuse_tags(self) -> None:
+        delete_values(self.working, 0, [0])
+        add_value(self.working, 0, "happy2", ["smile", "open mouth"])
+        self.assertEqual(self.preset.variables[0].values[1].name, "happy2")
+
+    def test_add_variable_duplicate_name(self) -> None:
+        add_variable(self.working, "chara")
+        with self.assertRaisesRegex(ValueError, "이미 존재하는 변수"):
+            add_variable(self.working, "chara")
+
+    def test_replaced_variable_does_not_reuse_stale_index(self) -> None:
+        old = self.preset.variables[0]
+        add_value(self.working, 0, "sad", ["tears"])
+        new = Variable(name="emotion", values=[VariableValue(name="calm", tags=["sigh"])])
+        # 옛 변수 객체의 id 가 새 변수에 재사용된 상황을 만든다.
+        self.working._indexes[id(new)] = self.working._indexes.pop(id(old))
+        self.preset.variables[0] = new
+        with self.assertRaisesRegex(ValueError, "중복"):
+            add_value(self.working, 0, "sigh", ["sigh"])
+        add_value(self.working, 0, "happy", ["smile", "open mouth"])
+
+    def test_full_validation_on_validate(self) -> None:
+        working = TemplateWorkingCopy(self.preset)
+        self.preset.variables[0].values.append(VariableValue(name="dup", tags=["anger vein"]))
+        with self.assertRaises(ValidationError):
+            working.validate()
+
+
+if __name__ == "__main__":
+    unittest.main()
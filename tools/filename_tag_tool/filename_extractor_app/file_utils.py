@@ -1,22 +1,13 @@
 from __future__ import annotations
 
-import os
 from pathlib import Path
 import re
 
-
-_IMAGE_EXTS = (".png", ".webp", ".jpg", ".jpeg")
+from core.utils import iter_image_files as _scan_image_files
 
 
 def iter_image_files(folder: str | Path) -> list[str]:
-    folder_path = Path(folder)
-    results: list[str] = []
-    for root, _dirs, files in os.walk(folder_path):
-        for name in files:
-            if name.lower().endswith(_IMAGE_EXTS):
-                results.append(str(Path(root) / name))
-    results.sort()
-    return results
+    return sorted(_scan_image_files(folder))
 
 
 def dedupe_keep_order(items: list[str]) -> list[str]:
@@ -11,6 +11,8 @@ from typing import Any, Callable
 
 from PIL import Image
 
+from core.utils import scan_files
+
 
 IMAGE_EXTENSIONS = {
     ".jpg",
@@ -72,15 +74,12 @@ def is_image_file(path: Path) -> bool:
 
 
 def iter_image_files(folder: Path) -> list[Path]:
-    files: list[Path] = []
-    for root, _, names in os.walk(folder):
-        root_path = Path(root)
-        for name in names:
-            p = root_path / name
-            if is_image_file(p):
-                files.append(p)
-    files.sort()
-    return files
+    # scan_files 는 확장자만 보므로 is_image_file 처럼 일반 파일만 남긴다(깨진 링크, 소켓 등 제외).
+    return sorted(
+        Path(entry.path)
+        for entry in scan_files(folder, extensions=IMAGE_EXTENSIONS)
+        if entry.is_file()
+    )
 
 
 def hash_file(path: str) -> str: